@@ -0,0 +1,36 @@
+"""Add indexes for foreign-key and status filters
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+import sqlalchemy as sa
+
+from app.core.migrations import create_indexes, drop_indexes
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_properties_owner_id", "properties", ["owner_id"]),
+    ("ix_tenants_property_id", "tenants", ["property_id"]),
+    ("ix_documents_property_id", "documents", ["property_id"]),
+    ("ix_rental_agreements_property_id", "rental_agreements", ["property_id"]),
+    ("ix_rental_agreements_status_end_date", "rental_agreements", ["status", "end_date"]),
+    ("ix_notifications_user_id_status", "notifications", ["user_id", "status"]),
+    ("ix_notifications_user_id_id", "notifications", ["user_id", sa.text("id DESC")]),
+]
+
+
+def upgrade() -> None:
+    create_indexes(INDEXES)
+
+
+def downgrade() -> None:
+    drop_indexes(INDEXES)
@@ -0,0 +1,28 @@
+"""Add documents.sha256
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_column('documents', 'sha256'):
+        op.add_column('documents', sa.Column('sha256', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_column('sha256')
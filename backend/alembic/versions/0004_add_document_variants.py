@@ -0,0 +1,47 @@
+"""Add document_variants table for resized copies of uploaded photos
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if has_table('document_variants'):
+        return
+    op.create_table(
+        'document_variants',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('file_path', sa.String(), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('file_type', sa.String(), nullable=True),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('document_id', 'name', name='uq_document_variants_document_id_name'),
+    )
+    op.create_index('ix_document_variants_id', 'document_variants', ['id'])
+    op.create_index('ix_document_variants_document_id', 'document_variants', ['document_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_variants_document_id', table_name='document_variants')
+    op.drop_index('ix_document_variants_id', table_name='document_variants')
+    op.drop_table('document_variants')
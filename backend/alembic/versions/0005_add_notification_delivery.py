@@ -0,0 +1,36 @@
+"""Add delivery bookkeeping columns to notifications
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_column('notifications', 'delivery_attempts'):
+        op.add_column('notifications', sa.Column('delivery_attempts', sa.Integer(), server_default='0', nullable=False))
+    if not has_column('notifications', 'next_attempt_at'):
+        op.add_column('notifications', sa.Column('next_attempt_at', sa.DateTime(), nullable=True))
+    if not has_column('notifications', 'last_error'):
+        op.add_column('notifications', sa.Column('last_error', sa.Text(), nullable=True))
+    op.create_index('ix_notifications_status_id', 'notifications', ['status', 'id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_status_id', table_name='notifications')
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('next_attempt_at')
+        batch_op.drop_column('delivery_attempts')
@@ -0,0 +1,39 @@
+"""Add notification dedupe keys and job watermarks for the rent expiry scanner
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_column, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_column('notifications', 'dedupe_key'):
+        op.add_column('notifications', sa.Column('dedupe_key', sa.String(), nullable=True))
+    op.create_index('ix_notifications_dedupe_key', 'notifications', ['dedupe_key'], unique=True, if_not_exists=True)
+    if not has_table('job_watermarks'):
+        op.create_table(
+            'job_watermarks',
+            sa.Column('name', sa.String(), nullable=False),
+            sa.Column('watermark', sa.DateTime(), nullable=False),
+            sa.Column('last_run_at', sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint('name'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('job_watermarks')
+    op.drop_index('ix_notifications_dedupe_key', table_name='notifications')
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.drop_column('dedupe_key')
@@ -0,0 +1,28 @@
+"""Add index for loading scheduled notifications
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_notifications_status_scheduled_at',
+        'notifications',
+        ['status', 'scheduled_at'],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_status_scheduled_at', table_name='notifications')
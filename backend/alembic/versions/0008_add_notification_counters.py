@@ -0,0 +1,40 @@
+"""Add per-user unread notification counters
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_table('notification_counters'):
+        op.create_table(
+            'notification_counters',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('user_id'),
+        )
+    op.execute(
+        "INSERT INTO notification_counters (user_id, unread_count) "
+        "SELECT user_id, count(*) FROM notifications "
+        "WHERE status IN ('PENDING', 'SENT', 'FAILED') "
+        "AND user_id NOT IN (SELECT user_id FROM notification_counters) "
+        "GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_counters')
@@ -0,0 +1,37 @@
+"""Add per-owner portfolio summary cache
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_table('portfolio_summaries'):
+        op.create_table(
+            'portfolio_summaries',
+            sa.Column('owner_id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('summary', sa.JSON(), nullable=True),
+            sa.Column('summary_version', sa.Integer(), nullable=True),
+            sa.Column('as_of', sa.Date(), nullable=True),
+            sa.Column('computed_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('owner_id'),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('portfolio_summaries')
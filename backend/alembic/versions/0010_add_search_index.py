@@ -0,0 +1,92 @@
+"""Add the full-text search index and fill it
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+# The schema as of this revision, copied from app/search/index.py
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        tags, title, body, kind UNINDEXED, object_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+]
+POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_entries (
+        kind VARCHAR(16) NOT NULL,
+        object_id INTEGER NOT NULL,
+        owner_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        document TSVECTOR NOT NULL,
+        PRIMARY KEY (kind, object_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_document ON search_entries USING gin (document)",
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_owner_id ON search_entries (owner_id)",
+]
+
+# kind: (code used in SQLite rowids, the entries as object_id, owner_id, title, body)
+ENTRIES = {
+    'property': (1, """
+        SELECT id AS object_id, owner_id, coalesce(title, '') AS title,
+               coalesce(description, '') || ' ' || coalesce(address, '') || ' ' || coalesce(city, '') AS body
+        FROM properties
+    """),
+    'tenant': (2, """
+        SELECT tenants.id AS object_id, properties.owner_id,
+               coalesce(first_name, '') || ' ' || coalesce(last_name, '') AS title,
+               coalesce(email, '') || ' ' || coalesce(employer, '') AS body
+        FROM tenants JOIN properties ON properties.id = tenants.property_id
+    """),
+    'document': (3, """
+        SELECT documents.id AS object_id, properties.owner_id, coalesce(documents.title, '') AS title,
+               coalesce(documents.description, '') AS body
+        FROM documents JOIN properties ON properties.id = documents.property_id
+    """),
+}
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+        op.execute('DELETE FROM search_entries')
+        for kind, (_, entries) in ENTRIES.items():
+            op.execute(
+                "INSERT INTO search_entries (kind, object_id, owner_id, title, document) "
+                f"SELECT '{kind}', object_id, owner_id, title, "
+                "setweight(to_tsvector('simple', title), 'A') || setweight(to_tsvector('simple', body), 'B') "
+                f"FROM ({entries}) AS entries"
+            )
+    else:
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute('DELETE FROM search_index')
+        for kind, (code, entries) in ENTRIES.items():
+            op.execute(
+                "INSERT INTO search_index (rowid, tags, title, body, kind, object_id) "
+                f"SELECT object_id * 4 + {code}, 'o' || owner_id || ' {kind}', title, body, '{kind}', object_id "
+                f"FROM ({entries}) AS entries"
+            )
+        op.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_table('search_entries')
+    else:
+        op.execute('DROP TABLE search_index')
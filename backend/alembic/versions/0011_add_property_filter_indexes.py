@@ -0,0 +1,33 @@
+"""Add indexes for property list filters and sorting
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 23:00:00.000000
+
+"""
+from app.core.migrations import create_indexes, drop_indexes
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_properties_city_monthly_rent_id", "properties", ["city", "monthly_rent", "id"]),
+    ("ix_properties_state_monthly_rent_id", "properties", ["state", "monthly_rent", "id"]),
+    ("ix_properties_zip_code_monthly_rent_id", "properties", ["zip_code", "monthly_rent", "id"]),
+    ("ix_properties_property_type_monthly_rent_id", "properties", ["property_type", "monthly_rent", "id"]),
+    ("ix_properties_bedrooms_monthly_rent_id", "properties", ["bedrooms", "monthly_rent", "id"]),
+    ("ix_properties_monthly_rent_id", "properties", ["monthly_rent", "id"]),
+]
+
+
+def upgrade() -> None:
+    create_indexes(INDEXES)
+
+
+def downgrade() -> None:
+    drop_indexes(INDEXES)
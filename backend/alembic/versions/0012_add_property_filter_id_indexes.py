@@ -0,0 +1,32 @@
+"""Add indexes for property list filters sorted by id
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from app.core.migrations import create_indexes, drop_indexes
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ("ix_properties_city_id", "properties", ["city", "id"]),
+    ("ix_properties_state_id", "properties", ["state", "id"]),
+    ("ix_properties_zip_code_id", "properties", ["zip_code", "id"]),
+    ("ix_properties_property_type_id", "properties", ["property_type", "id"]),
+    ("ix_properties_bedrooms_id", "properties", ["bedrooms", "id"]),
+]
+
+
+def upgrade() -> None:
+    create_indexes(INDEXES)
+
+
+def downgrade() -> None:
+    drop_indexes(INDEXES)
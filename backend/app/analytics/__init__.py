@@ -0,0 +1,9 @@
+# Portfolio analytics (/analytics/portfolio) and the hooks that keep its
+# per-owner summary cache current
+from app.analytics.portfolio import compute_portfolio_summary, get_portfolio_summary
+from app.analytics import signals  # noqa: F401  bumps summary versions on row changes
+
+__all__ = [
+    "compute_portfolio_summary",
+    "get_portfolio_summary"
+]
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import dialect_insert
+from app.models.portfolio_summary import PortfolioSummary
+from app.models.property import Property
+from app.models.rental_agreement import AgreementStatus, RentalAgreement
+from app.models.tenant import Tenant
+
+EXPIRY_WINDOWS = (30, 60, 90)
+
+def _rate(part: int, whole: int) -> float:
+    return round(part / whole, 4) if whole else 0.0
+
+async def compute_portfolio_summary(db: AsyncSession, owner_id: int, now: datetime) -> dict:
+    """
+    Aggregate an owner's active properties, tenants and agreements with
+    three GROUP BY queries over the owner_id and property_id indexes.
+    """
+    rent = func.coalesce(Property.monthly_rent, 0)
+    cities = (await db.execute(
+        select(
+            Property.city,
+            Property.state,
+            func.count(Property.id).label("properties"),
+            func.sum(case((Property.is_available.is_(True), 1), else_=0)).label("vacant"),
+            func.sum(rent).label("potential_rent"),
+            func.sum(case((Property.is_available.is_(True), rent), else_=0)).label("vacancy_loss"),
+        )
+        .where(Property.owner_id == owner_id, Property.is_active.is_(True))
+        .group_by(Property.city, Property.state)
+        .order_by(Property.state, Property.city)
+    )).all()
+
+    # Windows include active agreements already past their end date
+    agreements = (await db.execute(
+        select(
+            func.count(RentalAgreement.id).label("active"),
+            func.coalesce(func.sum(RentalAgreement.monthly_rent), 0).label("rent_roll"),
+            *(
+                func.coalesce(func.sum(case(
+                    (RentalAgreement.end_date <= now + timedelta(days=days), 1), else_=0
+                )), 0).label(f"within_{days}_days")
+                for days in EXPIRY_WINDOWS
+            ),
+        )
+        .join(Property, Property.id == RentalAgreement.property_id)
+        .where(Property.owner_id == owner_id, RentalAgreement.status == AgreementStatus.ACTIVE)
+    )).one()
+
+    tenants = await db.scalar(
+        select(func.count(Tenant.id))
+        .join(Property, Property.id == Tenant.property_id)
+        .where(Property.owner_id == owner_id, Tenant.is_active.is_(True))
+    )
+
+    properties = sum(row.properties for row in cities)
+    vacant = sum(row.vacant for row in cities)
+    return {
+        "owner_id": owner_id,
+        "as_of": now.date().isoformat(),
+        "computed_at": now.isoformat(),
+        "properties": properties,
+        "occupied": properties - vacant,
+        "vacant": vacant,
+        "occupancy_rate": _rate(properties - vacant, properties),
+        "tenants": tenants,
+        "active_agreements": agreements.active,
+        "rent_roll": float(agreements.rent_roll),
+        "potential_rent": float(sum(row.potential_rent for row in cities)),
+        "vacancy_loss": float(sum(row.vacancy_loss for row in cities)),
+        "vacancy_by_city": [
+            {
+                "city": row.city,
+                "state": row.state,
+                "properties": row.properties,
+                "vacant": row.vacant,
+                "vacancy_rate": _rate(row.vacant, row.properties),
+                "vacancy_loss": float(row.vacancy_loss),
+            }
+            for row in cities
+        ],
+        "expiring_agreements": {
+            f"within_{days}_days": agreements._mapping[f"within_{days}_days"]
+            for days in EXPIRY_WINDOWS
+        },
+    }
+
+async def get_portfolio_summary(db: AsyncSession, owner_id: int) -> dict:
+    """
+    Return the owner's cached summary, recomputing it if their data
+    changed since it was stored or it was computed on an earlier day.
+
+    Summaries are not maintained incrementally: a change only bumps the
+    owner's version (app/analytics/signals.py), and the next read
+    recomputes the whole summary with compute_portfolio_summary's three
+    aggregate queries. owner_id must be an existing user.
+
+    The summary is stored with one upsert, and only if the version read
+    before computing is still current, so a change committed meanwhile is
+    never hidden and concurrent cold reads do not race on the row.
+    """
+    now = datetime.utcnow()
+    cached = (await db.execute(
+        select(
+            PortfolioSummary.version,
+            PortfolioSummary.summary,
+            PortfolioSummary.summary_version,
+            PortfolioSummary.as_of,
+        ).where(PortfolioSummary.owner_id == owner_id)
+    )).first()
+    if (
+        cached is not None
+        and cached.summary is not None
+        and cached.summary_version == cached.version
+        and cached.as_of == now.date()
+    ):
+        return cached.summary
+
+    version = cached.version if cached is not None else 0
+    summary = await compute_portfolio_summary(db, owner_id, now)
+
+    summaries = PortfolioSummary.__table__
+    upsert = dialect_insert(db.bind.dialect.name)(summaries).values(
+        owner_id=owner_id, version=version, summary=summary,
+        summary_version=version, as_of=now.date(), computed_at=now,
+    )
+    await db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["owner_id"],
+            set_={
+                "summary": upsert.excluded.summary,
+                "summary_version": upsert.excluded.summary_version,
+                "as_of": upsert.excluded.as_of,
+                "computed_at": upsert.excluded.computed_at,
+            },
+            where=summaries.c.version == version,
+        )
+    )
+    await db.commit()
+    return summary
@@ -0,0 +1,31 @@
+from sqlalchemy.orm import Session
+
+from app.core.changes import RowChanges, subscribe, track
+from app.core.database import dialect_insert
+from app.models.portfolio_summary import PortfolioSummary
+from app.models.property import Property
+from app.models.rental_agreement import RentalAgreement
+from app.models.tenant import Tenant
+
+# Bumps PortfolioSummary.version for every owner whose properties,
+# tenants or agreements change, in the same transaction as the change.
+
+_MODELS = (Property, Tenant, RentalAgreement)
+
+def _bump_versions(session: Session, changes: RowChanges) -> None:
+    owner_ids = changes.owners(*_MODELS)
+    if not owner_ids:
+        return
+    connection = session.connection()
+    summaries = PortfolioSummary.__table__
+    upsert = dialect_insert(connection.dialect.name)(summaries)
+    connection.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["owner_id"],
+            set_={"version": summaries.c.version + 1},
+        ),
+        [{"owner_id": owner_id, "version": 1} for owner_id in sorted(owner_ids)],
+    )
+
+track(*_MODELS)
+subscribe(flush=_bump_versions)
@@ -0,0 +1,160 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.responses import etag_matches
+
+CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+def _modified_since(header: Optional[str], last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return True
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) > since
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; func.now() stores them in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def conditional(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime] = None
+) -> Optional[Response]:
+    """
+    Set the validators on response and return a 304 to send instead of
+    the body when the request's If-None-Match, or failing that its
+    If-Modified-Since, shows the client's copy is current.
+    """
+    response.headers["etag"] = etag
+    response.headers["cache-control"] = CACHE_CONTROL
+    if last_modified is not None:
+        last_modified = _as_utc(last_modified)
+        # A second change within the same second would carry the same
+        # date, so only a date already in the past is a usable validator
+        if last_modified < datetime.now(timezone.utc).replace(microsecond=0):
+            response.headers["last-modified"] = format_datetime(last_modified, usegmt=True)
+        else:
+            last_modified = None
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = (
+            if_modified_since is not None and last_modified is not None
+            and not _modified_since(if_modified_since, last_modified)
+        )
+    if not fresh:
+        return None
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return Response(status_code=304, headers=headers)
+
+def _modified(obj: Any) -> Optional[datetime]:
+    modified = obj.updated_at or obj.created_at
+    return _as_utc(modified) if modified else None
+
+def _fields(obj: Any) -> tuple:
+    # What the body is built from: a cached schema instance's fields, or
+    # the loaded column values of a row. updated_at alone has one-second
+    # resolution, so two changes within a second would share an ETag.
+    if isinstance(obj, BaseModel):
+        return tuple(obj.model_dump().items())
+    state = inspect(obj)
+    return tuple((attr.key, state.dict.get(attr.key)) for attr in state.mapper.column_attrs)
+
+def conditional_resource(request: Request, response: Response, obj: Any) -> Optional[Response]:
+    """
+    conditional() for a single row, validated by its id and a digest of
+    its fields.
+    """
+    digest = hashlib.blake2b(repr(_fields(obj)).encode(), digest_size=8)
+    return conditional(request, response, f'W/"{obj.id:x}-{digest.hexdigest()}"', _modified(obj))
+
+def conditional_collection(
+    request: Request, response: Response, items: Sequence[Any]
+) -> Optional[Response]:
+    """
+    conditional() for a page of a list endpoint, validated by the fields
+    of its rows, the request URL and the credentials.
+
+    The page is read first: a count or max(updated_at) over the whole
+    filtered list would scan every matching row on each poll. No
+    Last-Modified is sent, since a deleted row leaves no newer timestamp
+    behind.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for part in (request.url.path, request.url.query, request.headers.get("authorization")):
+        digest.update(repr(part).encode())
+    for item in items:
+        digest.update(repr(_fields(item)).encode())
+    return conditional(request, response, f'W/"{digest.hexdigest()}"')
+
+class ConditionalGetMiddleware:
+    """
+    Adds an ETag to GET responses that have none and answers a matching
+    If-None-Match with 304.
+
+    Endpoints using conditional() skip serialization for 304s; this covers
+    the remaining JSON endpoints, which still build the body but no longer
+    send it. Only single-message JSON bodies are
+    hashed, so streamed responses pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] == 200
+                    and "etag" not in headers
+                    and headers.get("content-type", "").startswith("application/json")
+                ):
+                    start = message
+                    return
+                await send(message)
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            held, start = start, None
+            if message.get("more_body", False):
+                await send(held)
+                await send(message)
+                return
+            headers = MutableHeaders(raw=held["headers"])
+            etag = f'"{hashlib.blake2b(message.get("body", b""), digest_size=12).hexdigest()}"'
+            headers["etag"] = etag
+            headers.setdefault("cache-control", CACHE_CONTROL)
+            if etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({**held, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(held)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
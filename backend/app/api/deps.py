@@ -1,42 +1,99 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+import inspect
+from typing import Callable, Generator, Optional, Type, TypeVar
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.principal import (
+    Principal, cache_principal, get_token_subject, principal_cache, principal_cache_generation
+)
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(
+    tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False
+)
 
-def get_current_user(
-    db: Session = Depends(get_db),
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+async def resolve_principal(db: AsyncSession, token: Optional[str]) -> Principal:
+    """
+    Resolve a token's user id, role and active flag, served from the
+    principal cache when possible. Deactivated users are rejected.
+    """
+    user_id = get_token_subject(token) if token else None
+    if user_id is None:
+        raise credentials_exception
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        generation = principal_cache_generation()
+        row = (await db.execute(
+            select(User.id, User.role, User.is_active).where(User.id == user_id)
+        )).first()
+        if row is None:
+            raise credentials_exception
+        principal = Principal(id=row.id, role=row.role, is_active=row.is_active)
+        cache_principal(principal, generation)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_async_db),
     token: str = Depends(oauth2_scheme)
+) -> Principal:
+    return await resolve_principal(db, token)
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    principal: Principal = Depends(get_current_principal)
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, principal.id)
     if user is None:
         raise credentials_exception
     return user
 
-def get_current_active_user(
+async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user 
\ No newline at end of file
+    return current_user
+
+def query_model(model: Type[ModelT]) -> Callable[..., ModelT]:
+    """
+    Dependency reading a schema's fields from the query string. The schema
+    validates them, and failures, including its own validators, are
+    returned as a 422 like any other bad query parameter.
+    """
+    def dependency(**params) -> ModelT:
+        try:
+            return model(**params)
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False)
+            raise RequestValidationError(
+                [{**error, "loc": ("query", *error["loc"])} for error in errors]
+            )
+
+    dependency.__signature__ = inspect.Signature([
+        inspect.Parameter(
+            name,
+            inspect.Parameter.KEYWORD_ONLY,
+            default=Query(field.default, description=field.description),
+            annotation=field.annotation,
+        )
+        for name, field in model.model_fields.items()
+    ])
+    return dependency
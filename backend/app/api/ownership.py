@@ -0,0 +1,49 @@
+import re
+from typing import Any, Type, TypeVar
+from fastapi import HTTPException
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.property import Property
+
+ModelType = TypeVar("ModelType")
+
+def is_admin(user: Any) -> bool:
+    return user.role.value == "admin"
+
+def _not_found_detail(model: Type[Any]) -> str:
+    # RentalAgreement -> "Rental agreement not found"
+    label = re.sub(r"(?<!^)(?=[A-Z])", " ", model.__name__).capitalize()
+    return f"{label} not found"
+
+def _join_owner(statement: Select, model: Type[Any]) -> Select:
+    if model is Property:
+        return statement
+    return statement.join(Property, model.property_id == Property.id)
+
+def owned_by(statement: Select, model: Type[Any], user: Any) -> Select:
+    """
+    Restrict a select() over model to rows whose property the user owns.
+    """
+    if is_admin(user):
+        return statement
+    return _join_owner(statement, model).where(Property.owner_id == user.id)
+
+async def scoped(
+    db: AsyncSession, model: Type[ModelType], user: Any, object_id: int
+) -> ModelType:
+    """
+    Load model by id together with its property's owner in one query.
+
+    Raises 404 when the row does not exist and 403 when it belongs to a
+    property the user does not own.
+    """
+    statement = _join_owner(select(model, Property.owner_id), model).where(model.id == object_id)
+    row = (await db.execute(statement)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=_not_found_detail(model))
+
+    obj, owner_id = row
+    if not is_admin(user) and owner_id != user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return obj
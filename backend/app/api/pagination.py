@@ -0,0 +1,110 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple, Union
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+def _encode_payload(payload: dict) -> str:
+    encoded = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(encoded).decode().rstrip("=")
+
+def encode_cursor(value: int) -> str:
+    return _encode_payload({"id": value})
+
+def encode_sorted_cursor(value: int, sort_value: Optional[Union[int, float]]) -> str:
+    # A null sort value marks a cursor among the rows without one
+    return _encode_payload({"id": value, "sort": sort_value})
+
+def _decode_payload(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict) or type(payload.get("id")) is not int:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+def decode_cursor(cursor: str) -> int:
+    return _decode_payload(cursor)["id"]
+
+def decode_sorted_cursor(cursor: str) -> Tuple[Optional[Union[int, float]], int]:
+    payload = _decode_payload(cursor)
+    if "sort" not in payload or type(payload["sort"]) not in (int, float, type(None)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload["sort"], payload["id"]
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    response: Response,
+    key: InstrumentedAttribute,
+    *,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    sort: Optional[InstrumentedAttribute] = None,
+) -> List[Any]:
+    """
+    Run a list query with OFFSET or keyset pagination on an indexed key.
+
+    Without a cursor the query is paged with skip/limit as before. With a
+    cursor from a previous page, rows are read from just after that key,
+    so deep pages cost the same as the first one. The body stays a plain
+    list; the next cursor and whether more rows exist are returned in the
+    X-Next-Cursor and X-Has-More headers.
+
+    With a numeric sort column, rows are ordered by (sort IS NULL, sort,
+    key): rows whose sort value is NULL come last in either direction,
+    ordered by key. The keyset walk reads the two parts separately, so an
+    index on (sort, key) serves both, and the cursor records which part
+    it is in.
+    """
+    def ordered(query: Select, *columns) -> Select:
+        return query.order_by(*(column.desc() if descending else column.asc() for column in columns))
+
+    def past(column, value):
+        return column < value if descending else column > value
+
+    if sort is None:
+        if cursor:
+            query = query.where(past(key, decode_cursor(cursor)))
+        elif skip:
+            query = query.offset(skip)
+        items = (await db.scalars(ordered(query, key).limit(limit + 1))).all()
+    elif skip and not cursor:
+        query = ordered(query.order_by(sort.is_(None)), sort, key)
+        items = (await db.scalars(query.offset(skip).limit(limit + 1))).all()
+    else:
+        last_sort, last_seen = decode_sorted_cursor(cursor) if cursor else (None, None)
+        items = []
+        if cursor is None or last_sort is not None:
+            sorted_query = query.where(sort.is_not(None))
+            if cursor:
+                # (sort, key) past the cursor, spelled so the index range
+                # starts at the last sort value
+                if descending:
+                    sorted_query = sorted_query.where(sort <= last_sort, or_(sort < last_sort, key < last_seen))
+                else:
+                    sorted_query = sorted_query.where(sort >= last_sort, or_(sort > last_sort, key > last_seen))
+            items = list((await db.scalars(ordered(sorted_query, sort, key).limit(limit + 1))).all())
+        if len(items) <= limit:
+            unsorted_query = query.where(sort.is_(None))
+            if cursor and last_sort is None:
+                unsorted_query = unsorted_query.where(past(key, last_seen))
+            items += (await db.scalars(ordered(unsorted_query, key).limit(limit + 1 - len(items)))).all()
+
+    has_more = len(items) > limit
+    items = items[:limit]
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    if has_more:
+        last = items[-1]
+        response.headers["X-Next-Cursor"] = (
+            encode_cursor(getattr(last, key.key)) if sort is None
+            else encode_sorted_cursor(getattr(last, key.key), getattr(last, sort.key))
+        )
+    return items
@@ -0,0 +1,154 @@
+import mimetypes
+import os
+import re
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match comparison; weak comparison as RFC 9110 requires.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into an inclusive (start, end).
+
+    Returns None when the header should be ignored (multiple ranges or a
+    syntax the server does not support) and raises ValueError when the
+    range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    if size == 0:
+        # No byte of an empty file can be addressed
+        raise ValueError("range not satisfiable")
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+class FileRangeResponse(Response):
+    """
+    Serve a file with ETag, If-None-Match/304, If-Range and single-range
+    206 support.
+
+    The body is sent with the ASGI zero-copy send extension when the
+    server offers it, so the bytes never enter Python; otherwise it is
+    streamed in UPLOAD_CHUNK_SIZE pieces.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        request_headers: Headers,
+        etag: str,
+        filename: Optional[str] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+    ):
+        self.path = path
+        self.background = background
+        self.media_type = media_type or mimetypes.guess_type(filename or path)[0] or "application/octet-stream"
+        size = os.stat(path).st_size
+        self.offset, self.count = 0, size
+
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "cache-control": "private, max-age=0, must-revalidate",
+        }
+        if filename:
+            headers["content-disposition"] = f"inline; filename*=utf-8''{quote(filename)}"
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            self.status_code, self.count = 304, 0
+        else:
+            self.status_code = 200
+            range_header = request_headers.get("range")
+            if_range = request_headers.get("if-range")
+            # A stale If-Range means the client's partial copy is outdated
+            if range_header and (not if_range or if_range.strip() == etag):
+                try:
+                    byte_range = parse_range(range_header, size)
+                except ValueError:
+                    self.status_code, self.count = 416, 0
+                    headers["content-range"] = f"bytes */{size}"
+                    byte_range = None
+                if byte_range is not None:
+                    start, end = byte_range
+                    self.status_code = 206
+                    self.offset, self.count = start, end - start + 1
+                    headers["content-range"] = f"bytes {start}-{end}/{size}"
+            if self.status_code != 304:
+                headers["content-length"] = str(self.count)
+
+        self.init_headers(headers)
+        if self.status_code != 304:
+            self.headers.setdefault("content-type", self.media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if self.count == 0 or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file.fileno(),
+                    "offset": self.offset,
+                    "count": self.count,
+                })
+        else:
+            remaining = self.count
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                while remaining > 0:
+                    chunk = await file.read(min(settings.UPLOAD_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    })
+            if remaining > 0:
+                # File shrank underneath us; end the response cleanly
+                await send({"type": "http.response.body", "body": b""})
+        if self.background is not None:
+            await self.background()
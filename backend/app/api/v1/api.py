@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, properties, tenants, rental_agreements, documents, notifications
+from app.api.v1.endpoints import auth, properties, tenants, rental_agreements, documents, notifications, analytics, search
 
 api_router = APIRouter()
 
@@ -8,4 +8,6 @@ api_router.include_router(properties.router, prefix="/properties", tags=["proper
 api_router.include_router(tenants.router, prefix="/tenants", tags=["tenants"])
 api_router.include_router(rental_agreements.router, prefix="/rental-agreements", tags=["rental-agreements"])
 api_router.include_router(documents.router, prefix="/documents", tags=["documents"])
-api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"]) 
\ No newline at end of file
+api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"]) 
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
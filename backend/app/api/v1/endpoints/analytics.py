@@ -0,0 +1,32 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analytics import get_portfolio_summary
+from app.core.database import get_async_db
+from app.core.principal import Principal
+from app.models.user import User
+from app.schemas.analytics import PortfolioSummary as PortfolioSummarySchema
+from app.api.deps import get_current_principal
+from app.api.ownership import is_admin
+
+router = APIRouter()
+
+@router.get("/portfolio", response_model=PortfolioSummarySchema)
+async def get_portfolio(
+    owner_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Occupancy, rent roll, vacancy by city and upcoming expirations for the
+    current user's portfolio (admins may pass owner_id).
+    """
+    if owner_id is not None and owner_id != current_user.id and not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if owner_id is not None and owner_id != current_user.id:
+        if await db.scalar(select(User.id).where(User.id == owner_id)) is None:
+            raise HTTPException(status_code=404, detail="User not found")
+    
+    return await get_portfolio_summary(db, owner_id or current_user.id)
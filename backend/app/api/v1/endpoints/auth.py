@@ -2,11 +2,13 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token, get_password_hash, verify_password
-from app.core.database import get_db
+from app.core.security import create_access_token
+from app.core.hashing import password_hasher
+from app.core.database import get_async_db
 from app.models.user import User
 from app.schemas.user import UserCreate, User as UserSchema
 from app.schemas.token import Token
@@ -14,12 +16,12 @@ from app.schemas.token import Token
 router = APIRouter()
 
 @router.post("/register", response_model=UserSchema)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> Any:
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)) -> Any:
     """
     Register a new user.
     """
     # Check if user already exists
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = await db.scalar(select(User).where(User.email == user_in.email))
     if user:
         raise HTTPException(
             status_code=400,
@@ -29,27 +31,32 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> Any:
     # Create new user
     user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await password_hasher.hash(user_in.password),
         full_name=user_in.full_name,
         phone=user_in.phone,
         role=user_in.role
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     return user
 
 @router.post("/login", response_model=Token)
-def login(
-    db: Session = Depends(get_db),
+async def login(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests.
     """
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    is_valid, new_hash = False, None
+    if user:
+        is_valid, new_hash = await password_hasher.verify_and_update(
+            form_data.password, user.hashed_password
+        )
+    if not user or not is_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -61,6 +68,11 @@ def login(
             detail="Inactive user"
         )
     
+    # Transparently move the stored hash to the current BCRYPT_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": create_access_token(
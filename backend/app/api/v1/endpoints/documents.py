@@ -1,72 +1,92 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, UploadFile, File
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-import uuid
 from datetime import datetime
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.config import settings
-from app.models.user import User
+from app.storage import UploadTooLarge, get_storage
+from app.storage.blobs import acquire_blob
+from app.storage.documents import ReleasedFiles, release_document, remove_released
+from app.storage.variants import generate_variants, has_variants
+from app.core.principal import Principal
 from app.models.document import Document
+from app.models.document_variant import DocumentVariant
 from app.models.property import Property
-from app.api.deps import get_current_user
+from app.schemas.document import Document as DocumentSchema
+from app.api.conditional import conditional_collection
+from app.api.deps import get_current_principal
+from app.api.exports import ExportFormat, export_response, export_select
+from app.api.ownership import owned_by, scoped
+from app.api.pagination import paginate
+from app.api.responses import FileRangeResponse
 
 router = APIRouter()
 
-@router.get("/", response_model=List[dict])
-def get_documents(
+def variant_file_name(document: Document, variant: DocumentVariant) -> str:
+    return f"{os.path.splitext(document.file_name)[0]}-{variant.name}.webp"
+
+@router.get("/", response_model=List[DocumentSchema])
+async def get_documents(
+    request: Request,
+    response: Response,
     property_id: int = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Retrieve documents.
     """
-    query = db.query(Document)
+    query = select(Document)
     
     if property_id:
         # Verify property ownership
-        property_obj = db.query(Property).filter(Property.id == property_id).first()
-        if not property_obj:
-            raise HTTPException(status_code=404, detail="Property not found")
-        
-        if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not enough permissions")
+        await scoped(db, Property, current_user, property_id)
         
-        query = query.filter(Document.property_id == property_id)
+        query = query.where(Document.property_id == property_id)
     else:
         # Get documents from properties owned by current user
-        if current_user.role.value != "admin":
-            property_ids = [p.id for p in db.query(Property).filter(Property.owner_id == current_user.id).all()]
-            query = query.filter(Document.property_id.in_(property_ids))
+        query = owned_by(query, Document, current_user)
     
-    documents = query.offset(skip).limit(limit).all()
-    return documents
+    items = await paginate(
+        db, query, response, Document.id, skip=skip, limit=limit, cursor=cursor
+    )
+    return conditional_collection(request, response, items) or items
+
+@router.get("/export")
+async def export_documents(
+    format: ExportFormat = "ndjson",
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Export the current user's document metadata as NDJSON or CSV.
+    """
+    query = owned_by(export_select(Document, DocumentSchema), Document, current_user)
+    return export_response(query.order_by(Document.id), format, "documents")
 
 @router.post("/upload")
 async def upload_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    background_tasks: BackgroundTasks,
     property_id: int,
     document_type: str,
     title: str,
     description: str = None,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Upload a document.
     """
     # Verify property ownership
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
-    
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await scoped(db, Property, current_user, property_id)
     
     # Validate file type
     file_extension = os.path.splitext(file.filename)[1].lower()
@@ -76,23 +96,22 @@ async def upload_document(
             detail=f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
         )
     
-    # Validate file size
+    # Validate file size; the declared size is not always sent, so the
+    # limit is enforced again while the file is streamed to disk
+    too_large = HTTPException(
+        status_code=400,
+        detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE / (1024*1024)}MB"
+    )
     if file.size and file.size > settings.MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE / (1024*1024)}MB"
-        )
-    
-    # Generate unique filename
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
+        raise too_large
     
     # Save file
+    storage = get_storage()
     try:
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-    except Exception as e:
+        stored = await storage.save(file)
+    except UploadTooLarge:
+        raise too_large
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Error saving file: {str(e)}")
     
     # Create document record
@@ -100,16 +119,30 @@ async def upload_document(
         title=title,
         description=description,
         file_name=file.filename,
-        file_path=file_path,
-        file_size=len(content),
+        file_path=stored.path,
+        file_size=stored.size,
         file_type=file.content_type,
+        sha256=stored.sha256,
         document_type=document_type,
         property_id=property_id
     )
     
-    db.add(document)
-    db.commit()
-    db.refresh(document)
+    # The blob row stays locked until commit, so a concurrent delete of
+    # the last other reference cannot remove the file once it is published
+    try:
+        await acquire_blob(db, stored.sha256, stored.size)
+        await storage.publish(stored)
+        db.add(document)
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        await storage.discard(stored)
+        raise
+    await db.refresh(document)
+    
+    # Thumbnails and web-sized copies are rendered after the response is sent
+    if has_variants(document):
+        background_tasks.add_task(generate_variants, document.id)
     
     return {
         "message": "Document uploaded successfully",
@@ -123,23 +156,23 @@ async def upload_document(
     }
 
 @router.get("/{document_id}")
-def get_document(
+async def get_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     document_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get document by ID.
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    
-    # Check if user has access to this document's property
-    property_obj = db.query(Property).filter(Property.id == document.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    document = await scoped(db, Document, current_user, document_id)
+    storage = get_storage()
+    content_url = f"{settings.API_V1_STR}/documents/{document.id}/content"
+    variants = (await db.scalars(
+        select(DocumentVariant)
+        .where(DocumentVariant.document_id == document.id)
+        .order_by(DocumentVariant.id)
+    )).all()
     
     return {
         "id": document.id,
@@ -151,36 +184,94 @@ def get_document(
         "document_type": document.document_type,
         "is_verified": document.is_verified,
         "created_at": document.created_at,
-        "file_url": f"/uploads/{os.path.basename(document.file_path)}"
+        "file_url": await storage.url_for(
+            document.file_path, document.file_name, document.file_type
+        ) or content_url,
+        "variants": [
+            {
+                "name": variant.name,
+                "width": variant.width,
+                "height": variant.height,
+                "file_size": variant.file_size,
+                "file_type": variant.file_type,
+                "file_url": await storage.url_for(
+                    variant.file_path, variant_file_name(document, variant), variant.file_type
+                ) or f"{content_url}?variant={variant.name}"
+            }
+            for variant in variants
+        ]
     }
 
+@router.get("/{document_id}/content")
+async def get_document_content(
+    *,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    document_id: int,
+    variant: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Download a document's file, or one of its image variants, with Range
+    and conditional GET support.
+    """
+    document = await scoped(db, Document, current_user, document_id)
+    file_path, file_name, file_type, sha256 = (
+        document.file_path, document.file_name, document.file_type, document.sha256
+    )
+    
+    if variant:
+        stored_variant = await db.scalar(
+            select(DocumentVariant).where(
+                DocumentVariant.document_id == document.id,
+                DocumentVariant.name == variant
+            )
+        )
+        if stored_variant is None:
+            raise HTTPException(status_code=404, detail="Document variant not found")
+        file_path, file_name, file_type, sha256 = (
+            stored_variant.file_path,
+            variant_file_name(document, stored_variant),
+            stored_variant.file_type,
+            stored_variant.sha256
+        )
+    
+    # Remote backends hand out a short-lived direct URL instead
+    url = await get_storage().url_for(file_path, file_name, file_type)
+    if url:
+        return RedirectResponse(url, status_code=307)
+    
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Document file not found")
+    
+    # Content-addressed files never change; older files are identified by
+    # their modification time and size
+    etag = f'"{sha256}"' if sha256 else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    return FileRangeResponse(
+        file_path,
+        request.headers,
+        etag=etag,
+        filename=file_name,
+        media_type=file_type,
+    )
+
 @router.delete("/{document_id}")
-def delete_document(
+async def delete_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     document_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Delete document.
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
+    document = await scoped(db, Document, current_user, document_id)
     
-    # Check if user has access to this document's property
-    property_obj = db.query(Property).filter(Property.id == document.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    released = ReleasedFiles()
+    await release_document(db, document, released)
+    await db.commit()
+    await remove_released(db, released)
     
-    # Delete file from filesystem
-    try:
-        if os.path.exists(document.file_path):
-            os.remove(document.file_path)
-    except Exception as e:
-        # Log error but continue with database deletion
-        print(f"Error deleting file {document.file_path}: {str(e)}")
-    
-    db.delete(document)
-    db.commit()
     return {"message": "Document deleted successfully"} 
\ No newline at end of file
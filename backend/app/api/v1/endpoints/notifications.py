@@ -1,111 +1,327 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
+import asyncio
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from datetime import datetime, timezone
 
-from app.core.database import get_db
-from app.models.user import User
-from app.models.notification import Notification, NotificationStatus, NotificationType
-from app.schemas.notification import NotificationCreate, Notification as NotificationSchema
-from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.events import Subscription, broker
+from app.core.principal import Principal
+from app.delivery.signals import record_unread_change
+from app.models.notification import Notification, NotificationStatus, NotificationType, UNREAD_STATUSES
+from app.models.notification_counter import NotificationCounter
+from app.schemas.notification import (
+    NotificationCreate, Notification as NotificationSchema, NotificationIds, NotificationBulkResult
+)
+from app.api.conditional import conditional_collection
+from app.api.deps import get_current_principal, optional_oauth2_scheme, resolve_principal
+from app.api.pagination import paginate
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+async def count_unread(db: AsyncSession, user_id: int) -> int:
+    unread_count = await db.scalar(select(NotificationCounter.unread_count).where(
+        NotificationCounter.user_id == user_id
+    ))
+    if unread_count is not None and unread_count < 0:
+        # A write bypassed the counter hooks; count the rows until the
+        # repair job (app/jobs/unread_counts.py) corrects the counter
+        logger.warning("Unread counter of user %s is %s; recounting", user_id, unread_count)
+        unread_count = await db.scalar(select(func.count(Notification.id)).where(
+            Notification.user_id == user_id,
+            Notification.status.in_(UNREAD_STATUSES)
+        ))
+    return unread_count or 0
+
+async def publish_unread_count(db: AsyncSession, user_id: int) -> None:
+    broker.publish(user_id, {"type": "unread_count", "unread_count": await count_unread(db, user_id)})
+
+async def open_stream(token: Optional[str]) -> Tuple[Subscription, int]:
+    """
+    Authenticate a stream and subscribe it before reading the unread
+    count, so no change between the two is missed. Uses its own short
+    session: a stream must not hold a connection while it is open.
+    """
+    async with AsyncSessionLocal() as db:
+        principal = await resolve_principal(db, token)
+        subscription = broker.subscribe(principal.id)
+        try:
+            unread_count = await count_unread(db, principal.id)
+        except Exception:
+            subscription.close()
+            raise
+    return subscription, unread_count
+
+def format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
 @router.get("/", response_model=List[NotificationSchema])
-def get_notifications(
+async def get_notifications(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Retrieve notifications for current user.
     """
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
-    return notifications
+    # Newest first; ids grow with created_at, so the primary key doubles as
+    # the keyset column
+    query = select(Notification).where(Notification.user_id == current_user.id)
+    items = await paginate(
+        db, query, response, Notification.id,
+        skip=skip, limit=limit, cursor=cursor, descending=True
+    )
+    return conditional_collection(request, response, items) or items
 
 @router.get("/unread")
-def get_unread_notifications(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_unread_notifications(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get unread notifications count.
     """
-    unread_count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.status == NotificationStatus.PENDING
-    ).count()
+    unread_count = await count_unread(db, current_user.id)
     
     return {"unread_count": unread_count}
 
+@router.get("/stream")
+async def stream_notifications(
+    token: Optional[str] = None,
+    header_token: Optional[str] = Depends(optional_oauth2_scheme)
+) -> Any:
+    """
+    Server-sent events with new notifications and unread count changes.
+
+    EventSource cannot send headers, so the token may also be passed as
+    ?token=.
+    """
+    subscription, unread_count = await open_stream(header_token or token)
+    
+    async def events():
+        try:
+            yield format_sse({"type": "unread_count", "unread_count": unread_count})
+            while True:
+                event = await subscription.get(settings.REALTIME_HEARTBEAT_INTERVAL)
+                yield ": keep-alive\n\n" if event is None else format_sse(event)
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also runs when the client disconnects before the first event
+        background=BackgroundTask(subscription.close),
+    )
+
+@router.websocket("/stream")
+async def notifications_websocket(websocket: WebSocket, token: Optional[str] = None):
+    """
+    WebSocket variant of /stream; pass the token as ?token=.
+    """
+    try:
+        subscription, unread_count = await open_stream(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    async def send_events():
+        await websocket.send_json({"type": "unread_count", "unread_count": unread_count})
+        while True:
+            event = await subscription.get(settings.REALTIME_HEARTBEAT_INTERVAL)
+            await websocket.send_json(event or {"type": "ping"})
+    
+    async def wait_for_disconnect():
+        # Client messages are ignored; reading is how a disconnect is noticed
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    
+    try:
+        await websocket.accept()
+        tasks = [asyncio.create_task(send_events()), asyncio.create_task(wait_for_disconnect())]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+    finally:
+        subscription.close()
+
 @router.post("/{notification_id}/read")
-def mark_notification_read(
+async def mark_notification_read(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     notification_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Mark notification as read.
     """
-    notification = db.query(Notification).filter(
+    # Conditional, so concurrent requests for the same notification
+    # decrement the unread counter once
+    result = await db.execute(update(Notification).where(
         Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-    
-    if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
+        Notification.user_id == current_user.id,
+        Notification.status.in_(UNREAD_STATUSES)
+    ).values({
+        Notification.status: NotificationStatus.READ,
+        Notification.read_at: datetime.utcnow()
+    }))
     
-    notification.status = NotificationStatus.READ
-    notification.read_at = datetime.utcnow()
+    if result.rowcount == 0:
+        notification_exists = await db.scalar(select(Notification.id).where(
+            Notification.id == notification_id,
+            Notification.user_id == current_user.id
+        ))
+        if not notification_exists:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        return {"message": "Notification marked as read"}
     
-    db.add(notification)
-    db.commit()
-    db.refresh(notification)
+    record_unread_change(db, current_user.id, -result.rowcount)
+    await db.commit()
+    await publish_unread_count(db, current_user.id)
     
     return {"message": "Notification marked as read"}
 
 @router.post("/mark-all-read")
-def mark_all_notifications_read(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def mark_all_notifications_read(
+    before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
-    Mark all notifications as read.
+    Mark all notifications as read, optionally only those created at or
+    before a timestamp (e.g. when the client loaded its inbox).
     """
-    db.query(Notification).filter(
+    query = update(Notification).where(
         Notification.user_id == current_user.id,
-        Notification.status == NotificationStatus.PENDING
-    ).update({
+        Notification.status.in_(UNREAD_STATUSES)
+    )
+    if before is not None:
+        if before.tzinfo is not None:
+            before = before.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.where(Notification.created_at <= before)
+    result = await db.execute(query.values({
         Notification.status: NotificationStatus.READ,
         Notification.read_at: datetime.utcnow()
-    })
+    }))
     
-    db.commit()
+    record_unread_change(db, current_user.id, -result.rowcount)
+    await db.commit()
+    await publish_unread_count(db, current_user.id)
     return {"message": "All notifications marked as read"}
 
+@router.post("/batch-read", response_model=NotificationBulkResult)
+async def mark_notifications_read(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    batch: NotificationIds,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Mark several notifications as read, with an outcome per id.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    result = await db.execute(update(Notification).where(
+        Notification.id.in_(ids),
+        Notification.user_id == current_user.id,
+        Notification.status.in_(UNREAD_STATUSES)
+    ).values({
+        Notification.status: NotificationStatus.READ,
+        Notification.read_at: datetime.utcnow()
+    }).returning(Notification.id))
+    marked = set(result.scalars().all())
+    
+    unchanged = [notification_id for notification_id in ids if notification_id not in marked]
+    already_read = set()
+    if unchanged:
+        already_read = set((await db.scalars(select(Notification.id).where(
+            Notification.id.in_(unchanged),
+            Notification.user_id == current_user.id
+        ))).all())
+    
+    record_unread_change(db, current_user.id, -len(marked))
+    await db.commit()
+    unread_count = await count_unread(db, current_user.id)
+    if marked:
+        broker.publish(current_user.id, {"type": "unread_count", "unread_count": unread_count})
+    
+    return {
+        "results": [
+            {
+                "id": notification_id,
+                "outcome": "read" if notification_id in marked
+                else "already_read" if notification_id in already_read
+                else "not_found"
+            }
+            for notification_id in ids
+        ],
+        "unread_count": unread_count,
+    }
+
+@router.post("/batch-delete", response_model=NotificationBulkResult)
+async def delete_notifications(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    batch: NotificationIds,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Delete several notifications, with an outcome per id.
+    """
+    ids = list(dict.fromkeys(batch.ids))
+    result = await db.execute(delete(Notification).where(
+        Notification.id.in_(ids),
+        Notification.user_id == current_user.id
+    ).returning(Notification.id, Notification.status))
+    deleted = dict(result.all())
+    
+    was_unread = sum(1 for deleted_status in deleted.values() if deleted_status in UNREAD_STATUSES)
+    record_unread_change(db, current_user.id, -was_unread)
+    await db.commit()
+    unread_count = await count_unread(db, current_user.id)
+    if was_unread:
+        broker.publish(current_user.id, {"type": "unread_count", "unread_count": unread_count})
+    
+    return {
+        "results": [
+            {"id": notification_id, "outcome": "deleted" if notification_id in deleted else "not_found"}
+            for notification_id in ids
+        ],
+        "unread_count": unread_count,
+    }
+
 @router.delete("/{notification_id}")
-def delete_notification(
+async def delete_notification(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     notification_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Delete notification.
     """
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ))
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
-    db.delete(notification)
-    db.commit()
+    await db.delete(notification)
+    await db.commit()
+    await publish_unread_count(db, current_user.id)
     
     return {"message": "Notification deleted successfully"} 
\ No newline at end of file
@@ -1,35 +1,81 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.user import User
+from app.cache import cached
+from app.core.database import get_async_db
+from app.core.principal import Principal
+from app.imports import detect_format, import_properties
+from app.models.document import Document
 from app.models.property import Property
 from app.models.tenant import Tenant
-from app.schemas.property import PropertyCreate, PropertyUpdate, Property as PropertySchema
+from app.schemas.property import (
+    PropertyCreate, PropertyUpdate, Property as PropertySchema, PropertyFilters, PropertyImportResult
+)
 from app.schemas.tenant import TenantCreate
-from app.api.deps import get_current_user
+from app.storage.documents import ReleasedFiles, release_document, remove_released
+from app.api.conditional import conditional_collection, conditional_resource
+from app.api.deps import get_current_principal, query_model
+from app.api.exports import ExportFormat, export_response, export_select
+from app.api.ownership import owned_by, scoped
+from app.api.pagination import paginate
 
 router = APIRouter()
 
+@cached(schema=PropertySchema, tags=lambda property_id, **_: [f"property:{property_id}"])
+async def read_property(db: AsyncSession, current_user: Principal, property_id: int) -> Property:
+    return await scoped(db, Property, current_user, property_id)
+
 @router.get("/", response_model=List[PropertySchema])
-def get_properties(
+async def get_properties(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    filters: PropertyFilters = Depends(query_model(PropertyFilters)),
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
-    Retrieve properties.
+    Retrieve properties, optionally filtered and sorted.
     """
-    properties = db.query(Property).offset(skip).limit(limit).all()
-    return properties
+    query = select(Property)
+    for field in ("city", "state", "zip_code", "property_type", "bedrooms", "is_available"):
+        value = getattr(filters, field)
+        if value is not None:
+            query = query.where(getattr(Property, field) == value)
+    if filters.min_rent is not None:
+        query = query.where(Property.monthly_rent >= filters.min_rent)
+    if filters.max_rent is not None:
+        query = query.where(Property.monthly_rent <= filters.max_rent)
+
+    descending = filters.sort.startswith("-")
+    sort = None if filters.sort.lstrip("-") == "id" else Property.monthly_rent
+    items = await paginate(
+        db, query, response, Property.id,
+        skip=skip, limit=limit, cursor=cursor, descending=descending, sort=sort,
+    )
+    return conditional_collection(request, response, items) or items
+
+@router.get("/export")
+async def export_properties(
+    format: ExportFormat = "ndjson",
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Export the current user's properties as NDJSON or CSV.
+    """
+    query = owned_by(export_select(Property, PropertySchema), Property, current_user)
+    return export_response(query.order_by(Property.id), format, "properties")
 
 @router.post("/", response_model=PropertySchema)
-def create_property(
+async def create_property(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     property_in: PropertyCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Create new property.
@@ -39,8 +85,8 @@ def create_property(
         owner_id=current_user.id
     )
     db.add(property_obj)
-    db.commit()
-    db.refresh(property_obj)
+    await db.commit()
+    await db.refresh(property_obj)
 
     # If tenant details are provided, create the tenant and link to property
     if property_in.tenant:
@@ -48,76 +94,85 @@ def create_property(
         tenant_data["property_id"] = property_obj.id
         tenant_obj = Tenant(**tenant_data)
         db.add(tenant_obj)
-        db.commit()
-        db.refresh(tenant_obj)
+        await db.commit()
+        await db.refresh(tenant_obj)
 
     return property_obj
 
+@router.post("/import", response_model=PropertyImportResult)
+async def import_properties_file(
+    *,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Import properties from a CSV or NDJSON file.
+
+    CSV columns are PropertyCreate fields, plus tenant_<field> columns for
+    an optional tenant; NDJSON rows are PropertyCreate objects. Invalid
+    rows are skipped and listed by line number.
+    """
+    file_format = format or detect_format(file.filename, file.content_type)
+    if file_format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="File must be CSV or NDJSON")
+    
+    return await run_in_threadpool(import_properties, file.file, file_format, current_user.id)
+
 @router.get("/{property_id}", response_model=PropertySchema)
-def get_property(
+async def get_property(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     property_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get property by ID.
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
+    property_obj = await read_property(db, current_user, property_id)
     
-    # Check if user has access to this property
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
-    
-    return property_obj
+    return conditional_resource(request, response, property_obj) or property_obj
 
 @router.put("/{property_id}", response_model=PropertySchema)
-def update_property(
+async def update_property(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     property_id: int,
     property_in: PropertyUpdate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Update property.
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
-    
-    # Check if user has access to this property
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    property_obj = await scoped(db, Property, current_user, property_id)
     
     for field, value in property_in.dict(exclude_unset=True).items():
         setattr(property_obj, field, value)
     
     db.add(property_obj)
-    db.commit()
-    db.refresh(property_obj)
+    await db.commit()
+    await db.refresh(property_obj)
     return property_obj
 
 @router.delete("/{property_id}")
-def delete_property(
+async def delete_property(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     property_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Delete property.
     """
-    property_obj = db.query(Property).filter(Property.id == property_id).first()
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
-    
-    # Check if user has access to this property
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    property_obj = await scoped(db, Property, current_user, property_id)
     
-    db.delete(property_obj)
-    db.commit()
+    released = ReleasedFiles()
+    documents = await db.scalars(select(Document).where(Document.property_id == property_id))
+    for document in documents.all():
+        await release_document(db, document, released)
+    await db.delete(property_obj)
+    await db.commit()
+    await remove_released(db, released)
     return {"message": "Property deleted successfully"} 
\ No newline at end of file
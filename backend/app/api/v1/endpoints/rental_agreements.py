@@ -1,52 +1,77 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
 
-from app.core.database import get_db
-from app.models.user import User
+from app.cache import cached
+from app.core.database import get_async_db
+from app.core.principal import Principal
 from app.models.rental_agreement import RentalAgreement, AgreementStatus
 from app.models.property import Property
 from app.schemas.rental_agreement import RentalAgreementCreate, RentalAgreementUpdate, RentalAgreement as RentalAgreementSchema
-from app.api.deps import get_current_user
+from app.api.conditional import conditional_collection, conditional_resource
+from app.api.deps import get_current_principal
+from app.api.exports import ExportFormat, export_response, export_select
+from app.api.ownership import owned_by, scoped
+from app.api.pagination import paginate
 
 router = APIRouter()
 
+@cached(schema=RentalAgreementSchema, tags=lambda agreement_id, **_: [f"rental_agreement:{agreement_id}"])
+async def read_rental_agreement(db: AsyncSession, current_user: Principal, agreement_id: int) -> RentalAgreement:
+    return await scoped(db, RentalAgreement, current_user, agreement_id)
+
 @router.get("/", response_model=List[RentalAgreementSchema])
-def get_rental_agreements(
+async def get_rental_agreements(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Retrieve rental agreements.
     """
-    if current_user.role.value == "admin":
-        agreements = db.query(RentalAgreement).offset(skip).limit(limit).all()
-    else:
-        # Get agreements from properties owned by current user
-        property_ids = [p.id for p in db.query(Property).filter(Property.owner_id == current_user.id).all()]
-        agreements = db.query(RentalAgreement).filter(RentalAgreement.property_id.in_(property_ids)).offset(skip).limit(limit).all()
-    return agreements
+    # Non-admins only see agreements from properties they own
+    query = owned_by(select(RentalAgreement), RentalAgreement, current_user)
+    items = await paginate(
+        db, query, response, RentalAgreement.id, skip=skip, limit=limit, cursor=cursor
+    )
+    return conditional_collection(request, response, items) or items
+
+@router.get("/export")
+async def export_rental_agreements(
+    format: ExportFormat = "ndjson",
+    expiring_within_days: Optional[int] = None,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Export rental agreements as NDJSON or CSV, optionally only active
+    ones ending within a number of days.
+    """
+    query = owned_by(export_select(RentalAgreement, RentalAgreementSchema), RentalAgreement, current_user)
+    if expiring_within_days is not None:
+        query = query.where(
+            RentalAgreement.status == AgreementStatus.ACTIVE,
+            RentalAgreement.end_date <= datetime.utcnow() + timedelta(days=expiring_within_days)
+        )
+    return export_response(query.order_by(RentalAgreement.id), format, "rental-agreements")
 
 @router.post("/", response_model=RentalAgreementSchema)
-def create_rental_agreement(
+async def create_rental_agreement(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     agreement_in: RentalAgreementCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Create new rental agreement.
     """
     # Verify property ownership
-    property_obj = db.query(Property).filter(Property.id == agreement_in.property_id).first()
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
-    
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    property_obj = await scoped(db, Property, current_user, agreement_in.property_id)
     
     # Generate unique agreement number
     agreement_number = f"AG-{datetime.now().strftime('%Y%m%d')}-{property_obj.id:04d}"
@@ -56,91 +81,72 @@ def create_rental_agreement(
         agreement_number=agreement_number
     )
     db.add(agreement)
-    db.commit()
-    db.refresh(agreement)
+    await db.commit()
+    await db.refresh(agreement)
     return agreement
 
 @router.get("/{agreement_id}", response_model=RentalAgreementSchema)
-def get_rental_agreement(
+async def get_rental_agreement(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     agreement_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get rental agreement by ID.
     """
-    agreement = db.query(RentalAgreement).filter(RentalAgreement.id == agreement_id).first()
-    if not agreement:
-        raise HTTPException(status_code=404, detail="Rental agreement not found")
-    
-    # Check if user has access to this agreement's property
-    property_obj = db.query(Property).filter(Property.id == agreement.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    agreement = await read_rental_agreement(db, current_user, agreement_id)
     
-    return agreement
+    return conditional_resource(request, response, agreement) or agreement
 
 @router.put("/{agreement_id}", response_model=RentalAgreementSchema)
-def update_rental_agreement(
+async def update_rental_agreement(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     agreement_id: int,
     agreement_in: RentalAgreementUpdate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Update rental agreement.
     """
-    agreement = db.query(RentalAgreement).filter(RentalAgreement.id == agreement_id).first()
-    if not agreement:
-        raise HTTPException(status_code=404, detail="Rental agreement not found")
-    
-    # Check if user has access to this agreement's property
-    property_obj = db.query(Property).filter(Property.id == agreement.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    agreement = await scoped(db, RentalAgreement, current_user, agreement_id)
     
     for field, value in agreement_in.dict(exclude_unset=True).items():
         setattr(agreement, field, value)
     
     db.add(agreement)
-    db.commit()
-    db.refresh(agreement)
+    await db.commit()
+    await db.refresh(agreement)
     return agreement
 
 @router.post("/{agreement_id}/sign")
-def sign_rental_agreement(
+async def sign_rental_agreement(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     agreement_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Sign a rental agreement.
     """
-    agreement = db.query(RentalAgreement).filter(RentalAgreement.id == agreement_id).first()
-    if not agreement:
-        raise HTTPException(status_code=404, detail="Rental agreement not found")
-    
-    # Check if user has access to this agreement's property
-    property_obj = db.query(Property).filter(Property.id == agreement.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    agreement = await scoped(db, RentalAgreement, current_user, agreement_id)
     
     agreement.status = AgreementStatus.ACTIVE
     agreement.signed_at = datetime.utcnow()
     
     db.add(agreement)
-    db.commit()
-    db.refresh(agreement)
+    await db.commit()
+    await db.refresh(agreement)
     
     return {"message": "Rental agreement signed successfully", "agreement": agreement}
 
 @router.get("/expiring-soon")
-def get_expiring_agreements(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+async def get_expiring_agreements(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get rental agreements expiring soon (within 30 days).
@@ -149,17 +155,10 @@ def get_expiring_agreements(
     
     expiry_date = datetime.utcnow() + timedelta(days=30)
     
-    if current_user.role.value == "admin":
-        agreements = db.query(RentalAgreement).filter(
-            RentalAgreement.end_date <= expiry_date,
-            RentalAgreement.status == AgreementStatus.ACTIVE
-        ).all()
-    else:
-        property_ids = [p.id for p in db.query(Property).filter(Property.owner_id == current_user.id).all()]
-        agreements = db.query(RentalAgreement).filter(
-            RentalAgreement.property_id.in_(property_ids),
-            RentalAgreement.end_date <= expiry_date,
-            RentalAgreement.status == AgreementStatus.ACTIVE
-        ).all()
+    query = select(RentalAgreement).where(
+        RentalAgreement.end_date <= expiry_date,
+        RentalAgreement.status == AgreementStatus.ACTIVE
+    )
+    agreements = await db.scalars(owned_by(query, RentalAgreement, current_user))
     
-    return {"expiring_agreements": agreements} 
\ No newline at end of file
+    return {"expiring_agreements": agreements.all()} 
\ No newline at end of file
@@ -0,0 +1,29 @@
+from typing import Any, List, Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import cached
+from app.core.database import get_async_db
+from app.core.principal import Principal
+from app.schemas.search import SearchResult
+from app.search import search
+from app.api.deps import get_current_principal
+from app.api.ownership import is_admin
+
+router = APIRouter()
+
+@router.get("/", response_model=List[SearchResult])
+@cached(schema=List[SearchResult])
+async def search_records(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[Literal["property", "tenant", "document"]] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Search properties, tenants and documents of the current user's
+    properties, best matches first.
+    """
+    owner_id = None if is_admin(current_user) else current_user.id
+    return await search(db, q, owner_id, kind=kind, limit=limit)
@@ -1,120 +1,122 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.models.user import User
+from app.cache import cached
+from app.core.database import get_async_db
+from app.core.principal import Principal
 from app.models.tenant import Tenant
 from app.models.property import Property
 from app.schemas.tenant import TenantCreate, TenantUpdate, Tenant as TenantSchema
-from app.api.deps import get_current_user
+from app.api.conditional import conditional_collection, conditional_resource
+from app.api.deps import get_current_principal
+from app.api.exports import ExportFormat, export_response, export_select
+from app.api.ownership import owned_by, scoped
+from app.api.pagination import paginate
 
 router = APIRouter()
 
+@cached(schema=TenantSchema, tags=lambda tenant_id, **_: [f"tenant:{tenant_id}"])
+async def read_tenant(db: AsyncSession, current_user: Principal, tenant_id: int) -> Tenant:
+    return await scoped(db, Tenant, current_user, tenant_id)
+
 @router.get("/", response_model=List[TenantSchema])
-def get_tenants(
+async def get_tenants(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Retrieve tenants.
     """
-    tenants = db.query(Tenant).offset(skip).limit(limit).all()
-    return tenants
+    items = await paginate(
+        db, select(Tenant), response, Tenant.id, skip=skip, limit=limit, cursor=cursor
+    )
+    return conditional_collection(request, response, items) or items
+
+@router.get("/export")
+async def export_tenants(
+    format: ExportFormat = "ndjson",
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Export tenants of the current user's properties as NDJSON or CSV.
+    """
+    query = owned_by(export_select(Tenant, TenantSchema), Tenant, current_user)
+    return export_response(query.order_by(Tenant.id), format, "tenants")
 
 @router.post("/", response_model=TenantSchema)
-def create_tenant(
+async def create_tenant(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     tenant_in: TenantCreate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Create new tenant.
     """
     # Verify property ownership
-    property_obj = db.query(Property).filter(Property.id == tenant_in.property_id).first()
-    if not property_obj:
-        raise HTTPException(status_code=404, detail="Property not found")
-    
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    await scoped(db, Property, current_user, tenant_in.property_id)
     
     tenant = Tenant(**tenant_in.dict())
     db.add(tenant)
-    db.commit()
-    db.refresh(tenant)
+    await db.commit()
+    await db.refresh(tenant)
     return tenant
 
 @router.get("/{tenant_id}", response_model=TenantSchema)
-def get_tenant(
+async def get_tenant(
     *,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     tenant_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get tenant by ID.
     """
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    if not tenant:
-        raise HTTPException(status_code=404, detail="Tenant not found")
-    
-    # Check if user has access to this tenant's property
-    property_obj = db.query(Property).filter(Property.id == tenant.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    tenant = await read_tenant(db, current_user, tenant_id)
     
-    return tenant
+    return conditional_resource(request, response, tenant) or tenant
 
 @router.put("/{tenant_id}", response_model=TenantSchema)
-def update_tenant(
+async def update_tenant(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     tenant_id: int,
     tenant_in: TenantUpdate,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Update tenant.
     """
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    if not tenant:
-        raise HTTPException(status_code=404, detail="Tenant not found")
-    
-    # Check if user has access to this tenant's property
-    property_obj = db.query(Property).filter(Property.id == tenant.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    tenant = await scoped(db, Tenant, current_user, tenant_id)
     
     for field, value in tenant_in.dict(exclude_unset=True).items():
         setattr(tenant, field, value)
     
     db.add(tenant)
-    db.commit()
-    db.refresh(tenant)
+    await db.commit()
+    await db.refresh(tenant)
     return tenant
 
 @router.delete("/{tenant_id}")
-def delete_tenant(
+async def delete_tenant(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     tenant_id: int,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Delete tenant.
     """
-    tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
-    if not tenant:
-        raise HTTPException(status_code=404, detail="Tenant not found")
-    
-    # Check if user has access to this tenant's property
-    property_obj = db.query(Property).filter(Property.id == tenant.property_id).first()
-    if current_user.role.value != "admin" and property_obj.owner_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    tenant = await scoped(db, Tenant, current_user, tenant_id)
     
-    db.delete(tenant)
-    db.commit()
+    await db.delete(tenant)
+    await db.commit()
     return {"message": "Tenant deleted successfully"} 
\ No newline at end of file
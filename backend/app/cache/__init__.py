@@ -0,0 +1,13 @@
+# Read-through cache for endpoint handlers and query functions, in Redis
+# when CACHE_REDIS_ENABLED and in process otherwise, with tag invalidation
+# on commit. Without Redis it is off unless CACHE_ENABLED is set, since an
+# in-process cache is only safe with a single worker.
+from app.cache.backends import get_backend
+from app.cache.decorator import cached, scope_tag
+from app.cache import signals  # noqa: F401  invalidates on committed row changes
+
+__all__ = [
+    "get_backend",
+    "cached",
+    "scope_tag"
+]
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import redis
+import redis.asyncio
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Entries are invalidated by tag without tracking which keys carry a tag.
+# A clock counts invalidations; an entry remembers the clock value read
+# before its value was computed, and each tag the clock value of its last
+# invalidation. An entry is current while none of its tags was
+# invalidated after it was computed.
+
+class MemoryBackend:
+    """
+    Per-process cache: a bounded LRU of entries and of tag clocks.
+
+    A tag clock evicted from the LRU is remembered as the highest evicted
+    value, which can only make entries look older, never fresher.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self._entries = TTLCache(maxsize, ttl)
+        self._tags: "OrderedDict[str, int]" = OrderedDict()
+        self._maxtags = maxsize
+        self._evicted = 0
+        self._clock = 0
+        self._lock = threading.Lock()
+
+    def _tag_clock(self, tag: str) -> int:
+        return self._tags.get(tag, self._evicted)
+
+    async def lookup(self, key: str, tags: Sequence[str]) -> Tuple[Optional[bytes], Optional[int]]:
+        """
+        The entry's value if it is current, and the clock to store a newly
+        computed value with (None when the cache is unavailable).
+        """
+        entry = self._entries.get(key)
+        with self._lock:
+            clock = self._clock
+            if entry is not None and all(self._tag_clock(tag) <= entry[0] for tag in tags):
+                return entry[1], clock
+        return None, clock
+
+    async def store(self, key: str, value: bytes, clock: int) -> None:
+        self._entries.set(key, (clock, value))
+
+    async def acquire_fill(self, key: str) -> bool:
+        # Callers in this process are already coalesced
+        return True
+
+    async def release_fill(self, key: str) -> None:
+        pass
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            self._clock += 1
+            for tag in tags:
+                self._tags[tag] = self._clock
+                self._tags.move_to_end(tag)
+            while len(self._tags) > self._maxtags:
+                _, evicted = self._tags.popitem(last=False)
+                self._evicted = max(self._evicted, evicted)
+
+class RedisBackend:
+    """
+    Cache shared by every worker through Redis. A lookup is one round trip.
+
+    Tag clocks outlive entries (2 * ttl), so by the time one expires no
+    entry computed before its invalidation is left. While Redis is
+    unreachable the cache is bypassed rather than served stale.
+    """
+
+    _INVALIDATE = """
+    local clock = redis.call('incr', KEYS[1])
+    for i = 2, #KEYS do
+        redis.call('set', KEYS[i], clock, 'EX', ARGV[1])
+    end
+    return clock
+    """
+
+    def __init__(self, url: str, ttl: float, fill_timeout: float):
+        self.url = url
+        self.ttl = ttl
+        self.fill_timeout = fill_timeout
+        self._client: Optional[redis.asyncio.Redis] = None
+        self._sync_client: Optional[redis.Redis] = None
+        self._disabled_until = 0.0
+
+    def _async(self) -> redis.asyncio.Redis:
+        if self._client is None:
+            self._client = redis.asyncio.Redis.from_url(
+                self.url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        return self._client
+
+    def _failed(self, e: Exception, pause: float = 30) -> None:
+        self._disabled_until = time.monotonic() + pause
+        print(f"Response cache: Redis error: {str(e)}")
+
+    async def lookup(self, key: str, tags: Sequence[str]) -> Tuple[Optional[bytes], Optional[int]]:
+        if time.monotonic() < self._disabled_until:
+            return None, None
+        try:
+            async with self._async().pipeline(transaction=False) as pipeline:
+                pipeline.get(f"cache:{key}")
+                pipeline.get("cache-clock")
+                if tags:
+                    pipeline.mget([f"cache-tag:{tag}" for tag in tags])
+                results: List = await pipeline.execute()
+        except redis.RedisError as e:
+            self._failed(e)
+            return None, None
+        entry, clock = results[0], int(results[1] or 0)
+        if entry is None:
+            return None, clock
+        entry_clock, _, value = entry.partition(b":")
+        tag_clocks = results[2] if tags else []
+        if all(int(tag_clock or 0) <= int(entry_clock) for tag_clock in tag_clocks):
+            return value, clock
+        return None, clock
+
+    async def store(self, key: str, value: bytes, clock: int) -> None:
+        try:
+            await self._async().set(f"cache:{key}", b"%d:%s" % (clock, value), ex=int(self.ttl))
+        except redis.RedisError as e:
+            self._failed(e)
+
+    async def acquire_fill(self, key: str) -> bool:
+        try:
+            return bool(await self._async().set(
+                f"cache-fill:{key}", 1, nx=True, px=int(self.fill_timeout * 1000)
+            ))
+        except redis.RedisError as e:
+            self._failed(e)
+            return True
+
+    async def release_fill(self, key: str) -> None:
+        # May release a lock that already expired and was taken by another
+        # filler, which at worst lets one more caller compute the value
+        try:
+            await self._async().delete(f"cache-fill:{key}")
+        except redis.RedisError as e:
+            self._failed(e)
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        # An invalidation that does not reach Redis keeps the cache off
+        # until every entry it should have dropped has expired
+        pause = max(30, self.ttl)
+        if time.monotonic() < self._disabled_until:
+            self._disabled_until = max(self._disabled_until, time.monotonic() + pause)
+            return
+        keys = ["cache-clock", *(f"cache-tag:{tag}" for tag in tags)]
+        try:
+            if self._sync_client is None:
+                self._sync_client = redis.Redis.from_url(
+                    self.url, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            self._sync_client.eval(self._INVALIDATE, len(keys), *keys, int(self.ttl * 2))
+        except redis.RedisError as e:
+            self._failed(e, pause)
+
+def cache_enabled() -> bool:
+    if settings.CACHE_ENABLED is None:
+        return settings.CACHE_REDIS_ENABLED
+    return settings.CACHE_ENABLED
+
+@lru_cache
+def get_backend() -> Union[MemoryBackend, RedisBackend]:
+    if settings.CACHE_REDIS_ENABLED:
+        return RedisBackend(settings.REDIS_URL, settings.CACHE_TTL, settings.CACHE_FILL_TIMEOUT)
+    return MemoryBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL)
+
+async def wait_for_fill(backend: RedisBackend, key: str, tags: Sequence[str]) -> Optional[bytes]:
+    """
+    Poll for an entry another worker is computing, up to its fill timeout.
+    """
+    deadline = time.monotonic() + backend.fill_timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        value, _ = await backend.lookup(key, tags)
+        if value is not None:
+            return value
+    return None
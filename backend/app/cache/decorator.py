@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import BackgroundTasks, Request, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.cache.backends import cache_enabled, get_backend, wait_for_fill
+from app.core.database import ThreadedSession
+from app.core.principal import Principal
+from app.models.user import UserRole
+
+# Arguments that carry no part of the result
+_UNKEYED = (AsyncSession, Session, ThreadedSession, Request, Response, BackgroundTasks)
+
+_inflight: Dict[str, asyncio.Future] = {}
+
+def scope_tag(principal: Principal) -> str:
+    """
+    The tag of everything a principal can see: owner:<id>, or owner:*
+    for admins.
+    """
+    return "owner:*" if principal.role == UserRole.ADMIN else f"owner:{principal.id}"
+
+def _key(
+    name: str, arguments: Dict[str, Any], tags: Optional[Callable[..., Iterable[str]]]
+) -> Tuple[str, List[str]]:
+    parts = {}
+    entry_tags = []
+    for param, value in arguments.items():
+        if isinstance(value, _UNKEYED):
+            continue
+        if isinstance(value, Principal):
+            value = scope_tag(value)
+            entry_tags.append(value)
+        elif isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+        parts[param] = value
+    if tags is not None:
+        entry_tags.extend(tags(**arguments))
+    digest = hashlib.blake2b(
+        json.dumps(parts, sort_keys=True, default=str).encode(), digest_size=16
+    ).hexdigest()
+    return f"{name}:{digest}", sorted(set(entry_tags))
+
+async def _coalesced(key: str, fill: Callable[[], Awaitable[Any]]) -> Any:
+    future = _inflight.get(key)
+    if future is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Only the caller filling the entry went away: fill it here
+            if not future.cancelled():
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await fill()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # retrieved, even if nobody was waiting
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+async def _read_through(
+    key: str, tags: List[str], adapter: TypeAdapter, compute: Callable[[], Awaitable[Any]]
+) -> Any:
+    backend = get_backend()
+    value, clock = await backend.lookup(key, tags)
+    if value is not None:
+        return adapter.validate_json(value)
+    if clock is None:
+        return adapter.validate_python(await compute(), from_attributes=True)
+
+    filling = await backend.acquire_fill(key)
+    if not filling:
+        # Another worker is computing it; past the timeout, compute it too
+        value = await wait_for_fill(backend, key, tags)
+        if value is not None:
+            return adapter.validate_json(value)
+    try:
+        result = adapter.validate_python(await compute(), from_attributes=True)
+        # Stored with the clock read before computing, so a change
+        # committed meanwhile leaves the entry already stale
+        await backend.store(key, adapter.dump_json(result), clock)
+    finally:
+        if filling:
+            await backend.release_fill(key)
+    return result
+
+def cached(schema: Any = Any, tags: Optional[Callable[..., Iterable[str]]] = None):
+    """
+    Read-through cache for an async endpoint handler or query function.
+
+    Entries are keyed on the function and its arguments. Sessions,
+    requests and responses are left out, and a Principal counts as its
+    scope_tag(), so users never share entries with anyone who can see
+    different records. Each entry is tagged with the scope tags of its
+    Principal arguments plus tags(**arguments), and is dropped when a
+    commit changes a record under one of them (app/cache/signals.py).
+
+    Values are stored as JSON through schema, so hits and misses both
+    return schema instances; ORM objects are read with from_attributes.
+    Concurrent misses for a key wait for a single computation.
+    """
+    adapter = TypeAdapter(schema)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            compute = functools.partial(func, *args, **kwargs)
+            if not cache_enabled():
+                return adapter.validate_python(await compute(), from_attributes=True)
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key, entry_tags = _key(name, arguments.arguments, tags)
+            return await _coalesced(key, lambda: _read_through(key, entry_tags, adapter, compute))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,27 @@
+from app.cache.backends import get_backend
+from app.core.changes import RowChanges, subscribe, track
+from app.models.document import Document
+from app.models.property import Property
+from app.models.rental_agreement import RentalAgreement
+from app.models.tenant import Tenant
+
+# Invalidates cached entries once a transaction that changed properties,
+# tenants, rental agreements or documents commits. A change is tagged with
+# the record (e.g. property:42), its owner (owner:7) and owner:*, which
+# admin-scoped entries carry.
+
+_TAG_NAMES = {
+    Property: "property",
+    Tenant: "tenant",
+    RentalAgreement: "rental_agreement",
+    Document: "document",
+}
+
+def _invalidate(changes: RowChanges) -> None:
+    tags = {f"{name}:{row_id}" for model, name in _TAG_NAMES.items() for row_id in changes.rows(model)}
+    tags.update(f"owner:{owner_id}" for owner_id in changes.owners(*_TAG_NAMES))
+    if tags:
+        get_backend().invalidate(sorted(tags | {"owner:*"}))
+
+track(*_TAG_NAMES)
+subscribe(commit=_invalidate)
@@ -0,0 +1,218 @@
+"""
+Session change tracking for everything kept in step with the tables: the
+search index, portfolio summaries, notification counters and schedule,
+and the response and principal caches.
+
+Each consumer registers a slot, a value collected in session.info over a
+transaction. Slots with a flush handler are applied inside the
+transaction, after every flush and before commit; slots with a commit
+handler are applied once the transaction commits. A rollback drops them.
+
+Row changes to tracked models are one such slot. ORM inserts, updates
+and deletes are recorded automatically; Core INSERT, UPDATE and DELETE
+statements must call record_changes() with the rows they wrote.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app.models.property import Property
+
+_INFO_KEY = "changes"
+_ROWS = "rows"
+_COMMITTED_ROWS = "committed_rows"
+
+FlushHandler = Callable[[Session, Any], None]
+CommitHandler = Callable[[Any], None]
+
+_slots: Dict[str, Tuple[Callable[[], Any], Optional[FlushHandler], Optional[CommitHandler]]] = {}
+
+def add_slot(
+    name: str,
+    factory: Callable[[], Any],
+    *,
+    flush: Optional[FlushHandler] = None,
+    commit: Optional[CommitHandler] = None,
+) -> None:
+    """
+    Register a per-transaction value created by factory and handed to
+    flush(session, value) or to commit(value).
+    """
+    _slots[name] = (factory, flush, commit)
+
+def slot(db: Union[Session, AsyncSession], name: str) -> Any:
+    """
+    This transaction's value for the slot name, created on first use.
+    """
+    session = getattr(db, "sync_session", db)
+    pending = session.info.setdefault(_INFO_KEY, {})
+    if name not in pending:
+        pending[name] = _slots[name][0]()
+    return pending[name]
+
+class RowChanges:
+    """
+    Rows written by a transaction, by model, with the owners of the
+    properties they belong to.
+    """
+
+    def __init__(self) -> None:
+        # id: names of the changed columns, or None when not known
+        self.changed: Dict[type, Dict[int, Optional[FrozenSet[str]]]] = defaultdict(dict)
+        self.deleted: Dict[type, Set[int]] = defaultdict(set)
+        self.owner_ids: Dict[type, Set[int]] = defaultdict(set)
+        self.property_ids: Dict[type, Set[int]] = defaultdict(set)
+
+    def owners(self, *models: type) -> Set[int]:
+        return set().union(*(self.owner_ids[model] for model in models))
+
+    def rows(self, *models: type) -> Set[int]:
+        return set().union(*(self.changed[model].keys() | self.deleted[model] for model in models))
+
+    def merge(self, other: "RowChanges") -> None:
+        for model, rows in other.changed.items():
+            for row_id, fields in rows.items():
+                known = self.changed[model].get(row_id, frozenset())
+                self.changed[model][row_id] = None if fields is None or known is None else known | fields
+        for target, source in (
+            (self.deleted, other.deleted),
+            (self.owner_ids, other.owner_ids),
+            (self.property_ids, other.property_ids),
+        ):
+            for model, ids in source.items():
+                target[model].update(ids)
+
+_flush_consumers = []
+_commit_consumers = []
+
+def subscribe(
+    *,
+    flush: Optional[Callable[[Session, RowChanges], None]] = None,
+    commit: Optional[Callable[[RowChanges], None]] = None,
+) -> None:
+    """
+    Call flush(session, changes) with the rows written since the last
+    flush, inside the transaction, or commit(changes) with every row the
+    transaction wrote once it commits. Owners are resolved for both.
+    """
+    if flush is not None:
+        _flush_consumers.append(flush)
+    if commit is not None:
+        _commit_consumers.append(commit)
+
+def record_changes(
+    db: Union[Session, AsyncSession],
+    model: type,
+    ids: Iterable[int],
+    *,
+    owner_ids: Iterable[int] = (),
+    property_ids: Iterable[int] = (),
+    deleted: bool = False,
+    fields: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Record rows of model written by the session, with the owners or the
+    properties they belong to; fields None means any column may have
+    changed.
+    """
+    written = RowChanges()
+    if deleted:
+        written.deleted[model].update(ids)
+    else:
+        fields = None if fields is None else frozenset(fields)
+        written.changed[model].update(dict.fromkeys(ids, fields))
+    written.owner_ids[model].update(owner_ids)
+    written.property_ids[model].update(property_ids)
+    slot(db, _ROWS).merge(written)
+
+def _values(target, name: str) -> Set[int]:
+    # The current value and, after an update, the one it replaced
+    history = attributes.instance_state(target).attrs[name].history
+    return {value for value in (*history.unchanged, *history.added, *history.deleted) if value is not None}
+
+def _row_written(mapper, target, deleted: bool) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    state = attributes.instance_state(target)
+    record_changes(
+        session,
+        mapper.class_,
+        [target.id],
+        owner_ids=_values(target, "owner_id") if "owner_id" in mapper.attrs else (),
+        property_ids=_values(target, "property_id") if "property_id" in mapper.attrs else (),
+        deleted=deleted,
+        fields=[attr.key for attr in mapper.column_attrs if state.attrs[attr.key].history.has_changes()],
+    )
+
+def _row_changed(mapper, connection, target) -> None:
+    _row_written(mapper, target, deleted=False)
+
+def _row_deleted(mapper, connection, target) -> None:
+    _row_written(mapper, target, deleted=True)
+
+_tracked: Set[type] = set()
+
+def track(*models: type) -> None:
+    """
+    Record ORM inserts, updates and deletes of models.
+    """
+    for model in models:
+        if model not in _tracked:
+            _tracked.add(model)
+            event.listen(model, "after_insert", _row_changed)
+            event.listen(model, "after_update", _row_changed)
+            event.listen(model, "after_delete", _row_deleted)
+
+def _apply_rows(session: Session, changes: RowChanges) -> None:
+    property_ids = set().union(*changes.property_ids.values())
+    if property_ids:
+        owners = dict(session.connection().execute(
+            select(Property.id, Property.owner_id).where(Property.id.in_(property_ids))
+        ).all())
+        for model, ids in changes.property_ids.items():
+            changes.owner_ids[model].update(owners[i] for i in ids if owners.get(i) is not None)
+        changes.property_ids.clear()
+    for consumer in _flush_consumers:
+        consumer(session, changes)
+    if _commit_consumers:
+        slot(session, _COMMITTED_ROWS).merge(changes)
+
+def _commit_rows(changes: RowChanges) -> None:
+    for consumer in _commit_consumers:
+        consumer(changes)
+
+add_slot(_ROWS, RowChanges, flush=_apply_rows)
+add_slot(_COMMITTED_ROWS, RowChanges, commit=_commit_rows)
+
+def _flush(session: Session) -> None:
+    pending = session.info.get(_INFO_KEY)
+    if not pending:
+        return
+    for name, (_, flush, _) in _slots.items():
+        if flush is not None and name in pending:
+            flush(session, pending.pop(name))
+
+@event.listens_for(Session, "after_flush")
+def _apply_after_flush(session: Session, flush_context) -> None:
+    _flush(session)
+
+@event.listens_for(Session, "before_commit")
+def _apply_before_commit(session: Session) -> None:
+    # Changes recorded for Core statements, which do not flush
+    _flush(session)
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session) -> None:
+    pending = session.info.pop(_INFO_KEY, None) or {}
+    for name, value in pending.items():
+        commit = _slots[name][2]
+        if commit is not None:
+            commit(value)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_INFO_KEY, None)
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -9,12 +9,43 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./property_management.db"
+    # Async driver URL used by the API endpoints. Derived from DATABASE_URL
+    # (aiosqlite / asyncpg) when not set.
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # False serves the API from the sync engine on the threadpool instead,
+    # as before the async port, e.g. to roll back a driver problem
+    DB_ASYNC_ENABLED: bool = True
+    
+    # Connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Postgres statement_timeout, 0 disables
+    
+    # SQLite tuning (applied on every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE: int = -64000  # negative values are KiB, i.e. 64MB
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256MB
     
     # Security
     SECRET_KEY: str = "your-secret-key-here"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Authenticated principal cache (per worker process)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds
+    TOKEN_CACHE_ENABLED: bool = False  # also cache decoded JWTs
+    
+    # Password hashing (bcrypt runs in a dedicated process pool)
+    BCRYPT_ROUNDS: int = 12  # existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 100  # waiting requests before returning 503
+    
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:3000",  # React frontend
@@ -28,28 +59,95 @@ class Settings(BaseSettings):
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB read/write size while streaming
     ALLOWED_EXTENSIONS: List[str] = [".pdf", ".jpg", ".jpeg", ".png", ".doc", ".docx"]
     
+    # Bulk property imports (POST /properties/import)
+    IMPORT_CHUNK_SIZE: int = 1000  # rows per INSERT and transaction
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000  # row errors listed in the report
+    
+    # Full-text search (/search)
+    SEARCH_CANDIDATE_LIMIT: int = 500  # newest matches ranked per query; older ones are left out
+    
+    # Response cache (app/cache)
+    # Unset, the cache is on only with Redis: the in-process backend never
+    # sees other workers' invalidations, so they would serve stale entries
+    # for up to CACHE_TTL. Set it true without Redis only for one worker.
+    CACHE_ENABLED: Optional[bool] = None
+    CACHE_REDIS_ENABLED: bool = False  # share entries and invalidations across workers via Redis
+    CACHE_TTL: int = 300  # seconds
+    CACHE_MAX_ENTRIES: int = 10000  # in-process LRU size when Redis is off
+    CACHE_FILL_TIMEOUT: float = 5.0  # seconds other workers wait for one to fill a missing entry
+    
+    # Streaming exports (GET /<resource>/export)
+    EXPORT_BATCH_SIZE: int = 1000  # rows fetched from the cursor and written per chunk
+    
+    # Resized copies of uploaded photos, generated in a process pool
+    IMAGE_VARIANTS: Dict[str, int] = {"web": 1600, "thumbnail": 320}  # name: longest edge in px
+    IMAGE_VARIANT_QUALITY: int = 80  # WebP quality
+    IMAGE_PROCESSING_WORKERS: int = 2
+    IMAGE_MAX_PIXELS: int = 50_000_000  # larger images are skipped
+    
+    # Document storage backend: "local" (UPLOAD_DIR) or "s3"
+    STORAGE_BACKEND: str = "local"
+    
     # Cloud Storage (AWS S3)
     AWS_ACCESS_KEY_ID: Optional[str] = None
     AWS_SECRET_ACCESS_KEY: Optional[str] = None
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_NAME: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None  # for S3-compatible servers (MinIO, moto)
+    S3_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024  # parts must be >= 5MB
+    S3_UPLOAD_CONCURRENCY: int = 4
+    S3_PRESIGNED_URL_EXPIRES: int = 900  # seconds
     
-    # Email Configuration (SendGrid)
+    # Email Configuration (SendGrid, or SMTP when EMAIL_BACKEND="smtp")
+    EMAIL_BACKEND: str = "sendgrid"
     SENDGRID_API_KEY: Optional[str] = None
+    SENDGRID_API_URL: str = "https://api.sendgrid.com"
     FROM_EMAIL: str = "noreply@propertymanagement.com"
+    SMTP_HOST: Optional[str] = None
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: Optional[str] = None
+    SMTP_PASSWORD: Optional[str] = None
+    SMTP_USE_TLS: bool = True
     
     # SMS Configuration (Twilio)
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_PHONE_NUMBER: Optional[str] = None
+    TWILIO_API_URL: str = "https://api.twilio.com"
     
-    # Redis (for Celery)
+    # Redis (Celery, and optionally realtime events and the response cache)
     REDIS_URL: str = "redis://localhost:6379"
     
     # Notification Settings
     RENT_EXPIRY_NOTIFICATION_DAYS: int = 30  # Notify 30 days before expiry
+    RENT_EXPIRY_SCAN_INTERVAL: int = 3600  # seconds between scanner runs
+    RENT_EXPIRY_SCAN_CHUNK_SIZE: int = 1000  # agreements per INSERT
+    UNREAD_COUNTER_REPAIR_INTERVAL: int = 86400  # seconds between unread counter repairs
+    NOTIFICATION_BULK_MAX_IDS: int = 500  # ids per batch-read/batch-delete request
+    
+    # Realtime notification stream (/notifications/stream)
+    REALTIME_HEARTBEAT_INTERVAL: int = 15  # seconds between keep-alives
+    REALTIME_QUEUE_SIZE: int = 100  # events buffered per connection before a resync
+    REALTIME_REDIS_ENABLED: bool = False  # fan events out across workers via Redis
+    REALTIME_CHANNEL: str = "notifications:events"
+    
+    # Notification delivery worker
+    NOTIFICATION_POLL_INTERVAL: int = 15  # seconds between delivery runs
+    NOTIFICATION_BATCH_SIZE: int = 100  # notifications claimed per transaction
+    NOTIFICATION_CONCURRENCY: int = 10  # sends in flight per worker
+    NOTIFICATION_SEND_RETRIES: int = 2  # immediate retries of transient errors
+    NOTIFICATION_MAX_ATTEMPTS: int = 5  # delivery attempts before FAILED
+    NOTIFICATION_RETRY_BACKOFF: int = 60  # seconds, doubled per attempt
+    NOTIFICATION_CLAIM_TIMEOUT: int = 300  # seconds before a claimed batch is retried
+    NOTIFICATION_SEND_TIMEOUT: float = 10.0  # seconds per HTTP request or SMTP session
+    
+    # Scheduled notification dispatcher (python -m app.delivery.scheduler)
+    NOTIFICATION_SCHEDULE_CHANNEL: str = "notifications:schedule"  # Redis pub/sub
+    NOTIFICATION_SCHEDULER_HORIZON: int = 3600  # seconds of upcoming notifications held in memory
+    NOTIFICATION_SCHEDULER_LEASE_TTL: int = 10  # seconds; leader lease, renewed every third
     
     class Config:
         env_file = ".env"
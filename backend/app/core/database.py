@@ -1,11 +1,235 @@
-from sqlalchemy import create_engine
+from typing import Any, AsyncIterator, Dict, Optional, Sequence, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import CursorResult, Result, Row
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    """
+    Map a sync database URL onto the matching async driver.
+    """
+    scheme, separator, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if not separator or dialect not in ASYNC_DRIVERS:
+        return url
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments from the pool settings.
+    """
+    database_url = make_url(url)
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if database_url.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "check_same_thread": False,
+        }
+        if database_url.database in (None, "", ":memory:"):
+            return options
+        # aiosqlite defaults to NullPool, which would reopen the file and
+        # replay the pragmas on every request
+        if database_url.get_driver_name() == "aiosqlite":
+            options["poolclass"] = AsyncAdaptedQueuePool
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+    )
+    if database_url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        if database_url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Tune every new SQLite connection for concurrent readers and writers.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+def dialect_insert(dialect_name: str):
+    """
+    Return the insert() construct for a dialect, which adds
+    on_conflict_do_nothing/on_conflict_do_update on SQLite and Postgres.
+    """
+    if dialect_name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+def configure_engine(engine: Engine) -> Engine:
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Report connection pool usage, for sizing DB_POOL_SIZE/DB_MAX_OVERFLOW.
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            status[name] = counter()
+    return status
+
+# Sync engine, used by Alembic, scripts and background jobs
+engine = configure_engine(
+    create_engine(settings.DATABASE_URL, **get_engine_options(settings.DATABASE_URL))
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+class ThreadedStreamResult:
+    """
+    The part of AsyncResult that AsyncSession.stream() callers use.
+    """
+
+    def __init__(self, result: Result):
+        self._result = result
+
+    def keys(self):
+        return self._result.keys()
+
+    async def partitions(self, size: Optional[int] = None) -> AsyncIterator[Sequence[Row]]:
+        partitions = self._result.partitions(size)
+        while True:
+            rows = await run_in_threadpool(next, partitions, None)
+            if rows is None:
+                return
+            yield rows
+
+class ThreadedSession:
+    """
+    AsyncSession stand-in over a sync Session, used when DB_ASYNC_ENABLED
+    is off. Every database call runs in the threadpool, as the endpoints
+    did before they were async, so no endpoint code has to change.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    @property
+    def bind(self):
+        return self.sync_session.bind
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        return self.sync_session.info
+
+    def add(self, instance, _warn: bool = True) -> None:
+        self.sync_session.add(instance, _warn)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    def expire(self, instance, attribute_names=None) -> None:
+        self.sync_session.expire(instance, attribute_names)
+
+    def expire_all(self) -> None:
+        self.sync_session.expire_all()
+
+    def expunge(self, instance) -> None:
+        self.sync_session.expunge(instance)
+
+    def expunge_all(self) -> None:
+        self.sync_session.expunge_all()
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def execute(self, statement, params=None, **kwargs) -> Result:
+        def execute(session: Session) -> Result:
+            result = session.execute(statement, params, **kwargs)
+            if isinstance(result, CursorResult) and not result.returns_rows:
+                return result
+            # Buffered, like AsyncSession results
+            return result.freeze()()
+        return await self.run_sync(execute)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return await self.run_sync(lambda session: session.scalar(statement, params, **kwargs))
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return (await self.execute(statement, params, **kwargs)).scalars()
+
+    async def stream(self, statement, params=None, **kwargs) -> ThreadedStreamResult:
+        result = await self.run_sync(lambda session: session.execute(statement, params, **kwargs))
+        return ThreadedStreamResult(result)
+
+    async def get(self, entity, ident, **kwargs):
+        return await self.run_sync(lambda session: session.get(entity, ident, **kwargs))
+
+    async def merge(self, instance, **kwargs):
+        return await self.run_sync(lambda session: session.merge(instance, **kwargs))
+
+    async def refresh(self, instance, attribute_names=None) -> None:
+        await self.run_sync(lambda session: session.refresh(instance, attribute_names))
+
+    async def delete(self, instance) -> None:
+        await self.run_sync(lambda session: session.delete(instance))
+
+    async def flush(self, objects=None) -> None:
+        await self.run_sync(lambda session: session.flush(objects))
+
+    async def commit(self) -> None:
+        await self.run_sync(lambda session: session.commit())
+
+    async def rollback(self) -> None:
+        await self.run_sync(lambda session: session.rollback())
+
+    async def close(self) -> None:
+        await self.run_sync(lambda session: session.close())
+
+    async def __aenter__(self) -> "ThreadedSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+# Async engine, used by the API endpoints. With DB_ASYNC_ENABLED off the
+# endpoints get ThreadedSessions on the sync engine instead.
+async_engine = None
+if settings.DB_ASYNC_ENABLED:
+    ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **get_engine_options(ASYNC_DATABASE_URL))
+    configure_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+else:
+    _ThreadedSessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    def AsyncSessionLocal() -> ThreadedSession:
+        return ThreadedSession(_ThreadedSessionLocal())
+
 Base = declarative_base()
 
 # Dependency to get database session
@@ -14,4 +238,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency to get async database session
+async def get_async_db() -> AsyncIterator[Union[AsyncSession, ThreadedSession]]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,158 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import redis
+import redis.asyncio
+
+from app.core.config import settings
+
+class Subscription:
+    """
+    One connected client's bounded event queue.
+
+    A client that stops reading does not grow memory: once
+    REALTIME_QUEUE_SIZE events are waiting, the backlog is dropped and
+    replaced by a single "resync" event telling it to refetch.
+    """
+
+    def __init__(self, broker: "EventBroker", user_id: int, maxsize: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def push(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """
+        Next event, or None if nothing arrived within timeout.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+class EventBroker:
+    """
+    Fans notification events out to the clients connected to this process.
+
+    With REALTIME_REDIS_ENABLED, events are published to a Redis channel
+    and every API worker relays that channel to its own clients, so an
+    event raised in any process (including the Celery worker) reaches the
+    user wherever they are connected.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._redis: Optional[redis.asyncio.Redis] = None
+        self._sync_redis: Optional[redis.Redis] = None
+        self._relay_task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def subscribe(self, user_id: int) -> Subscription:
+        subscription = Subscription(self, user_id, settings.REALTIME_QUEUE_SIZE)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def connection_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def dispatch(self, user_id: int, event: dict) -> None:
+        for subscription in list(self._subscribers.get(user_id, ())):
+            subscription.push(event)
+
+    def publish(self, user_id: int, event: dict) -> None:
+        self.publish_many([(user_id, event)])
+
+    def publish_many(self, events: Iterable[Tuple[int, dict]]) -> None:
+        """
+        Publish from any context: request handlers, ORM hooks or the worker.
+        """
+        events = list(events)
+        if not events:
+            return
+        if not settings.REALTIME_REDIS_ENABLED:
+            for user_id, event in events:
+                self.dispatch(user_id, event)
+            return
+
+        messages = [json.dumps({"user_id": user_id, "event": event}) for user_id, event in events]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None:
+            task = loop.create_task(self._publish_async(messages))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+            return
+
+        try:
+            if self._sync_redis is None:
+                self._sync_redis = redis.Redis.from_url(settings.REDIS_URL)
+            pipeline = self._sync_redis.pipeline(transaction=False)
+            for message in messages:
+                pipeline.publish(settings.REALTIME_CHANNEL, message)
+            pipeline.execute()
+        except redis.RedisError as e:
+            print(f"Error publishing notification events: {str(e)}")
+
+    async def _publish_async(self, messages) -> None:
+        try:
+            if self._redis is None:
+                self._redis = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+            async with self._redis.pipeline(transaction=False) as pipeline:
+                for message in messages:
+                    pipeline.publish(settings.REALTIME_CHANNEL, message)
+                await pipeline.execute()
+        except redis.RedisError as e:
+            print(f"Error publishing notification events: {str(e)}")
+
+    async def _relay(self) -> None:
+        while True:
+            try:
+                if self._redis is None:
+                    self._redis = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(settings.REALTIME_CHANNEL)
+                try:
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        self.dispatch(payload["user_id"], payload["event"])
+                finally:
+                    await pubsub.reset()
+            except redis.RedisError as e:
+                print(f"Notification event relay: Redis error: {str(e)}")
+                await asyncio.sleep(1)
+
+    async def start(self) -> None:
+        if settings.REALTIME_REDIS_ENABLED and self._relay_task is None:
+            self._relay_task = asyncio.create_task(self._relay())
+
+    async def stop(self) -> None:
+        if self._relay_task is not None:
+            self._relay_task.cancel()
+            self._relay_task = None
+
+broker = EventBroker()
@@ -0,0 +1,90 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when more hashing requests are waiting than the queue allows.
+    """
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so a burst of logins cannot
+    starve the event loop or the default threadpool.
+
+    At most max_workers hashes run at once; up to max_queue further
+    requests wait for a slot and anything beyond that is rejected with
+    PasswordHashingBusy.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, func: Callable, *args: Any) -> Any:
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHashingBusy()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
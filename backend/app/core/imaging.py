@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+@dataclass(frozen=True)
+class RenderedVariant:
+    name: str
+    path: str
+    size: int
+    sha256: str
+    width: int
+    height: int
+    content_type: str = "image/webp"
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def render_variants(
+    source_path: str, output_dir: str, sizes: Dict[str, int], quality: int, max_pixels: int
+) -> List[RenderedVariant]:
+    """
+    Write a WebP copy of the image for every (name, longest edge) in sizes.
+
+    Runs in a worker process. Each variant is resized from the next larger
+    one rather than from the original, and images are never upscaled.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    rendered = []
+    with Image.open(source_path) as original:
+        largest = max(sizes.values())
+        # JPEGs can be decoded at a reduced scale, which is much cheaper
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        for name, edge in sorted(sizes.items(), key=lambda item: item[1], reverse=True):
+            image.thumbnail((edge, edge), Image.LANCZOS)
+            path = os.path.join(output_dir, f"{uuid.uuid4()}.webp")
+            image.save(path, "WEBP", quality=quality, method=4)
+            rendered.append(RenderedVariant(
+                name=name,
+                path=path,
+                size=os.path.getsize(path),
+                sha256=_sha256_file(path),
+                width=image.width,
+                height=image.height,
+            ))
+    return rendered
+
+class ImageProcessor:
+    """
+    Generates image variants in a dedicated process pool so resizing and
+    encoding never run on the event loop.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, for the reason given in PasswordHasher._get_executor
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def render(self, source_path: str, output_dir: str) -> List[RenderedVariant]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(),
+            render_variants,
+            source_path,
+            output_dir,
+            settings.IMAGE_VARIANTS,
+            settings.IMAGE_VARIANT_QUALITY,
+            settings.IMAGE_MAX_PIXELS,
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+image_processor = ImageProcessor(max_workers=settings.IMAGE_PROCESSING_WORKERS)
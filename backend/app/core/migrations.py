@@ -0,0 +1,34 @@
+"""
+Steps shared by the Alembic migrations in alembic/versions.
+
+Databases created by Base.metadata.create_all, as the app and the tests
+do on startup, already have every table, column and index the migrations
+add, so each migration checks with these before creating anything.
+"""
+from typing import Iterable, Sequence, Tuple
+
+import sqlalchemy as sa
+from alembic import op
+
+IndexSpec = Tuple[str, str, Sequence]  # name, table, columns
+
+def has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+def has_column(table: str, name: str) -> bool:
+    return any(column["name"] == name for column in sa.inspect(op.get_bind()).get_columns(table))
+
+def create_indexes(indexes: Iterable[IndexSpec]) -> None:
+    """
+    Create the indexes that do not exist yet. On Postgres they are built
+    CONCURRENTLY, outside the migration's transaction, so writes to the
+    table are not locked while they build.
+    """
+    with op.get_context().autocommit_block():
+        for name, table, columns in indexes:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+def drop_indexes(indexes: Iterable[IndexSpec]) -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(list(indexes)):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,75 @@
+import time
+from dataclasses import dataclass
+from typing import Optional
+from jose import JWTError
+
+from app.core.cache import TTLCache
+from app.core.changes import RowChanges, subscribe, track
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.models.user import User, UserRole
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller: just enough to authorize a request without
+    loading the ORM User.
+    """
+    id: int
+    role: UserRole
+    is_active: bool
+
+# Both caches are per process; PRINCIPAL_CACHE_TTL bounds how long another
+# worker can keep serving a principal that was changed elsewhere.
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL)
+token_cache = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def get_token_subject(token: str) -> Optional[int]:
+    """
+    Return the user id a token was issued for, or None if it is invalid.
+    """
+    if settings.TOKEN_CACHE_ENABLED:
+        cached = token_cache.get(token)
+        if cached is not None:
+            user_id, expires_at = cached
+            return user_id if expires_at > time.time() else None
+
+    try:
+        payload = decode_access_token(token)
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+    if settings.TOKEN_CACHE_ENABLED:
+        expires_at = payload.get("exp", 0)
+        token_cache.set(token, (user_id, expires_at), ttl=max(0, expires_at - time.time()))
+    return user_id
+
+# Bumped by every eviction; a principal loaded before one is not cached
+_evictions = 0
+
+def principal_cache_generation() -> int:
+    return _evictions
+
+def cache_principal(principal: Principal, generation: int) -> None:
+    """
+    Cache a principal loaded after principal_cache_generation() returned
+    generation, unless a user was evicted since: the row read may predate
+    that user's change.
+    """
+    if generation == _evictions:
+        principal_cache.set(principal.id, principal)
+
+def invalidate_principal(user_id: int) -> None:
+    global _evictions
+    _evictions += 1
+    principal_cache.delete(user_id)
+
+# Evicted once the change is visible to other sessions, so a request
+# cannot reload the old row in between; a rollback evicts nothing
+def _evict_changed_users(changes: RowChanges) -> None:
+    for user_id in changes.rows(User):
+        invalidate_principal(user_id)
+
+track(User)
+subscribe(commit=_evict_changed_users)
@@ -0,0 +1,8 @@
+# Email and SMS delivery for notifications
+from app.delivery.channels import DeliveryError
+from app.delivery.dispatcher import deliver_pending_notifications
+
+__all__ = [
+    "DeliveryError",
+    "deliver_pending_notifications"
+]
@@ -0,0 +1,112 @@
+import asyncio
+import random
+import smtplib
+from email.message import EmailMessage
+from typing import Awaitable, Callable, Optional, Union
+
+import httpx
+
+from app.core.config import settings
+
+class DeliveryError(Exception):
+    """
+    A send failed. Transient errors (timeouts, 429, 5xx) are retried;
+    permanent ones (other 4xx, rejected recipients) are not.
+    """
+
+    def __init__(self, message: str, transient: bool = True):
+        super().__init__(message)
+        self.transient = transient
+
+def _raise_for_response(response: httpx.Response) -> None:
+    if response.is_success:
+        return
+    transient = response.status_code == 429 or response.status_code >= 500
+    raise DeliveryError(f"HTTP {response.status_code}: {response.text[:200]}", transient)
+
+async def send_with_retry(send: Callable[[], Awaitable[None]], retries: int) -> None:
+    """
+    Call send, retrying transient failures with jittered exponential backoff.
+    """
+    for attempt in range(retries + 1):
+        try:
+            await send()
+            return
+        except httpx.TransportError as e:
+            error = DeliveryError(str(e) or type(e).__name__)
+        except DeliveryError as e:
+            error = e
+        if not error.transient or attempt == retries:
+            raise error
+        await asyncio.sleep(0.5 * 2 ** attempt * random.uniform(0.5, 1.5))
+
+class SendGridEmail:
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def send(self, to: str, subject: str, body: str) -> None:
+        response = await self.client.post(
+            f"{settings.SENDGRID_API_URL}/v3/mail/send",
+            headers={"Authorization": f"Bearer {settings.SENDGRID_API_KEY}"},
+            json={
+                "personalizations": [{"to": [{"email": to}]}],
+                "from": {"email": settings.FROM_EMAIL},
+                "subject": subject,
+                "content": [{"type": "text/plain", "value": body}],
+            },
+        )
+        _raise_for_response(response)
+
+class SmtpEmail:
+    """
+    Plain SMTP, e.g. a local relay or a stub server in development.
+    smtplib is blocking, so each send runs in a thread.
+    """
+
+    def _send(self, message: EmailMessage) -> None:
+        with smtplib.SMTP(
+            settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.NOTIFICATION_SEND_TIMEOUT
+        ) as smtp:
+            if settings.SMTP_USE_TLS:
+                smtp.starttls()
+            if settings.SMTP_USERNAME:
+                smtp.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+            smtp.send_message(message)
+
+    async def send(self, to: str, subject: str, body: str) -> None:
+        message = EmailMessage()
+        message["From"] = settings.FROM_EMAIL
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+        try:
+            await asyncio.to_thread(self._send, message)
+        except smtplib.SMTPRecipientsRefused as e:
+            raise DeliveryError(str(e), transient=False)
+        except (smtplib.SMTPException, OSError) as e:
+            raise DeliveryError(str(e) or type(e).__name__)
+
+class TwilioSms:
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    async def send(self, to: str, body: str) -> None:
+        response = await self.client.post(
+            f"{settings.TWILIO_API_URL}/2010-04-01/Accounts/{settings.TWILIO_ACCOUNT_SID}/Messages.json",
+            auth=(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN),
+            data={"To": to, "From": settings.TWILIO_PHONE_NUMBER, "Body": body},
+        )
+        _raise_for_response(response)
+
+def get_email_channel(client: httpx.AsyncClient) -> Optional[Union[SendGridEmail, SmtpEmail]]:
+    """
+    The configured email channel, or None when email is not set up.
+    """
+    if settings.EMAIL_BACKEND == "smtp":
+        return SmtpEmail() if settings.SMTP_HOST else None
+    return SendGridEmail(client) if settings.SENDGRID_API_KEY else None
+
+def get_sms_channel(client: httpx.AsyncClient) -> Optional[TwilioSms]:
+    if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN and settings.TWILIO_PHONE_NUMBER:
+        return TwilioSms(client)
+    return None
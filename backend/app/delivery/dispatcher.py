@@ -0,0 +1,246 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+import httpx
+from sqlalchemy import bindparam, case, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.delivery.channels import DeliveryError, get_email_channel, get_sms_channel, send_with_retry
+from app.models.notification import Notification, NotificationStatus
+from app.models.user import User
+
+@dataclass(frozen=True)
+class ClaimedNotification:
+    id: int
+    title: str
+    message: str
+    email: Optional[str]
+    phone: Optional[str]
+    email_sent: bool
+    sms_sent: bool
+    attempt: int
+
+@dataclass
+class DeliveryResult:
+    notification: ClaimedNotification
+    email_sent: bool
+    sms_sent: bool
+    errors: List[str] = field(default_factory=list)
+    permanent: bool = False
+
+# Scheduled notifications are released by the scheduler at their due
+# time; allow for clock skew between its host and the worker's
+SCHEDULE_SKEW = timedelta(seconds=1)
+
+def claim_batch(
+    db: Session, now: datetime, ids: Optional[Sequence[int]] = None
+) -> List[ClaimedNotification]:
+    """
+    Claim up to NOTIFICATION_BATCH_SIZE due notifications for this worker,
+    optionally only among ids.
+
+    SKIP LOCKED lets concurrent workers take disjoint batches without
+    waiting on each other. The claim is recorded by pushing
+    next_attempt_at past NOTIFICATION_CLAIM_TIMEOUT, so row locks are only
+    held for this short transaction and a batch whose worker died becomes
+    due again.
+    """
+    due = now + SCHEDULE_SKEW if ids is not None else now
+    query = (
+        select(
+            Notification.id,
+            Notification.title,
+            Notification.message,
+            Notification.email_sent,
+            Notification.sms_sent,
+            Notification.delivery_attempts,
+            User.email,
+            User.phone,
+        )
+        .join(User, User.id == Notification.user_id)
+        .where(
+            Notification.status == NotificationStatus.PENDING,
+            or_(Notification.scheduled_at.is_(None), Notification.scheduled_at <= due),
+            or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+        )
+        .order_by(Notification.id)
+        .limit(settings.NOTIFICATION_BATCH_SIZE)
+        .with_for_update(of=Notification, skip_locked=True)
+    )
+    if ids is not None:
+        query = query.where(Notification.id.in_(ids))
+    rows = db.execute(query).all()
+
+    if rows:
+        db.execute(
+            update(Notification)
+            .where(Notification.id.in_([row.id for row in rows]))
+            .values(
+                delivery_attempts=Notification.delivery_attempts + 1,
+                next_attempt_at=now + timedelta(seconds=settings.NOTIFICATION_CLAIM_TIMEOUT),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+    return [
+        ClaimedNotification(
+            id=row.id,
+            title=row.title,
+            message=row.message,
+            email=row.email,
+            phone=row.phone,
+            email_sent=bool(row.email_sent),
+            sms_sent=bool(row.sms_sent),
+            attempt=(row.delivery_attempts or 0) + 1,
+        )
+        for row in rows
+    ]
+
+def record_results(db: Session, results: List[DeliveryResult], now: datetime) -> None:
+    """
+    Write back a batch's outcome in a single executemany UPDATE.
+
+    Delivered notifications become SENT, failed ones are rescheduled with
+    exponential backoff until NOTIFICATION_MAX_ATTEMPTS, then FAILED.
+    Rows read by their user meanwhile keep their READ status.
+    """
+    notifications = Notification.__table__
+    params = []
+    for result in results:
+        notification = result.notification
+        if not result.errors:
+            status, sent_at, next_attempt_at = NotificationStatus.SENT, now, None
+        elif result.permanent or notification.attempt >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            status, sent_at, next_attempt_at = NotificationStatus.FAILED, None, None
+        else:
+            backoff = settings.NOTIFICATION_RETRY_BACKOFF * 2 ** (notification.attempt - 1)
+            status, sent_at, next_attempt_at = (
+                NotificationStatus.PENDING, None, now + timedelta(seconds=backoff)
+            )
+        params.append({
+            "notification_id": notification.id,
+            "new_status": status,
+            "new_email_sent": result.email_sent,
+            "new_sms_sent": result.sms_sent,
+            "new_sent_at": sent_at,
+            "new_next_attempt_at": next_attempt_at,
+            "new_last_error": "; ".join(result.errors) or None,
+        })
+
+    if params:
+        db.execute(
+            update(notifications)
+            .where(notifications.c.id == bindparam("notification_id"))
+            .values(
+                status=case(
+                    (
+                        notifications.c.status == NotificationStatus.PENDING,
+                        bindparam("new_status", type_=notifications.c.status.type),
+                    ),
+                    else_=notifications.c.status,
+                ),
+                email_sent=bindparam("new_email_sent"),
+                sms_sent=bindparam("new_sms_sent"),
+                sent_at=bindparam("new_sent_at"),
+                next_attempt_at=bindparam("new_next_attempt_at"),
+                last_error=bindparam("new_last_error"),
+            ),
+            params,
+        )
+    db.commit()
+
+async def deliver(notification: ClaimedNotification, email_channel, sms_channel) -> DeliveryResult:
+    """
+    Send one notification over every configured channel it has not been
+    delivered on yet. Channels are independent: an email failure does not
+    stop the SMS.
+
+    A notification with no configured channel to reach its user on, and
+    not delivered on one before, fails permanently.
+    """
+    result = DeliveryResult(notification, notification.email_sent, notification.sms_sent)
+    retries = settings.NOTIFICATION_SEND_RETRIES
+    can_email = bool(email_channel and notification.email)
+    can_sms = bool(sms_channel and notification.phone)
+
+    if not (can_email or can_sms or notification.email_sent or notification.sms_sent):
+        result.errors.append("no delivery channel for this user")
+        result.permanent = True
+        return result
+
+    if can_email and not notification.email_sent:
+        try:
+            await send_with_retry(
+                lambda: email_channel.send(notification.email, notification.title, notification.message),
+                retries,
+            )
+            result.email_sent = True
+        except DeliveryError as e:
+            result.errors.append(f"email: {e}")
+            result.permanent = result.permanent or not e.transient
+
+    if can_sms and not notification.sms_sent:
+        try:
+            await send_with_retry(
+                lambda: sms_channel.send(notification.phone, f"{notification.title}: {notification.message}"),
+                retries,
+            )
+            result.sms_sent = True
+        except DeliveryError as e:
+            result.errors.append(f"sms: {e}")
+            result.permanent = result.permanent or not e.transient
+
+    return result
+
+def _claim(ids: Optional[Sequence[int]]) -> List[ClaimedNotification]:
+    with SessionLocal() as db:
+        return claim_batch(db, datetime.utcnow(), ids)
+
+def _record(results: List[DeliveryResult]) -> None:
+    with SessionLocal() as db:
+        record_results(db, results, datetime.utcnow())
+
+async def deliver_pending_notifications(ids: Optional[Sequence[int]] = None) -> int:
+    """
+    Deliver every due notification (or every due one among ids), batch by
+    batch; returns how many notifications were attempted.
+
+    One pooled HTTP client is shared by all sends, and at most
+    NOTIFICATION_CONCURRENCY notifications are in flight. Database work
+    uses the sync engine in a thread so it never blocks the sends.
+
+    With neither email nor SMS configured nothing is claimed, so
+    notifications stay PENDING until a channel is set up.
+    """
+    attempted = 0
+    limits = httpx.Limits(
+        max_connections=settings.NOTIFICATION_CONCURRENCY,
+        max_keepalive_connections=settings.NOTIFICATION_CONCURRENCY,
+    )
+    async with httpx.AsyncClient(timeout=settings.NOTIFICATION_SEND_TIMEOUT, limits=limits) as client:
+        email_channel = get_email_channel(client)
+        sms_channel = get_sms_channel(client)
+        if email_channel is None and sms_channel is None:
+            return 0
+        slots = asyncio.Semaphore(settings.NOTIFICATION_CONCURRENCY)
+
+        async def deliver_bounded(notification: ClaimedNotification) -> DeliveryResult:
+            async with slots:
+                return await deliver(notification, email_channel, sms_channel)
+
+        while True:
+            batch = await asyncio.to_thread(_claim, ids)
+            if not batch:
+                break
+            results = await asyncio.gather(*(deliver_bounded(n) for n in batch))
+            await asyncio.to_thread(_record, list(results))
+            attempted += len(batch)
+            if len(batch) < settings.NOTIFICATION_BATCH_SIZE:
+                break
+
+    return attempted
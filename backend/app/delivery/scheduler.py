@@ -0,0 +1,253 @@
+"""
+Release scheduled notifications to the delivery workers at their
+scheduled_at time.
+
+    python -m app.delivery.scheduler
+
+Any number of instances can run; a Redis lease elects the one that
+dispatches and the others wait to take over.
+"""
+import asyncio
+import heapq
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.notification import Notification, NotificationStatus
+
+LEADER_KEY = "notification-scheduler:leader"
+
+class TimerHeap:
+    """
+    Min-heap of (due_at, notification_id).
+
+    Scheduling is O(log n) and cancelling O(1): cancelled or rescheduled
+    entries stay in the heap and are skipped when they reach the top.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, int]] = []
+        self._due: Dict[int, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, notification_id: int, due_at: datetime) -> None:
+        self._due[notification_id] = due_at
+        heapq.heappush(self._heap, (due_at, notification_id))
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 2 * len(self._due) + 1024:
+            self._heap = [(due, nid) for nid, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, notification_id: int) -> None:
+        self._due.pop(notification_id, None)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._due.clear()
+
+    def _discard_stale(self) -> None:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        due_ids = []
+        self._discard_stale()
+        while self._heap and self._heap[0][0] <= now:
+            _, notification_id = heapq.heappop(self._heap)
+            del self._due[notification_id]
+            due_ids.append(notification_id)
+            self._discard_stale()
+        return due_ids
+
+class LeaderLease:
+    """
+    A Redis key held with SET NX PX and renewed by its owner.
+
+    The lease is only trusted until 80% of its TTL after the last
+    successful acquire or renew, so a leader that cannot reach Redis stops
+    dispatching before anyone else can acquire the key.
+    """
+
+    _RENEW = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('pexpire', KEYS[1], ARGV[2])
+    end
+    return 0
+    """
+    _RELEASE = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, client: redis.asyncio.Redis, key: str, ttl: float):
+        self.client = client
+        self.key = key
+        self.ttl = ttl
+        self.token = uuid.uuid4().hex
+        self._valid_until = 0.0
+
+    def held(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    async def acquire(self) -> bool:
+        started = time.monotonic()
+        if await self.client.set(self.key, self.token, nx=True, px=int(self.ttl * 1000)):
+            self._valid_until = started + self.ttl * 0.8
+            return True
+        return False
+
+    async def renew(self) -> bool:
+        started = time.monotonic()
+        try:
+            renewed = await self.client.eval(self._RENEW, 1, self.key, self.token, int(self.ttl * 1000))
+        except redis.RedisError:
+            return False
+        if renewed:
+            self._valid_until = started + self.ttl * 0.8
+        else:
+            self._valid_until = 0.0
+        return bool(renewed)
+
+    async def release(self) -> None:
+        self._valid_until = 0.0
+        try:
+            await self.client.eval(self._RELEASE, 1, self.key, self.token)
+        except redis.RedisError:
+            pass
+
+def load_scheduled(until: datetime) -> List[Tuple[int, datetime]]:
+    """
+    Pending notifications scheduled up to until, including overdue ones.
+    """
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Notification.id, Notification.scheduled_at).where(
+                Notification.status == NotificationStatus.PENDING,
+                Notification.scheduled_at.is_not(None),
+                Notification.scheduled_at <= until,
+            )
+        ).all()
+    return [(row.id, row.scheduled_at) for row in rows]
+
+class NotificationScheduler:
+    """
+    Holds the next NOTIFICATION_SCHEDULER_HORIZON seconds of scheduled
+    notifications in a TimerHeap and sleeps until the earliest one is due,
+    so the database is read once per half horizon instead of polled.
+    Changes arrive over Redis pub/sub (app/delivery/signals.py).
+    """
+
+    def __init__(self, release: Callable[[List[int]], Awaitable[None]]):
+        self.release = release
+        self.timers = TimerHeap()
+        self.loaded_until = datetime.min
+
+    async def reload(self) -> None:
+        until = datetime.utcnow() + timedelta(seconds=settings.NOTIFICATION_SCHEDULER_HORIZON)
+        rows = await asyncio.to_thread(load_scheduled, until)
+        self.timers.clear()
+        for notification_id, scheduled_at in rows:
+            self.timers.schedule(notification_id, scheduled_at)
+        self.loaded_until = until
+
+    def apply(self, changes: Dict[str, Optional[str]]) -> None:
+        for notification_id, scheduled_at in changes.items():
+            due_at = datetime.fromisoformat(scheduled_at) if scheduled_at else None
+            # Beyond the horizon it is picked up by a later reload
+            if due_at is None or due_at > self.loaded_until:
+                self.timers.cancel(int(notification_id))
+            else:
+                self.timers.schedule(int(notification_id), due_at)
+
+    async def dispatch_due(self) -> None:
+        now = datetime.utcnow()
+        due_ids = self.timers.pop_due(now)
+        batch_size = settings.NOTIFICATION_BATCH_SIZE
+        for start in range(0, len(due_ids), batch_size):
+            batch = due_ids[start:start + batch_size]
+            try:
+                await self.release(batch)
+            except Exception as e:
+                # Broker unavailable: try the batch again shortly
+                print(f"Notification scheduler: error releasing {len(batch)} notifications: {str(e)}")
+                for notification_id in batch:
+                    self.timers.schedule(notification_id, now + timedelta(seconds=1))
+
+    async def run(self, lease: LeaderLease, pubsub) -> None:
+        """
+        Dispatch until the lease is lost. The caller subscribes pubsub
+        before calling, so no change is missed between load and listen.
+        """
+        await self.reload()
+        renew_every = lease.ttl / 3
+        next_renew = time.monotonic() + renew_every
+        next_reload = time.monotonic() + settings.NOTIFICATION_SCHEDULER_HORIZON / 2
+
+        while lease.held():
+            await self.dispatch_due()
+
+            timeout = min(next_renew, next_reload) - time.monotonic()
+            next_due = self.timers.next_due()
+            if next_due is not None:
+                timeout = min(timeout, (next_due - datetime.utcnow()).total_seconds())
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=max(timeout, 0)
+            )
+            if message is not None:
+                self.apply(json.loads(message["data"]))
+
+            if time.monotonic() >= next_renew:
+                await lease.renew()
+                next_renew = time.monotonic() + renew_every
+            if time.monotonic() >= next_reload:
+                await self.reload()
+                next_reload = time.monotonic() + settings.NOTIFICATION_SCHEDULER_HORIZON / 2
+
+async def release_to_workers(ids: List[int]) -> None:
+    from app.worker import celery_app
+    await asyncio.to_thread(
+        celery_app.send_task, "app.worker.deliver_notifications", args=[ids]
+    )
+
+async def run_scheduler(
+    release: Callable[[List[int]], Awaitable[None]] = release_to_workers
+) -> None:
+    client = redis.asyncio.Redis.from_url(settings.REDIS_URL)
+    lease = LeaderLease(client, LEADER_KEY, settings.NOTIFICATION_SCHEDULER_LEASE_TTL)
+
+    while True:
+        try:
+            if not await lease.acquire():
+                await asyncio.sleep(lease.ttl / 3)
+                continue
+            print("Notification scheduler: acquired leadership")
+            pubsub = client.pubsub()
+            await pubsub.subscribe(settings.NOTIFICATION_SCHEDULE_CHANNEL)
+            try:
+                await NotificationScheduler(release).run(lease, pubsub)
+            finally:
+                await pubsub.reset()
+            print("Notification scheduler: lost leadership")
+        except redis.RedisError as e:
+            print(f"Notification scheduler: Redis error: {str(e)}")
+            await lease.release()
+            await asyncio.sleep(1)
+
+if __name__ == "__main__":
+    asyncio.run(run_scheduler())
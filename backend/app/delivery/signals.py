@@ -0,0 +1,145 @@
+import json
+import time
+from collections import defaultdict
+from typing import Optional, Union
+
+import redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, attributes, object_session
+
+from app.core.changes import add_slot, slot
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.events import broker
+from app.models.notification import Notification, NotificationStatus, UNREAD_STATUSES
+from app.models.notification_counter import NotificationCounter
+
+# Keeps notification_counters in step with notifications inside the same
+# transaction. After commit, tells the scheduler (app/delivery/scheduler.py)
+# when a scheduled notification is created, moved or cancelled, and pushes
+# new notifications to connected clients (/notifications/stream). Schedule
+# messages that are lost are picked up by the scheduler's next reload.
+
+_CHANGES_SLOT = "notification_schedule_changes"
+_CREATED_SLOT = "notifications_created"
+_UNREAD_SLOT = "notification_unread_changes"
+_client: Optional[redis.Redis] = None
+_disabled_until = 0.0
+
+def _get_client() -> redis.Redis:
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+    return _client
+
+def publish_schedule_changes(changes: dict) -> None:
+    """
+    Publish {notification_id: scheduled_at or None} to the scheduler.
+    """
+    global _disabled_until
+    if not changes or time.monotonic() < _disabled_until:
+        return
+    message = json.dumps({
+        str(notification_id): scheduled_at.isoformat() if scheduled_at else None
+        for notification_id, scheduled_at in changes.items()
+    })
+    try:
+        _get_client().publish(settings.NOTIFICATION_SCHEDULE_CHANNEL, message)
+    except redis.RedisError as e:
+        # Don't stall every commit while Redis is down
+        _disabled_until = time.monotonic() + 30
+        print(f"Error publishing notification schedule changes: {str(e)}")
+
+def _record_change(target: Notification, scheduled_at) -> None:
+    session = object_session(target)
+    if session is not None:
+        slot(session, _CHANGES_SLOT)[target.id] = scheduled_at
+
+def notification_event(notification) -> dict:
+    """
+    Stream event for a new notification; works for ORM objects and rows.
+    """
+    status = notification.status or NotificationStatus.PENDING
+    return {
+        "type": "notification",
+        "notification": {
+            "id": notification.id,
+            "title": notification.title,
+            "message": notification.message,
+            "notification_type": notification.notification_type.value,
+            "status": status.value,
+            "scheduled_at": notification.scheduled_at.isoformat() if notification.scheduled_at else None,
+        },
+    }
+
+def record_unread_change(db: Union[Session, AsyncSession], user_id: int, delta: int) -> None:
+    """
+    Adjust a user's unread counter when the session next flushes or
+    commits. The hooks below count notifications written through the ORM;
+    bulk UPDATE/DELETE and Core INSERT statements pass their rows here.
+    """
+    slot(db, _UNREAD_SLOT)[user_id] += delta
+
+def _is_unread(status) -> bool:
+    # None until the column default is applied, which means PENDING
+    return status is None or status in UNREAD_STATUSES
+
+def _apply_unread_changes(session: Session, deltas: dict) -> None:
+    rows = [
+        {"user_id": user_id, "unread_count": delta}
+        for user_id, delta in sorted(deltas.items()) if delta
+    ]
+    if not rows:
+        return
+    connection = session.connection()
+    counters = NotificationCounter.__table__
+    upsert = dialect_insert(connection.dialect.name)(counters)
+    # Sorted by user_id so concurrent transactions lock counters in the same order
+    connection.execute(
+        upsert.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"unread_count": counters.c.unread_count + upsert.excluded.unread_count},
+        ),
+        rows,
+    )
+
+def _due_at(target: Notification):
+    return target.scheduled_at if target.status in (None, NotificationStatus.PENDING) else None
+
+@event.listens_for(Notification, "after_insert")
+def _notification_inserted(mapper, connection, target: Notification) -> None:
+    if target.scheduled_at is not None:
+        _record_change(target, _due_at(target))
+    session = object_session(target)
+    if session is not None:
+        slot(session, _CREATED_SLOT).append((target.user_id, notification_event(target)))
+        if _is_unread(target.status):
+            record_unread_change(session, target.user_id, 1)
+
+@event.listens_for(Notification, "after_update")
+def _notification_updated(mapper, connection, target: Notification) -> None:
+    state = attributes.instance_state(target)
+    rescheduled = state.attrs.scheduled_at.history.has_changes()
+    if rescheduled or (target.scheduled_at is not None and state.attrs.status.history.has_changes()):
+        _record_change(target, _due_at(target))
+    previous = state.attrs.status.history.deleted
+    session = object_session(target)
+    if previous and session is not None:
+        delta = _is_unread(target.status) - _is_unread(previous[0])
+        if delta:
+            record_unread_change(session, target.user_id, delta)
+
+@event.listens_for(Notification, "after_delete")
+def _notification_deleted(mapper, connection, target: Notification) -> None:
+    if target.scheduled_at is not None:
+        _record_change(target, None)
+    session = object_session(target)
+    if session is not None and _is_unread(target.status):
+        record_unread_change(session, target.user_id, -1)
+
+add_slot(_UNREAD_SLOT, lambda: defaultdict(int), flush=_apply_unread_changes)
+add_slot(_CHANGES_SLOT, dict, commit=publish_schedule_changes)
+add_slot(_CREATED_SLOT, list, commit=broker.publish_many)
@@ -0,0 +1,10 @@
+# Bulk imports from CSV/NDJSON files (POST /properties/import and
+# python -m app.scripts.import_properties)
+from app.imports.properties import ImportReport, import_properties
+from app.imports.readers import detect_format
+
+__all__ = [
+    "ImportReport",
+    "import_properties",
+    "detect_format"
+]
@@ -0,0 +1,132 @@
+"""
+Import properties, each with an optional tenant, from CSV or NDJSON.
+
+Rows are validated with PropertyCreate and written IMPORT_CHUNK_SIZE at a
+time: one INSERT ... RETURNING for the chunk's properties and one INSERT
+for their tenants, committed together.
+"""
+from dataclasses import dataclass, field
+from typing import BinaryIO, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import analytics, cache, search  # noqa: F401  consumers of record_changes()
+from app.core.changes import record_changes
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.imports.readers import read_rows
+from app.models.property import Property
+from app.models.tenant import Tenant
+from app.schemas.property import PropertyCreate
+
+# Compiled once and executed with a whole chunk of rows; SQLAlchemy sends
+# them as multi-row INSERT ... RETURNING statements, ids in row order
+INSERT_PROPERTIES = insert(Property.__table__).returning(
+    Property.__table__.c.id, sort_by_parameter_order=True
+)
+INSERT_TENANTS = insert(Tenant.__table__).returning(Tenant.__table__.c.id)
+
+@dataclass
+class RowError:
+    line: int
+    errors: List[str]
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    properties_created: int = 0
+    tenants_created: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def add_error(self, line: int, errors: List[str]) -> None:
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line=line, errors=errors))
+        else:
+            self.errors_truncated = True
+
+def validate_record(record: dict) -> PropertyCreate:
+    tenant = record.get("tenant")
+    if isinstance(tenant, dict) and "property_id" not in tenant:
+        # Replaced by the id of the property inserted for this row
+        record = {**record, "tenant": {**tenant, "property_id": 0}}
+    return PropertyCreate.model_validate(record)
+
+def format_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    ]
+
+def insert_chunk(db: Session, owner_id: int, chunk: List[Tuple[int, PropertyCreate]]) -> Tuple[int, int]:
+    property_ids = db.execute(
+        INSERT_PROPERTIES,
+        [
+            {**property_in.model_dump(exclude={"tenant"}), "owner_id": owner_id}
+            for _, property_in in chunk
+        ],
+    ).scalars().all()
+    tenants = [
+        {**property_in.tenant.model_dump(), "property_id": property_id}
+        for (_, property_in), property_id in zip(chunk, property_ids)
+        if property_in.tenant
+    ]
+    record_changes(db, Property, property_ids, owner_ids=[owner_id])
+    if tenants:
+        tenant_ids = db.execute(INSERT_TENANTS, tenants).scalars().all()
+        record_changes(db, Tenant, tenant_ids, owner_ids=[owner_id])
+    return len(property_ids), len(tenants)
+
+def write_chunk(db: Session, owner_id: int, chunk: List[Tuple[int, PropertyCreate]], report: ImportReport) -> None:
+    try:
+        created = insert_chunk(db, owner_id, chunk)
+        db.commit()
+    except SQLAlchemyError:
+        db.rollback()
+        created = (0, 0)
+        # Retry row by row to report only the rows the database rejects
+        for line, property_in in chunk:
+            try:
+                row_created = insert_chunk(db, owner_id, [(line, property_in)])
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                report.add_error(line, [str(getattr(e, "orig", None) or e)])
+                continue
+            created = (created[0] + row_created[0], created[1] + row_created[1])
+    report.properties_created += created[0]
+    report.tenants_created += created[1]
+
+def import_properties(source: BinaryIO, format: str, owner_id: int) -> ImportReport:
+    """
+    Stream rows from source, a binary file, and create them for owner_id.
+
+    Invalid rows are reported by line number and skipped; valid rows are
+    imported either way.
+    """
+    report = ImportReport()
+    chunk: List[Tuple[int, PropertyCreate]] = []
+
+    with SessionLocal() as db:
+        for line, record, error in read_rows(source, format):
+            report.rows += 1
+            if error is not None:
+                report.add_error(line, [error])
+                continue
+            try:
+                chunk.append((line, validate_record(record)))
+            except ValidationError as e:
+                report.add_error(line, format_errors(e))
+                continue
+            if len(chunk) >= settings.IMPORT_CHUNK_SIZE:
+                write_chunk(db, owner_id, chunk, report)
+                chunk = []
+        if chunk:
+            write_chunk(db, owner_id, chunk, report)
+
+    # Rows rejected by the database are reported after later validation errors
+    report.errors.sort(key=lambda error: error.line)
+    return report
@@ -0,0 +1,91 @@
+import csv
+import json
+import os
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+FORMATS = ("csv", "ndjson")
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# (line number, record or None, error message or None)
+Row = Tuple[int, Optional[dict], Optional[str]]
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return _EXTENSIONS.get(extension) or _CONTENT_TYPES.get((content_type or "").split(";")[0])
+
+class _UndecodableLine(Exception):
+    def __init__(self, line_number: int):
+        self.line_number = line_number
+
+def _decoded_lines(source: BinaryIO) -> Iterator[str]:
+    # Decoded line by line, so a bad byte is reported on its own line
+    for line_number, line in enumerate(source, start=1):
+        try:
+            yield line.decode("utf-8-sig" if line_number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise _UndecodableLine(line_number)
+
+def read_csv(source: BinaryIO, nested_prefix: str = "tenant_") -> Iterator[Row]:
+    """
+    One record per CSV row. Empty cells are left out so schema defaults
+    apply, and columns starting with nested_prefix are gathered into a
+    nested "tenant" record.
+
+    Reading stops at the first line that is not UTF-8 or cannot be
+    parsed, which is reported as that line's error; the rows before it
+    are still imported.
+    """
+    reader = csv.DictReader(_decoded_lines(source))
+    nested_name = nested_prefix.rstrip("_")
+    try:
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, "More values than columns"
+                continue
+            record: dict = {}
+            for column, value in row.items():
+                if value is None or value == "":
+                    continue
+                if column.startswith(nested_prefix):
+                    record.setdefault(nested_name, {})[column[len(nested_prefix):]] = value
+                else:
+                    record[column] = value
+            yield reader.line_num, record, None
+    except _UndecodableLine as e:
+        yield e.line_number, None, "Not UTF-8 text; save the file as UTF-8 and import the rest again"
+    except csv.Error as e:
+        yield reader.line_num, None, f"Invalid CSV: {str(e)}"
+
+def read_ndjson(source: BinaryIO) -> Iterator[Row]:
+    """
+    One JSON object per line; blank lines are skipped.
+    """
+    for line_number, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            text = line.decode("utf-8")
+        except UnicodeDecodeError:
+            yield line_number, None, "Not UTF-8 text"
+            continue
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Expected a JSON object"
+            continue
+        yield line_number, record, None
+
+def read_rows(source: BinaryIO, format: str) -> Iterator[Row]:
+    if format == "csv":
+        return read_csv(source)
+    if format == "ndjson":
+        return read_ndjson(source)
+    raise ValueError(f"Unsupported import format: {format}")
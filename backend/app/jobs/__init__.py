@@ -0,0 +1,8 @@
+# Periodic jobs run by the Celery worker (app/worker.py)
+from app.jobs.rent_expiry import scan_rent_expiry
+from app.jobs.unread_counts import repair_unread_counts
+
+__all__ = [
+    "scan_rent_expiry",
+    "repair_unread_counts"
+]
@@ -0,0 +1,167 @@
+"""
+Create RENT_EXPIRY notifications for agreements entering the
+RENT_EXPIRY_NOTIFICATION_DAYS window.
+
+    python -m app.jobs.rent_expiry
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal, dialect_insert
+from app.core.events import broker
+from app.delivery.signals import notification_event, record_unread_change
+from app.models.job_watermark import JobWatermark
+from app.models.notification import Notification, NotificationStatus, NotificationType
+from app.models.property import Property
+from app.models.rental_agreement import AgreementStatus, RentalAgreement
+
+WATERMARK_NAME = "rent_expiry_scan"
+
+# Change stamps are written by the database clock, at one-second resolution
+# on SQLite, so the change filter reaches this far back before the last
+# run. Agreements seen twice are skipped by the dedupe_key.
+CHANGE_STAMP_RESOLUTION = timedelta(seconds=1)
+
+def scan_window(
+    db: Session, after: datetime, until: datetime, changed_since: Optional[datetime] = None
+) -> int:
+    """
+    Notify the owners of ACTIVE agreements with after < end_date <= until.
+
+    Agreements are walked in (end_date, id) order along the (status,
+    end_date) index, RENT_EXPIRY_SCAN_CHUNK_SIZE at a time, and each chunk
+    is written with one INSERT. The unique dedupe_key makes the insert
+    skip agreements that were already notified for this end date.
+    Returns the number of notifications created.
+    """
+    # A single compiled statement, executed with a whole chunk of rows:
+    # SQLAlchemy sends it as one multi-row INSERT ... RETURNING per chunk
+    insert = dialect_insert(db.bind.dialect.name)
+    insert_notifications = (
+        insert(Notification.__table__)
+        .on_conflict_do_nothing(index_elements=["dedupe_key"])
+        .returning(
+            Notification.__table__.c.id,
+            Notification.__table__.c.user_id,
+            Notification.__table__.c.title,
+            Notification.__table__.c.message,
+            Notification.__table__.c.notification_type,
+            Notification.__table__.c.status,
+            Notification.__table__.c.scheduled_at,
+        )
+    )
+    chunk_size = settings.RENT_EXPIRY_SCAN_CHUNK_SIZE
+    created = 0
+    last_key = None
+
+    while True:
+        query = (
+            select(
+                RentalAgreement.id,
+                RentalAgreement.agreement_number,
+                RentalAgreement.end_date,
+                Property.title,
+                Property.owner_id,
+            )
+            .join(Property, Property.id == RentalAgreement.property_id)
+            .where(
+                RentalAgreement.status == AgreementStatus.ACTIVE,
+                RentalAgreement.end_date <= until,
+            )
+            .order_by(RentalAgreement.end_date, RentalAgreement.id)
+            .limit(chunk_size)
+        )
+        if changed_since is not None:
+            query = query.where(
+                func.coalesce(RentalAgreement.updated_at, RentalAgreement.created_at)
+                >= changed_since - CHANGE_STAMP_RESOLUTION
+            )
+        if last_key is None:
+            query = query.where(RentalAgreement.end_date > after)
+        else:
+            # (end_date, id) > last_key, spelled so the index range starts
+            # at the last end date rather than at the start of the window
+            last_end_date, last_id = last_key
+            query = query.where(
+                RentalAgreement.end_date >= last_end_date,
+                or_(RentalAgreement.end_date > last_end_date, RentalAgreement.id > last_id),
+            )
+
+        rows = db.execute(query).all()
+        if not rows:
+            break
+
+        result = db.execute(
+            insert_notifications,
+            [
+                {
+                    "title": "Lease expiring soon",
+                    "message": (
+                        f"Rental agreement {row.agreement_number} for {row.title} "
+                        f"ends on {row.end_date:%Y-%m-%d}."
+                    ),
+                    "notification_type": NotificationType.RENT_EXPIRY,
+                    "status": NotificationStatus.PENDING,
+                    "email_sent": False,
+                    "sms_sent": False,
+                    "push_sent": False,
+                    "delivery_attempts": 0,
+                    "user_id": row.owner_id,
+                    "dedupe_key": f"rent_expiry:{row.id}:{row.end_date:%Y-%m-%d}",
+                }
+                for row in rows
+            ],
+        )
+        inserted = result.all()
+        for row in inserted:
+            record_unread_change(db, row.user_id, 1)
+        db.commit()
+        created += len(inserted)
+        broker.publish_many((row.user_id, notification_event(row)) for row in inserted)
+
+        last_key = (rows[-1].end_date, rows[-1].id)
+        if len(rows) < chunk_size:
+            break
+
+    return created
+
+def scan_rent_expiry(now: Optional[datetime] = None) -> int:
+    """
+    Run one incremental scan; returns the number of notifications created.
+
+    The watermark is the window's upper bound at the last run, so a run
+    only walks end dates that entered the window since then. Agreements
+    created or activated since the last run with an end date already
+    inside the old window are picked up by a second, change-filtered pass.
+    That pass compares against change stamps, so the run is stamped from
+    the database clock too, read before the scan starts.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now + timedelta(days=settings.RENT_EXPIRY_NOTIFICATION_DAYS)
+
+    with SessionLocal() as db:
+        started_at = db.scalar(select(func.now()))
+        state = db.get(JobWatermark, WATERMARK_NAME)
+        if state is None:
+            created = scan_window(db, now, cutoff)
+            state = JobWatermark(name=WATERMARK_NAME)
+        else:
+            created = scan_window(db, max(state.watermark, now), cutoff)
+            if state.watermark > now:
+                created += scan_window(
+                    db, now, min(state.watermark, cutoff), changed_since=state.last_run_at
+                )
+
+        state.watermark = cutoff
+        state.last_run_at = started_at
+        db.merge(state)
+        db.commit()
+
+    return created
+
+if __name__ == "__main__":
+    print(f"Created {scan_rent_expiry()} rent expiry notifications")
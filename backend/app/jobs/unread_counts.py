@@ -0,0 +1,63 @@
+"""
+Rebuild unread notification counters that have drifted from the
+notifications table.
+
+    python -m app.jobs.unread_counts
+"""
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal, dialect_insert
+from app.models.notification import Notification, UNREAD_STATUSES
+from app.models.notification_counter import NotificationCounter
+
+def count_unread_notifications(db, user_ids=None) -> dict:
+    query = (
+        select(Notification.user_id, func.count(Notification.id))
+        .where(Notification.status.in_(UNREAD_STATUSES))
+        .group_by(Notification.user_id)
+    )
+    if user_ids is not None:
+        query = query.where(Notification.user_id.in_(user_ids))
+    return dict(db.execute(query).all())
+
+def repair_unread_counts() -> int:
+    """
+    Returns the number of counters corrected.
+
+    Drift is found with one GROUP BY; each drifted counter is then locked
+    and recounted in its own transaction. Writers update the counter after
+    their notification rows, so a locked recount neither misses a
+    committed change nor double counts one still in flight.
+    """
+    with SessionLocal() as db:
+        actual = count_unread_notifications(db)
+        stored = dict(db.execute(
+            select(NotificationCounter.user_id, NotificationCounter.unread_count)
+        ).all())
+        drifted = sorted(
+            user_id for user_id in actual.keys() | stored.keys()
+            if actual.get(user_id, 0) != stored.get(user_id, 0)
+        )
+        if not drifted:
+            return 0
+
+        insert = dialect_insert(db.bind.dialect.name)
+        db.execute(
+            insert(NotificationCounter.__table__).on_conflict_do_nothing(index_elements=["user_id"]),
+            [{"user_id": user_id, "unread_count": 0} for user_id in drifted],
+        )
+        db.commit()
+
+        for user_id in drifted:
+            counter = db.scalar(
+                select(NotificationCounter)
+                .where(NotificationCounter.user_id == user_id)
+                .with_for_update()
+            )
+            counter.unread_count = count_unread_notifications(db, [user_id]).get(user_id, 0)
+            db.commit()
+
+    return len(drifted)
+
+if __name__ == "__main__":
+    print(f"Repaired {repair_unread_counts()} unread notification counters")
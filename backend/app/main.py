@@ -1,11 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import os
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.database import engine
+from app.api.conditional import ConditionalGetMiddleware
+from app.core.database import engine, async_engine, get_pool_status
+from app.core.hashing import PasswordHashingBusy, password_hasher
+from app.core.events import broker
+from app.core.imaging import image_processor
+from app.delivery import signals  # noqa: F401  keeps the notification scheduler in sync
 from app.models import Base
 
 # Create database tables
@@ -25,19 +30,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Has-More", "ETag", "Last-Modified"],
 )
+app.add_middleware(ConditionalGetMiddleware)
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many login attempts in progress, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.on_event("startup")
+async def start_event_broker():
+    await broker.start()
+
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await broker.stop()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_image_processor():
+    image_processor.shutdown()
 
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
-# Mount static files for document storage
-if os.path.exists("uploads"):
-    app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
-
 @app.get("/")
 async def root():
     return {"message": "Property Management API is running!"}
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"} 
+
+@app.get("/health/db")
+async def database_health_check():
+    pools = {"sync": get_pool_status(engine)}
+    if async_engine is not None:
+        async with async_engine.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+        pools["async"] = get_pool_status(async_engine.sync_engine)
+    else:
+        # DB_ASYNC_ENABLED is off: the API runs on the sync engine
+        def ping():
+            with engine.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+        await run_in_threadpool(ping)
+    return {"status": "healthy", "pools": pools}
+
+@app.get("/health/hashing")
+async def hashing_health_check():
+    return {"status": "healthy", "password_hashing": password_hasher.stats()}
+
+@app.get("/health/stream")
+async def stream_health_check():
+    return {"status": "healthy", "connections": broker.connection_count()}
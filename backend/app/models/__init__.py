@@ -3,8 +3,13 @@ from .user import User
 from .property import Property
 from .tenant import Tenant
 from .document import Document
+from .document_variant import DocumentVariant
 from .rental_agreement import RentalAgreement
 from .notification import Notification
+from .notification_counter import NotificationCounter
+from .blob import Blob
+from .job_watermark import JobWatermark
+from .portfolio_summary import PortfolioSummary
 
 # Import Base from database module
 from app.core.database import Base
@@ -15,6 +20,11 @@ __all__ = [
     "Property", 
     "Tenant",
     "Document",
+    "DocumentVariant",
     "RentalAgreement",
-    "Notification"
+    "Notification",
+    "NotificationCounter",
+    "Blob",
+    "JobWatermark",
+    "PortfolioSummary"
 ] 
\ No newline at end of file
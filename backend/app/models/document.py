@@ -13,6 +13,7 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer)  # in bytes
     file_type = Column(String)  # MIME type
+    sha256 = Column(String(64))  # hex digest of the file contents
     
     # Document metadata
     document_type = Column(String)  # lease_agreement, id_proof, etc.
@@ -24,9 +25,10 @@ class Document(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign keys
-    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False, index=True)
     rental_agreement_id = Column(Integer, ForeignKey("rental_agreements.id"), nullable=True)
     
     # Relationships
     property = relationship("Property", back_populates="documents")
-    rental_agreement = relationship("RentalAgreement", back_populates="documents") 
\ No newline at end of file
+    rental_agreement = relationship("RentalAgreement", back_populates="documents")
+    variants = relationship("DocumentVariant", back_populates="document") 
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class DocumentVariant(Base):
+    __tablename__ = "document_variants"
+    __table_args__ = (
+        UniqueConstraint("document_id", "name", name="uq_document_variants_document_id_name"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)  # thumbnail, web
+    file_path = Column(String, nullable=False)
+    file_size = Column(Integer)  # in bytes
+    file_type = Column(String)  # MIME type
+    sha256 = Column(String(64), nullable=False)
+    width = Column(Integer)
+    height = Column(Integer)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Foreign keys
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    
+    # Relationships
+    document = relationship("Document", back_populates="variants")
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+class JobWatermark(Base):
+    __tablename__ = "job_watermarks"
+
+    # How far a periodic job has progressed, so the next run resumes there
+    name = Column(String, primary_key=True)
+    watermark = Column(DateTime, nullable=False)
+    last_run_at = Column(DateTime, nullable=False)
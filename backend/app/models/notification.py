@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from app.core.database import Base
 import enum
 
@@ -16,6 +16,10 @@ class NotificationStatus(str, enum.Enum):
     READ = "read"
     FAILED = "failed"
 
+# Anything the user has not opened in the app, whether or not email/SMS
+# delivery succeeded
+UNREAD_STATUSES = (NotificationStatus.PENDING, NotificationStatus.SENT, NotificationStatus.FAILED)
+
 class Notification(Base):
     __tablename__ = "notifications"
 
@@ -23,7 +27,11 @@ class Notification(Base):
     title = Column(String, nullable=False)
     message = Column(Text, nullable=False)
     notification_type = Column(Enum(NotificationType), nullable=False)
-    status = Column(Enum(NotificationStatus), default=NotificationStatus.PENDING)
+    # active_history loads an expired status before it is replaced, so the
+    # unread counter hooks (app/delivery/signals.py) can tell whether it changes
+    status = column_property(
+        Column(Enum(NotificationStatus), default=NotificationStatus.PENDING), active_history=True
+    )
     
     # Delivery details
     email_sent = Column(Boolean, default=False)
@@ -35,6 +43,15 @@ class Notification(Base):
     sent_at = Column(DateTime)
     read_at = Column(DateTime)
     
+    # Delivery worker bookkeeping
+    delivery_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime)  # retry backoff, or claim expiry while sending
+    last_error = Column(Text)
+    
+    # Identifies generated notifications (e.g. rent_expiry:<agreement>:<end date>)
+    # so jobs can insert them idempotently
+    dedupe_key = Column(String, unique=True, index=True)
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -43,4 +60,15 @@ class Notification(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Relationships
-    user = relationship("User", back_populates="notifications") 
\ No newline at end of file
+    user = relationship("User", back_populates="notifications")
+
+    __table_args__ = (
+        # Mark-all-read and counter repair: user_id == :uid and status in UNREAD_STATUSES
+        Index("ix_notifications_user_id_status", "user_id", "status"),
+        # Newest-first inbox pages, keyed on id (see app/api/pagination.py)
+        Index("ix_notifications_user_id_id", "user_id", id.desc()),
+        # Delivery worker claims pending notifications oldest first
+        Index("ix_notifications_status_id", "status", "id"),
+        # Scheduler loads upcoming scheduled_at values on startup
+        Index("ix_notifications_status_scheduled_at", "status", "scheduled_at"),
+    ) 
\ No newline at end of file
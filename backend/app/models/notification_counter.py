@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.core.database import Base
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+
+    # Number of unread notifications per user, kept in step with the
+    # notifications table by app/delivery/signals.py
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, Date, DateTime, JSON, ForeignKey
+from app.core.database import Base
+
+class PortfolioSummary(Base):
+    __tablename__ = "portfolio_summaries"
+
+    # One owner's /analytics/portfolio result. version is bumped whenever
+    # their properties, tenants or agreements change (app/analytics); the
+    # stored summary is current while summary_version matches it.
+    owner_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    summary = Column(JSON)
+    summary_version = Column(Integer)
+    as_of = Column(Date)  # expiration windows are relative to this day
+    computed_at = Column(DateTime)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -36,10 +36,29 @@ class Property(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign keys
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
     # Relationships
     owner = relationship("User", back_populates="properties")
     tenants = relationship("Tenant", back_populates="property")
     documents = relationship("Document", back_populates="property")
-    rental_agreements = relationship("RentalAgreement", back_populates="property") 
\ No newline at end of file
+    rental_agreements = relationship("RentalAgreement", back_populates="property") 
+
+    __table_args__ = (
+        # GET /properties filters: an equality filter leads, then the rent
+        # range or sort, then id for keyset pages (see app/api/pagination.py).
+        # is_available matches most rows and is checked while scanning.
+        Index("ix_properties_city_monthly_rent_id", "city", "monthly_rent", "id"),
+        Index("ix_properties_state_monthly_rent_id", "state", "monthly_rent", "id"),
+        Index("ix_properties_zip_code_monthly_rent_id", "zip_code", "monthly_rent", "id"),
+        Index("ix_properties_property_type_monthly_rent_id", "property_type", "monthly_rent", "id"),
+        Index("ix_properties_bedrooms_monthly_rent_id", "bedrooms", "monthly_rent", "id"),
+        # The same filters alone, under the default sort by id
+        Index("ix_properties_city_id", "city", "id"),
+        Index("ix_properties_state_id", "state", "id"),
+        Index("ix_properties_zip_code_id", "zip_code", "id"),
+        Index("ix_properties_property_type_id", "property_type", "id"),
+        Index("ix_properties_bedrooms_id", "bedrooms", "id"),
+        # Rent range or sort with no equality filter
+        Index("ix_properties_monthly_rent_id", "monthly_rent", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -37,10 +37,15 @@ class RentalAgreement(Base):
     signed_at = Column(DateTime)
     
     # Foreign keys
-    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=False)
     
     # Relationships
     property = relationship("Property", back_populates="rental_agreements")
     tenant = relationship("Tenant", back_populates="rental_agreements")
-    documents = relationship("Document", back_populates="rental_agreement") 
\ No newline at end of file
+    documents = relationship("Document", back_populates="rental_agreement")
+
+    __table_args__ = (
+        # Expiry scans: status == ACTIVE and end_date <= cutoff
+        Index("ix_rental_agreements_status_end_date", "status", "end_date"),
+    ) 
\ No newline at end of file
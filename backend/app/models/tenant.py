@@ -31,7 +31,7 @@ class Tenant(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Foreign keys
-    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False, index=True)
     
     # Relationships
     property = relationship("Property", back_populates="tenants")
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import date, datetime
+
+class CityVacancy(BaseModel):
+    city: str
+    state: str
+    properties: int
+    vacant: int
+    vacancy_rate: float
+    vacancy_loss: float
+
+class ExpiringAgreements(BaseModel):
+    within_30_days: int
+    within_60_days: int
+    within_90_days: int
+
+class PortfolioSummary(BaseModel):
+    owner_id: int
+    as_of: date
+    computed_at: datetime
+    properties: int
+    occupied: int
+    vacant: int
+    occupancy_rate: float
+    tenants: int
+    active_agreements: int
+    rent_roll: float  # monthly rent of active agreements
+    potential_rent: float  # listed monthly rent of all properties
+    vacancy_loss: float  # listed monthly rent of vacant properties
+    vacancy_by_city: List[CityVacancy]
+    expiring_agreements: ExpiringAgreements
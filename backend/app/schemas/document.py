@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class DocumentBase(BaseModel):
+    title: str
+    description: Optional[str] = None
+    document_type: Optional[str] = None
+
+class DocumentInDBBase(DocumentBase):
+    id: int
+    file_name: str
+    file_size: Optional[int] = None
+    file_type: Optional[str] = None
+    sha256: Optional[str] = None
+    is_verified: bool
+    is_active: bool
+    property_id: int
+    rental_agreement_id: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class Document(DocumentInDBBase):
+    pass
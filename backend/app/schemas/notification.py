@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 from datetime import datetime
+from app.core.config import settings
 from app.models.notification import NotificationType, NotificationStatus
 
 class NotificationBase(BaseModel):
@@ -37,4 +38,15 @@ class NotificationInDBBase(NotificationBase):
         from_attributes = True
 
 class Notification(NotificationInDBBase):
-    pass 
\ No newline at end of file
+    pass 
+
+class NotificationIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=settings.NOTIFICATION_BULK_MAX_IDS)
+
+class NotificationOutcome(BaseModel):
+    id: int
+    outcome: Literal["read", "already_read", "deleted", "not_found"]
+
+class NotificationBulkResult(BaseModel):
+    results: List[NotificationOutcome]
+    unread_count: int
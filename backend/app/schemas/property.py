@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.schemas.tenant import TenantCreate
 
@@ -42,6 +42,27 @@ class PropertyUpdate(BaseModel):
     is_available: Optional[bool] = None
     is_active: Optional[bool] = None
 
+class PropertyFilters(BaseModel):
+    """
+    Query parameters for GET /properties; text filters match exactly.
+    Sorting by rent lists properties without one last.
+    """
+    city: Optional[str] = Field(None, max_length=100)
+    state: Optional[str] = Field(None, max_length=100)
+    zip_code: Optional[str] = Field(None, max_length=20)
+    property_type: Optional[str] = Field(None, max_length=50)
+    bedrooms: Optional[int] = Field(None, ge=0)
+    min_rent: Optional[float] = Field(None, ge=0)
+    max_rent: Optional[float] = Field(None, ge=0)
+    is_available: Optional[bool] = None
+    sort: Literal["id", "-id", "monthly_rent", "-monthly_rent"] = "id"
+
+    @model_validator(mode="after")
+    def check_rent_range(self) -> "PropertyFilters":
+        if self.min_rent is not None and self.max_rent is not None and self.min_rent > self.max_rent:
+            raise ValueError("min_rent must not be greater than max_rent")
+        return self
+
 class PropertyInDBBase(PropertyBase):
     id: int
     owner_id: int
@@ -57,4 +78,18 @@ class Property(PropertyInDBBase):
     pass
 
 class PropertyWithOwner(Property):
-    owner: dict  # Will be populated with owner details 
\ No newline at end of file
+    owner: dict  # Will be populated with owner details 
+
+class PropertyImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+class PropertyImportResult(BaseModel):
+    rows: int
+    properties_created: int
+    tenants_created: int
+    errors: List[PropertyImportError]
+    errors_truncated: bool
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class SearchResult(BaseModel):
+    kind: str  # property, tenant or document
+    id: int
+    title: str
+    score: float
@@ -0,0 +1,127 @@
+"""
+Move documents saved in the flat UPLOAD_DIR layout into the
+content-addressed blob store, and prune blob files nothing refers to.
+Only applies to STORAGE_BACKEND=local.
+
+    python -m app.scripts.migrate_document_store [--dry-run] [--prune]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import time
+import uuid
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.storage.blobs import acquire_blob_statement
+from app.storage.local import BLOB_DIR, INCOMING_DIR, blob_path
+from app.models import Blob, Document
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(settings.UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def place_blob(source_path: str, sha256: str) -> str:
+    """
+    Make the blob for sha256 exist, linking or copying source_path into it.
+    """
+    target = blob_path(sha256)
+    if os.path.exists(target):
+        return target
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    try:
+        os.link(source_path, target)
+    except OSError:
+        # Different filesystem or no hard links: copy, then rename atomically
+        os.makedirs(INCOMING_DIR, exist_ok=True)
+        temp_path = os.path.join(INCOMING_DIR, f"{uuid.uuid4()}.part")
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, target)
+    return target
+
+def migrate_documents(dry_run: bool = False) -> dict:
+    """
+    Move every document without a content address into the blob store.
+
+    Each document is committed on its own and the old file is removed only
+    afterwards, so an interrupted run can simply be started again.
+    """
+    stats = {"migrated": 0, "deduplicated": 0, "missing": 0}
+    db = SessionLocal()
+    try:
+        document_ids = db.scalars(
+            select(Document.id).where(Document.sha256.is_(None)).order_by(Document.id)
+        ).all()
+        for document_id in document_ids:
+            document = db.get(Document, document_id)
+            old_path = document.file_path
+            if not os.path.exists(old_path):
+                print(f"Document {document_id}: file {old_path} is missing, skipped")
+                stats["missing"] += 1
+                continue
+
+            sha256 = hash_file(old_path)
+            if os.path.exists(blob_path(sha256)):
+                stats["deduplicated"] += 1
+            stats["migrated"] += 1
+            if dry_run:
+                continue
+
+            # Referenced first: the row lock keeps remove_blob() off the file
+            db.execute(acquire_blob_statement(db.bind.dialect.name, sha256, os.path.getsize(old_path)))
+            new_path = place_blob(old_path, sha256)
+            document.file_path = new_path
+            document.sha256 = sha256
+            db.commit()
+            if os.path.abspath(old_path) != os.path.abspath(new_path):
+                os.remove(old_path)
+    finally:
+        db.close()
+    return stats
+
+def prune_blobs(min_age: int = 3600, dry_run: bool = False) -> int:
+    """
+    Delete blob files with no blobs row, e.g. left by a failed upload.
+
+    Files younger than min_age seconds are kept, since an upload may have
+    written its blob but not yet committed the row.
+    """
+    pruned = 0
+    cutoff = time.time() - min_age
+    db = SessionLocal()
+    try:
+        for root, _, files in os.walk(BLOB_DIR):
+            for name in files:
+                path = os.path.join(root, name)
+                if os.path.getmtime(path) > cutoff:
+                    continue
+                if db.get(Blob, name) is None:
+                    pruned += 1
+                    if not dry_run:
+                        os.remove(path)
+    finally:
+        db.close()
+    return pruned
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate documents into the content-addressed store.")
+    parser.add_argument("--dry-run", action="store_true", help="report without changing anything")
+    parser.add_argument("--prune", action="store_true", help="also delete unreferenced blob files")
+    args = parser.parse_args()
+
+    stats = migrate_documents(dry_run=args.dry_run)
+    print(
+        f"Migrated {stats['migrated']} documents "
+        f"({stats['deduplicated']} already stored, {stats['missing']} missing files)"
+    )
+    if args.prune:
+        print(f"Pruned {prune_blobs(dry_run=args.dry_run)} unreferenced blobs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Rebuild the full-text search index from the properties, tenants and
+documents tables, e.g. after restoring a backup.
+
+    python -m app.scripts.rebuild_search_index
+"""
+import time
+
+from app.core.database import engine
+from app.models import Base
+from app.search import rebuild_search_index
+
+def main() -> None:
+    started = time.monotonic()
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        count = rebuild_search_index(connection)
+    print(f"Indexed {count} records in {time.monotonic() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
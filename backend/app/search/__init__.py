@@ -0,0 +1,9 @@
+# Full-text search over properties, tenants and documents (/search)
+from app.search.index import SEARCH_KINDS, rebuild_search_index, search
+from app.search import signals  # noqa: F401  re-indexes changed rows
+
+__all__ = [
+    "SEARCH_KINDS",
+    "rebuild_search_index",
+    "search"
+]
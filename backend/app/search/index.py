@@ -0,0 +1,220 @@
+"""
+The search index: an FTS5 table on SQLite, or a tsvector column with a
+GIN index on Postgres, chosen by the DATABASE_URL dialect.
+
+Each entry holds a title (weighted higher) and a body built from the
+indexed fields, plus the owner id of the property the row belongs to,
+so results are scoped inside the full-text lookup itself.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DDL, event, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.document import Document
+from app.models.property import Property
+from app.models.tenant import Tenant
+
+# kind: (code used in SQLite rowids, model, indexed fields)
+SEARCH_KINDS: Dict[str, Tuple[int, Any, Tuple[str, ...]]] = {
+    "property": (1, Property, ("title", "description", "address", "city")),
+    "tenant": (2, Tenant, ("first_name", "last_name", "email", "employer")),
+    "document": (3, Document, ("title", "description")),
+}
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        tags, title, body, kind UNINDEXED, object_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+]
+POSTGRES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS search_entries (
+        kind VARCHAR(16) NOT NULL,
+        object_id INTEGER NOT NULL,
+        owner_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        document TSVECTOR NOT NULL,
+        PRIMARY KEY (kind, object_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_document ON search_entries USING gin (document)",
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_owner_id ON search_entries (owner_id)",
+]
+
+# Neither structure can be described by a Table, so create_all runs the DDL
+for _statement in SQLITE_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRES_DDL:
+    event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+
+Entry = Tuple[str, int, int, str, str]  # kind, object_id, owner_id, title, body
+
+def _load_query(kind: str):
+    _, model, fields = SEARCH_KINDS[kind]
+    columns = [model.id, Property.owner_id, *(getattr(model, field) for field in fields)]
+    query = select(*columns)
+    if model is not Property:
+        query = query.join(Property, Property.id == model.property_id)
+    return query
+
+def _entry(kind: str, row: Sequence[Any]) -> Entry:
+    object_id, owner_id, *values = row
+    values = [value or "" for value in values]
+    if kind == "tenant":
+        title, body = f"{values[0]} {values[1]}", " ".join(values[2:])
+    else:
+        title, body = values[0], " ".join(values[1:])
+    return kind, object_id, owner_id, title, body
+
+def load_entries(connection: Connection, kind: str, ids: Iterable[int]) -> List[Entry]:
+    model = SEARCH_KINDS[kind][1]
+    rows = connection.execute(_load_query(kind).where(model.id.in_(list(ids)))).all()
+    return [_entry(kind, row) for row in rows]
+
+def _rowid(kind: str, object_id: int) -> int:
+    return object_id * 4 + SEARCH_KINDS[kind][0]
+
+def remove_entries(connection: Connection, keys: Iterable[Tuple[str, int]]) -> None:
+    keys = list(keys)
+    if not keys:
+        return
+    if connection.dialect.name == "postgresql":
+        connection.execute(
+            text("DELETE FROM search_entries WHERE kind = :kind AND object_id = :object_id"),
+            [{"kind": kind, "object_id": object_id} for kind, object_id in keys],
+        )
+    else:
+        connection.execute(
+            text("DELETE FROM search_index WHERE rowid = :rowid"),
+            [{"rowid": _rowid(kind, object_id)} for kind, object_id in keys],
+        )
+
+def write_entries(connection: Connection, entries: List[Entry]) -> None:
+    if not entries:
+        return
+    params = [
+        {"kind": kind, "object_id": object_id, "owner_id": owner_id, "title": title, "body": body}
+        for kind, object_id, owner_id, title, body in entries
+    ]
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(
+            "INSERT INTO search_entries (kind, object_id, owner_id, title, document) "
+            "VALUES (:kind, :object_id, :owner_id, :title, "
+            "setweight(to_tsvector('simple', :title), 'A') || setweight(to_tsvector('simple', :body), 'B')) "
+            "ON CONFLICT (kind, object_id) DO UPDATE SET "
+            "owner_id = excluded.owner_id, title = excluded.title, document = excluded.document"
+        ), params)
+        return
+    # FTS5 has no upsert: replace by rowid
+    remove_entries(connection, [(kind, object_id) for kind, object_id, *_ in entries])
+    for entry in params:
+        entry["rowid"] = _rowid(entry["kind"], entry["object_id"])
+        entry["tags"] = f"o{entry['owner_id']} {entry['kind']}"
+    connection.execute(text(
+        "INSERT INTO search_index (rowid, tags, title, body, kind, object_id) "
+        "VALUES (:rowid, :tags, :title, :body, :kind, :object_id)"
+    ), params)
+
+def rebuild_search_index(connection: Connection, batch_size: int = 5000) -> int:
+    """
+    Re-index every property, tenant and document; returns the entry count.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("DELETE FROM search_entries"))
+    else:
+        connection.execute(text("DELETE FROM search_index"))
+    count = 0
+    for kind in SEARCH_KINDS:
+        result = connection.execution_options(yield_per=batch_size).execute(_load_query(kind))
+        for rows in result.partitions():
+            entries = [_entry(kind, row) for row in rows]
+            write_entries(connection, entries)
+            count += len(entries)
+    if connection.dialect.name == "sqlite":
+        # Merge the b-tree segments left behind by the batched inserts
+        connection.execute(text("INSERT INTO search_index(search_index) VALUES ('optimize')"))
+    return count
+
+def _terms(query: str) -> List[str]:
+    # Words only: user input never reaches the query syntax
+    return re.findall(r"\w+", query.lower())[:8]
+
+def _title_score(title: str, terms: List[str]) -> float:
+    words = re.findall(r"\w+", (title or "").lower())
+    matched = sum(term in words for term in terms[:-1])
+    matched += any(word.startswith(terms[-1]) for word in words)
+    return 1.0 + matched / len(terms)
+
+async def search(
+    db: AsyncSession, query: str, owner_id: Optional[int], kind: Optional[str] = None, limit: int = 20
+) -> List[dict]:
+    """
+    Best matches first; every word must match, the last one as a prefix
+    so results appear while typing. owner_id None searches everything.
+
+    Only the newest SEARCH_CANDIDATE_LIMIT matches are ranked, so a query
+    matching most of the index (e.g. "street") costs about the same as a
+    selective one; a better match older than those is not returned.
+    Postgres ranks with ts_rank. SQLite ranks by the share of the words
+    found in the title alone, newest first among equal scores.
+    """
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    if db.bind.dialect.name == "postgresql":
+        conditions = ["document @@ to_tsquery('simple', :query)"]
+        params: Dict[str, Any] = {
+            "query": " & ".join(terms) + ":*",
+            "candidates": settings.SEARCH_CANDIDATE_LIMIT,
+            "limit": limit,
+        }
+        if owner_id is not None:
+            conditions.append("owner_id = :owner_id")
+            params["owner_id"] = owner_id
+        if kind is not None:
+            conditions.append("kind = :kind")
+            params["kind"] = kind
+        statement = text(
+            "SELECT kind, object_id, title, ts_rank(document, to_tsquery('simple', :query)) AS score "
+            "FROM (SELECT kind, object_id, title, document FROM search_entries "
+            f"WHERE {' AND '.join(conditions)} ORDER BY object_id DESC LIMIT :candidates) AS candidates "
+            "ORDER BY score DESC LIMIT :limit"
+        )
+    else:
+        # bm25 needs index-wide statistics for every term, which costs
+        # tens of ms on a large index, so the candidates are scored here
+        # by how many of the words appear in their title. Expanding a
+        # prefix that matches much of the index is slow as well, so the
+        # last word is tried as a whole word first.
+        exact = " AND ".join(f'"{term}"' for term in terms)
+        tags = ([f"o{owner_id}"] if owner_id is not None else []) + ([kind] if kind else [])
+        scope = f"tags : ({' AND '.join(tags)}) AND " if tags else ""
+        for words in (exact, exact + "*"):
+            # FTS5 walks matches in rowid order and stops at the limit
+            rows = (await db.execute(text(
+                "SELECT kind, object_id, title FROM search_index "
+                "WHERE search_index MATCH :match ORDER BY rowid DESC LIMIT :candidates"
+            ), {"match": f"{scope}{{title body}} : ({words})", "candidates": settings.SEARCH_CANDIDATE_LIMIT})).all()
+            if len(rows) >= limit:
+                break
+        results = [
+            {"kind": row.kind, "id": row.object_id, "title": row.title, "score": _title_score(row.title, terms)}
+            for row in rows
+        ]
+        results.sort(key=lambda result: -result["score"])
+        return results[:limit]
+
+    rows = (await db.execute(statement, params)).all()
+    return [
+        {"kind": row.kind, "id": row.object_id, "title": row.title, "score": float(row.score)}
+        for row in rows
+    ]
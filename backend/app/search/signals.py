@@ -0,0 +1,35 @@
+from sqlalchemy.orm import Session
+
+from app.core.changes import RowChanges, subscribe, track
+from app.search.index import SEARCH_KINDS, load_entries, remove_entries, write_entries
+
+# Keeps the search index in step with properties, tenants and documents,
+# in the same transaction as the change.
+
+# An entry is rewritten only when one of these columns changes
+_WATCHED = {
+    kind: frozenset((*fields, "owner_id" if kind == "property" else "property_id"))
+    for kind, (_, _, fields) in SEARCH_KINDS.items()
+}
+
+def _apply(session: Session, changes: RowChanges) -> None:
+    removed = [
+        (kind, row_id) for kind, (_, model, _) in SEARCH_KINDS.items() for row_id in changes.deleted[model]
+    ]
+    changed = {
+        kind: [
+            row_id for row_id, fields in changes.changed[model].items()
+            if fields is None or fields & _WATCHED[kind]
+        ]
+        for kind, (_, model, _) in SEARCH_KINDS.items()
+    }
+    if not removed and not any(changed.values()):
+        return
+    connection = session.connection()
+    remove_entries(connection, removed)
+    for kind, ids in changed.items():
+        if ids:
+            write_entries(connection, load_entries(connection, kind, ids))
+
+track(*(model for _, model, _ in SEARCH_KINDS.values()))
+subscribe(flush=_apply)
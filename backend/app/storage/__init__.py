@@ -0,0 +1,23 @@
+# Document storage backends
+from functools import lru_cache
+
+from app.core.config import settings
+from app.storage.base import StorageBackend, StoredFile, UploadTooLarge
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    """
+    The backend selected by STORAGE_BACKEND ("local" or "s3").
+    """
+    if settings.STORAGE_BACKEND == "s3":
+        from app.storage.s3 import S3Storage
+        return S3Storage(settings.S3_BUCKET_NAME)
+    from app.storage.local import LocalStorage
+    return LocalStorage()
+
+__all__ = [
+    "StorageBackend",
+    "StoredFile",
+    "UploadTooLarge",
+    "get_storage"
+]
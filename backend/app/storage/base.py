@@ -0,0 +1,105 @@
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncContextManager, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload grows past the allowed size while streaming.
+    """
+
+@dataclass(frozen=True)
+class StoredFile:
+    path: str  # file path or object key, saved as Document.file_path
+    size: int
+    sha256: str
+    staged: str  # where the bytes wait until publish() moves them to path
+
+class UploadReader:
+    """
+    Reads an upload in fixed-size chunks, enforcing the size limit and
+    computing the SHA-256 as bytes arrive.
+    """
+
+    def __init__(self, upload: UploadFile, chunk_size: int, max_size: Optional[int] = None):
+        self.upload = upload
+        self.chunk_size = chunk_size
+        self.max_size = settings.MAX_FILE_SIZE if max_size is None else max_size
+        self.size = 0
+        self._digest = hashlib.sha256()
+
+    async def read(self) -> bytes:
+        chunk = await self.upload.read(self.chunk_size)
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadTooLarge()
+        self._digest.update(chunk)
+        return chunk
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+def blob_key(sha256: str) -> str:
+    # Fan out by the first two byte pairs: ab/cd/abcdef...
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+class StorageBackend(ABC):
+    """
+    Where document contents live. Blobs are addressed by their SHA-256, so
+    identical uploads share one stored copy.
+    """
+
+    @abstractmethod
+    async def save(self, upload: UploadFile, max_size: Optional[int] = None) -> StoredFile:
+        """
+        Stream an upload into a staging area; publish() then moves it to
+        its content address.
+        """
+
+    @abstractmethod
+    async def publish(self, stored: StoredFile) -> None:
+        """
+        Move a staged upload to its content address. Call it with the blob
+        row locked by acquire_blob(), so a concurrent remove_blob() cannot
+        delete the blob between this and the commit.
+        """
+
+    @abstractmethod
+    async def discard(self, stored: StoredFile) -> None:
+        """
+        Remove a staged upload that was not published.
+        """
+
+    @abstractmethod
+    async def save_file(self, path: str, sha256: str) -> str:
+        """
+        Move a finished local file into the store under its digest and
+        return its stored path. Like publish(), call it with the blob row
+        locked.
+        """
+
+    @abstractmethod
+    def local_copy(self, path: str) -> AsyncContextManager[str]:
+        """
+        Context manager yielding a local filesystem path for a stored file.
+        """
+
+    @abstractmethod
+    async def delete(self, sha256: str) -> None:
+        """
+        Remove a stored blob; call it through remove_blob().
+        """
+
+    @abstractmethod
+    async def url_for(
+        self, path: str, file_name: str, content_type: Optional[str]
+    ) -> Optional[str]:
+        """
+        Direct URL a client can fetch the stored file from, or None when
+        the API has to serve it (GET /documents/{id}/content).
+        """
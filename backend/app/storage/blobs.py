@@ -0,0 +1,73 @@
+from sqlalchemy import delete, update
+
+from app.core.database import dialect_insert
+from app.models.blob import Blob
+from app.storage import get_storage
+
+# A blob's file is only written (publish/save_file) and deleted
+# (remove_blob) while its row is locked, so a delete cannot slip in
+# between an upload storing the file and committing its reference.
+
+def acquire_blob_statement(dialect_name: str, sha256: str, size: int):
+    """
+    Insert a blob row with one reference, or add a reference to it.
+    """
+    insert = dialect_insert(dialect_name)
+    statement = insert(Blob).values(sha256=sha256, size=size, ref_count=1)
+    return statement.on_conflict_do_update(
+        index_elements=[Blob.sha256],
+        set_={"ref_count": Blob.ref_count + 1, "size": statement.excluded.size},
+    )
+
+def lock_blob_statement(dialect_name: str, sha256: str):
+    """
+    Lock a blob row and return its ref_count.
+
+    An upsert that changes nothing: it locks the row even when it is
+    missing or was just inserted by an uncommitted upload, which SELECT
+    ... FOR UPDATE would not wait for. On SQLite any write takes the
+    database write lock.
+    """
+    insert = dialect_insert(dialect_name)
+    statement = insert(Blob).values(sha256=sha256, size=0, ref_count=0)
+    return statement.on_conflict_do_update(
+        index_elements=[Blob.sha256], set_={"ref_count": Blob.ref_count}
+    ).returning(Blob.ref_count)
+
+async def acquire_blob(db, sha256: str, size: int) -> None:
+    """
+    Add a reference to a blob, locking its row until the transaction ends.
+    Store the file after this and before committing.
+    """
+    await db.execute(acquire_blob_statement(db.bind.dialect.name, sha256, size))
+
+async def release_blob(db, sha256: str) -> bool:
+    """
+    Drop one reference to a blob; returns True when it was the last one.
+
+    The caller removes the stored file with remove_blob() after committing.
+    """
+    ref_count = await db.scalar(
+        update(Blob).where(Blob.sha256 == sha256)
+        .values(ref_count=Blob.ref_count - 1)
+        .returning(Blob.ref_count)
+    )
+    return ref_count is not None and ref_count <= 0
+
+async def remove_blob(db, sha256: str) -> None:
+    """
+    Delete an unreferenced blob's file and row, in a transaction of its own.
+
+    The row is locked first and left alone if an upload has referenced
+    the blob again since it was released.
+    """
+    try:
+        if await db.scalar(lock_blob_statement(db.bind.dialect.name, sha256)) > 0:
+            await db.rollback()
+            return
+        await get_storage().delete(sha256)
+        await db.execute(delete(Blob).where(Blob.sha256 == sha256))
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
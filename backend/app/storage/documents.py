@@ -0,0 +1,49 @@
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import List
+
+from app.models.document import Document
+from app.storage.blobs import release_blob, remove_blob
+from app.storage.variants import release_variants
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ReleasedFiles:
+    """
+    Files of deleted documents, removed with remove_released() after committing.
+    """
+    digests: List[str] = field(default_factory=list)
+    # Files stored before uploads were content-addressed
+    paths: List[str] = field(default_factory=list)
+
+async def release_document(db, document: Document, released: ReleasedFiles) -> None:
+    """
+    Delete a document row, dropping its references to its file and variants.
+    """
+    # Content-addressed files are shared; only the last reference removes it
+    if document.sha256:
+        if await release_blob(db, document.sha256):
+            released.digests.append(document.sha256)
+    else:
+        released.paths.append(document.file_path)
+    released.digests.extend(await release_variants(db, document.id))
+    await db.delete(document)
+
+async def remove_released(db, released: ReleasedFiles) -> None:
+    """
+    Delete the released files; the database rows are already gone, so
+    failures are only logged.
+    """
+    for sha256 in released.digests:
+        try:
+            await remove_blob(db, sha256)
+        except Exception:
+            logger.exception("Error deleting blob %s", sha256)
+    for path in released.paths:
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            logger.exception("Error deleting file %s", path)
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.storage.base import StorageBackend, StoredFile, UploadReader, blob_key
+
+# Documents are stored once per distinct content under
+# UPLOAD_DIR/blobs/ab/cd/abcdef..., keyed by their SHA-256
+BLOB_DIR = os.path.join(settings.UPLOAD_DIR, "blobs")
+INCOMING_DIR = os.path.join(settings.UPLOAD_DIR, ".incoming")
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(BLOB_DIR, *blob_key(sha256).split("/"))
+
+class LocalStorage(StorageBackend):
+    """
+    Blobs on the local filesystem, served by GET /documents/{id}/content.
+    """
+
+    async def save(self, upload: UploadFile, max_size: Optional[int] = None) -> StoredFile:
+        """
+        Stream an upload to a temporary file in UPLOAD_CHUNK_SIZE pieces.
+
+        The size limit is enforced and the SHA-256 computed as bytes
+        arrive, so memory use does not depend on the file size. publish()
+        renames the file to its content address, so readers never see a
+        partial upload.
+        """
+        reader = UploadReader(upload, settings.UPLOAD_CHUNK_SIZE, max_size)
+        await aiofiles.os.makedirs(INCOMING_DIR, exist_ok=True)
+        temp_path = os.path.join(INCOMING_DIR, f"{uuid.uuid4()}.part")
+
+        try:
+            async with aiofiles.open(temp_path, "wb") as buffer:
+                while chunk := await reader.read():
+                    await buffer.write(chunk)
+                await buffer.flush()
+                await asyncio.to_thread(os.fsync, buffer.fileno())
+        except BaseException:
+            if await aiofiles.os.path.exists(temp_path):
+                await aiofiles.os.remove(temp_path)
+            raise
+
+        return StoredFile(
+            path=blob_path(reader.sha256), size=reader.size, sha256=reader.sha256, staged=temp_path
+        )
+
+    async def publish(self, stored: StoredFile) -> None:
+        await aiofiles.os.makedirs(os.path.dirname(stored.path), exist_ok=True)
+        # Replacing an existing blob with identical bytes is harmless
+        await aiofiles.os.replace(stored.staged, stored.path)
+
+    async def discard(self, stored: StoredFile) -> None:
+        if await aiofiles.os.path.exists(stored.staged):
+            await aiofiles.os.remove(stored.staged)
+
+    async def save_file(self, path: str, sha256: str) -> str:
+        final_path = blob_path(sha256)
+        await aiofiles.os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        await aiofiles.os.replace(path, final_path)
+        return final_path
+
+    @asynccontextmanager
+    async def local_copy(self, path: str) -> AsyncIterator[str]:
+        yield path
+
+    async def delete(self, sha256: str) -> None:
+        path = blob_path(sha256)
+        if await aiofiles.os.path.exists(path):
+            await aiofiles.os.remove(path)
+
+    async def url_for(
+        self, path: str, file_name: str, content_type: Optional[str]
+    ) -> Optional[str]:
+        return None
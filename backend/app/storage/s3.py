@@ -0,0 +1,159 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import boto3
+from botocore.exceptions import ClientError
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.storage.base import StorageBackend, StoredFile, UploadReader, blob_key
+
+class S3Storage(StorageBackend):
+    """
+    Blobs in an S3 bucket (or any S3-compatible server via S3_ENDPOINT_URL).
+
+    Uploads are streamed as multipart uploads with up to
+    S3_UPLOAD_CONCURRENCY parts in flight, and downloads are handed out as
+    presigned GET URLs so file bytes never go through the API.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "blobs"):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            region_name=settings.AWS_REGION,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+
+    def key_for(self, sha256: str) -> str:
+        return f"{self.prefix}/{blob_key(sha256)}"
+
+    async def _exists(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(self.client.head_object, Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def _upload_part(
+        self, key: str, upload_id: str, part_number: int, body: bytes, slots: asyncio.Semaphore
+    ) -> Dict:
+        try:
+            response = await asyncio.to_thread(
+                self.client.upload_part,
+                Bucket=self.bucket, Key=key, UploadId=upload_id,
+                PartNumber=part_number, Body=body,
+            )
+            return {"PartNumber": part_number, "ETag": response["ETag"]}
+        finally:
+            slots.release()
+
+    async def save(self, upload: UploadFile, max_size: Optional[int] = None) -> StoredFile:
+        """
+        Multipart-upload to a temporary key while hashing; publish()
+        copies the object to its content address.
+        """
+        reader = UploadReader(upload, settings.S3_MULTIPART_CHUNK_SIZE, max_size)
+        temp_key = f"incoming/{uuid.uuid4()}"
+        multipart = await asyncio.to_thread(
+            self.client.create_multipart_upload, Bucket=self.bucket, Key=temp_key
+        )
+        upload_id = multipart["UploadId"]
+        # Bounds both parallel requests and the part buffers held in memory
+        slots = asyncio.Semaphore(settings.S3_UPLOAD_CONCURRENCY)
+        tasks = []
+
+        try:
+            part_number = 0
+            while True:
+                chunk = await reader.read()
+                # S3 needs at least one part, even for an empty file
+                if not chunk and part_number:
+                    break
+                part_number += 1
+                await slots.acquire()
+                tasks.append(asyncio.create_task(
+                    self._upload_part(temp_key, upload_id, part_number, chunk, slots)
+                ))
+                if not chunk:
+                    break
+            parts = await asyncio.gather(*tasks)
+            await asyncio.to_thread(
+                self.client.complete_multipart_upload,
+                Bucket=self.bucket, Key=temp_key, UploadId=upload_id,
+                MultipartUpload={"Parts": list(parts)},
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await asyncio.to_thread(
+                self.client.abort_multipart_upload,
+                Bucket=self.bucket, Key=temp_key, UploadId=upload_id,
+            )
+            raise
+
+        return StoredFile(
+            path=self.key_for(reader.sha256), size=reader.size, sha256=reader.sha256, staged=temp_key
+        )
+
+    async def publish(self, stored: StoredFile) -> None:
+        try:
+            # Safe to skip: with the blob row locked, an existing object
+            # cannot be deleted before the reference commits
+            if not await self._exists(stored.path):
+                await asyncio.to_thread(
+                    self.client.copy,
+                    {"Bucket": self.bucket, "Key": stored.staged}, self.bucket, stored.path,
+                )
+        finally:
+            await self.discard(stored)
+
+    async def discard(self, stored: StoredFile) -> None:
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=stored.staged)
+
+    async def save_file(self, path: str, sha256: str) -> str:
+        key = self.key_for(sha256)
+        if not await self._exists(key):
+            await asyncio.to_thread(self.client.upload_file, path, self.bucket, key)
+        await asyncio.to_thread(os.remove, path)
+        return key
+
+    @asynccontextmanager
+    async def local_copy(self, path: str) -> AsyncIterator[str]:
+        handle, local_path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            await asyncio.to_thread(self.client.download_file, self.bucket, path, local_path)
+            yield local_path
+        finally:
+            await asyncio.to_thread(os.remove, local_path)
+
+    async def delete(self, sha256: str) -> None:
+        await asyncio.to_thread(
+            self.client.delete_object, Bucket=self.bucket, Key=self.key_for(sha256)
+        )
+
+    async def url_for(
+        self, path: str, file_name: str, content_type: Optional[str]
+    ) -> Optional[str]:
+        params = {
+            "Bucket": self.bucket,
+            "Key": path,
+            "ResponseContentDisposition": f'inline; filename="{file_name}"',
+        }
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url,
+            "get_object", Params=params, ExpiresIn=settings.S3_PRESIGNED_URL_EXPIRES,
+        )
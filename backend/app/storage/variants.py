@@ -0,0 +1,90 @@
+import logging
+import tempfile
+from typing import List
+
+from PIL import Image
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.imaging import image_processor
+from app.models.document import Document
+from app.models.document_variant import DocumentVariant
+from app.storage import get_storage
+from app.storage.blobs import acquire_blob, release_blob, remove_blob
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = {"image/jpeg", "image/png"}
+
+def has_variants(document: Document) -> bool:
+    return document.file_type in IMAGE_TYPES
+
+async def generate_variants(document_id: int) -> None:
+    """
+    Render and store the IMAGE_VARIANTS of an uploaded photo.
+
+    Runs as a background task after the upload response has been sent,
+    with its own session; resizing happens in the image process pool.
+    """
+    storage = get_storage()
+    async with AsyncSessionLocal() as db:
+        document = await db.get(Document, document_id)
+        if document is None or not has_variants(document):
+            return
+
+        with tempfile.TemporaryDirectory(dir=settings.UPLOAD_DIR) as output_dir:
+            try:
+                async with storage.local_copy(document.file_path) as source_path:
+                    rendered = await image_processor.render(source_path, output_dir)
+            except (OSError, Image.DecompressionBombError):
+                # Corrupt or oversized images simply get no variants
+                logger.warning("No variants for document %s", document_id, exc_info=True)
+                return
+
+            acquired: List[str] = []
+            try:
+                for variant in rendered:
+                    await acquire_blob(db, variant.sha256, variant.size)
+                    acquired.append(variant.sha256)
+                # The document may have been deleted while its images were
+                # rendering; locking it keeps it until the variants commit
+                locked = await db.scalar(
+                    select(Document.id).where(Document.id == document_id).with_for_update()
+                )
+                if locked is not None:
+                    for variant in rendered:
+                        file_path = await storage.save_file(variant.path, variant.sha256)
+                        db.add(DocumentVariant(
+                            document_id=document_id,
+                            name=variant.name,
+                            file_path=file_path,
+                            file_size=variant.size,
+                            file_type=variant.content_type,
+                            sha256=variant.sha256,
+                            width=variant.width,
+                            height=variant.height,
+                        ))
+                    await db.commit()
+                    return
+                await db.rollback()
+            except Exception:
+                await db.rollback()
+                logger.exception("Could not store variants for document %s", document_id)
+
+        # Drop the files stored for blobs nothing else references
+        for sha256 in acquired:
+            await remove_blob(db, sha256)
+
+async def release_variants(db, document_id: int) -> List[str]:
+    """
+    Delete a document's variant rows and drop their blob references.
+
+    Returns the digests whose last reference went away; remove them with
+    remove_blob() after committing.
+    """
+    digests = (await db.scalars(
+        select(DocumentVariant.sha256).where(DocumentVariant.document_id == document_id)
+    )).all()
+    await db.execute(delete(DocumentVariant).where(DocumentVariant.document_id == document_id))
+    return [sha256 for sha256 in digests if await release_blob(db, sha256)]
@@ -0,0 +1,47 @@
+"""
+Celery worker for background jobs.
+
+    celery -A app.worker worker --beat --loglevel=info
+"""
+import asyncio
+from typing import List, Optional
+
+from celery import Celery
+
+from app.core.config import settings
+from app.delivery import deliver_pending_notifications
+from app.jobs import repair_unread_counts, scan_rent_expiry
+
+celery_app = Celery("property_management", broker=settings.REDIS_URL)
+celery_app.conf.update(
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    beat_schedule={
+        "deliver-notifications": {
+            "task": "app.worker.deliver_notifications",
+            "schedule": settings.NOTIFICATION_POLL_INTERVAL,
+        },
+        "scan-rent-expiry": {
+            "task": "app.worker.scan_rent_expiry",
+            "schedule": settings.RENT_EXPIRY_SCAN_INTERVAL,
+        },
+        "repair-unread-counts": {
+            "task": "app.worker.repair_unread_counts",
+            "schedule": settings.UNREAD_COUNTER_REPAIR_INTERVAL,
+        },
+    },
+)
+
+@celery_app.task(name="app.worker.deliver_notifications")
+def deliver_notifications(ids: Optional[List[int]] = None) -> int:
+    # Overlapping runs are safe: each claims its own batches. The
+    # scheduler passes the ids it releases; beat runs deliver anything due.
+    return asyncio.run(deliver_pending_notifications(ids))
+
+@celery_app.task(name="app.worker.scan_rent_expiry")
+def scan_rent_expiry_task() -> int:
+    return scan_rent_expiry()
+
+@celery_app.task(name="app.worker.repair_unread_counts")
+def repair_unread_counts_task() -> int:
+    return repair_unread_counts()
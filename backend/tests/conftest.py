@@ -0,0 +1,47 @@
+import itertools
+import os
+import tempfile
+
+# Settings are read when app.core.config is first imported, so the test
+# database and upload directory are set up before anything from app loads
+_TEST_DIR = tempfile.mkdtemp(prefix="property-management-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TEST_DIR}/test.db"
+os.environ["UPLOAD_DIR"] = os.path.join(_TEST_DIR, "uploads")
+os.environ["STORAGE_BACKEND"] = "local"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.models.user import User, UserRole
+
+_emails = itertools.count()
+
+@pytest.fixture(scope="session")
+def client():
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def db(client):
+    with SessionLocal() as db:
+        yield db
+
+@pytest.fixture
+def make_user(db):
+    """
+    Create a user and return it with Authorization headers for it.
+    """
+    def make_user(role: UserRole = UserRole.LANDLORD):
+        user = User(
+            email=f"user{next(_emails)}@example.com",
+            hashed_password="unused",
+            full_name="Test User",
+            role=role,
+        )
+        db.add(user)
+        db.commit()
+        return user, {"Authorization": f"Bearer {create_access_token(user.id)}"}
+    return make_user
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import io
+import os
+
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.blob import Blob
+from app.models.document import Document
+from app.models.document_variant import DocumentVariant
+from app.storage import get_storage
+from app.storage.blobs import acquire_blob, release_blob, remove_blob
+from app.storage.local import blob_path
+
+def upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="lease.pdf")
+
+async def ref_count(sha256: str):
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(Blob.ref_count).where(Blob.sha256 == sha256))
+
+async def test_removal_waits_for_an_upload_holding_the_blob(client):
+    storage = get_storage()
+    stored = await storage.save(upload(b"lease shared by two properties"))
+
+    async with AsyncSessionLocal() as uploader, AsyncSessionLocal() as remover:
+        await acquire_blob(uploader, stored.sha256, stored.size)
+        await storage.publish(stored)
+
+        # e.g. the delete of the last other document, committed meanwhile
+        removal = asyncio.create_task(remove_blob(remover, stored.sha256))
+        await asyncio.sleep(0.3)
+        assert not removal.done()
+
+        await uploader.commit()
+        await removal
+
+    assert os.path.exists(stored.path)
+    assert await ref_count(stored.sha256) == 1
+
+async def test_upload_after_a_removal_stores_the_file_again(client):
+    storage = get_storage()
+    data = b"lease uploaded again while its blob is removed"
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    first = await storage.save(upload(data))
+    async with AsyncSessionLocal() as db:
+        await acquire_blob(db, sha256, first.size)
+        await storage.publish(first)
+        await db.commit()
+
+        second = await storage.save(upload(data))
+        assert await release_blob(db, sha256)
+        await db.commit()
+        await remove_blob(db, sha256)
+        assert not os.path.exists(first.path)
+        assert await ref_count(sha256) is None
+
+        await acquire_blob(db, sha256, second.size)
+        await storage.publish(second)
+        await db.commit()
+
+    assert os.path.exists(second.path)
+    assert await ref_count(sha256) == 1
+
+def test_file_is_kept_until_the_last_document_is_deleted(client, db, make_user):
+    _, headers = make_user()
+    property_id = client.post("/api/v1/properties/", json={
+        "title": "Elm", "address": "1 Elm Street", "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+    data = b"%PDF-1.4 signed lease"
+
+    document_ids = [
+        client.post(
+            "/api/v1/documents/upload",
+            params={"property_id": property_id, "document_type": "lease", "title": "Lease"},
+            files={"file": ("lease.pdf", data, "application/pdf")},
+            headers=headers,
+        ).json()["document"]["id"]
+        for _ in range(2)
+    ]
+    sha256 = hashlib.sha256(data).hexdigest()
+    assert db.get(Blob, sha256).ref_count == 2
+
+    client.delete(f"/api/v1/documents/{document_ids[0]}", headers=headers)
+    db.expire_all()
+    assert db.get(Blob, sha256).ref_count == 1
+    assert os.path.exists(blob_path(sha256))
+
+    client.delete(f"/api/v1/documents/{document_ids[1]}", headers=headers)
+    db.expire_all()
+    assert db.get(Blob, sha256) is None
+    assert not os.path.exists(blob_path(sha256))
+
+def test_deleting_a_property_releases_its_documents(client, db, make_user):
+    _, headers = make_user()
+    property_ids = [
+        client.post("/api/v1/properties/", json={
+            "title": title, "address": "1 Yew Street", "city": "Springfield", "state": "IL", "zip_code": "62701",
+        }, headers=headers).json()["id"]
+        for title in ("Yew", "Yew Annex")
+    ]
+    lease = b"%PDF-1.4 lease shared by two properties"
+    photo = io.BytesIO()
+    Image.new("RGB", (1600, 1200), (90, 60, 30)).save(photo, "PNG")
+
+    def upload_document(property_id, file):
+        return client.post(
+            "/api/v1/documents/upload",
+            params={"property_id": property_id, "document_type": "lease", "title": "Yew"},
+            files={"file": file},
+            headers=headers,
+        ).json()["document"]["id"]
+
+    document_ids = [upload_document(property_id, ("lease.pdf", lease, "application/pdf")) for property_id in property_ids]
+    photo_id = upload_document(property_ids[0], ("front.png", photo.getvalue(), "image/png"))
+    digests = [hashlib.sha256(photo.getvalue()).hexdigest()] + db.scalars(
+        select(DocumentVariant.sha256).where(DocumentVariant.document_id == photo_id)
+    ).all()
+    assert len(digests) > 1
+
+    response = client.delete(f"/api/v1/properties/{property_ids[0]}", headers=headers)
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.get(Document, document_ids[0]) is None
+    assert db.get(Document, photo_id) is None
+    assert db.scalars(select(Blob).where(Blob.sha256.in_(digests))).all() == []
+    assert not any(os.path.exists(blob_path(sha256)) for sha256 in digests)
+
+    lease_sha256 = hashlib.sha256(lease).hexdigest()
+    assert db.get(Blob, lease_sha256).ref_count == 1
+    assert os.path.exists(blob_path(lease_sha256))
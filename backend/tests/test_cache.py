@@ -0,0 +1,15 @@
+import pytest
+
+from app.cache.backends import cache_enabled
+from app.core.config import settings
+
+@pytest.mark.parametrize("enabled, redis, expected", [
+    (None, False, False),
+    (None, True, True),
+    (True, False, True),
+    (False, True, False),
+])
+def test_cache_is_on_by_default_only_with_redis(monkeypatch, enabled, redis, expected):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", enabled)
+    monkeypatch.setattr(settings, "CACHE_REDIS_ENABLED", redis)
+    assert cache_enabled() == expected
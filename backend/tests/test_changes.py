@@ -0,0 +1,50 @@
+from app.core.changes import record_changes
+from app.core.config import settings
+from app.models.portfolio_summary import PortfolioSummary
+from app.models.property import Property
+
+CSV = (
+    "title,address,city,state,zip_code,monthly_rent,tenant_first_name,tenant_last_name,tenant_email,tenant_phone\n"
+    "Quince Cottage,1 Quince Lane,Springfield,IL,62701,900,Grace,Hopper,grace@example.com,+15551234567\n"
+)
+
+def test_core_import_reaches_every_consumer(client, make_user):
+    _, headers = make_user()
+    # Fills the portfolio summary and the cached list before the import
+    assert client.get("/api/v1/analytics/portfolio", headers=headers).json()["properties"] == 0
+
+    response = client.post(
+        "/api/v1/properties/import", files={"file": ("properties.csv", CSV, "text/csv")}, headers=headers
+    )
+    assert response.json()["properties_created"] == 1
+
+    assert client.get("/api/v1/analytics/portfolio", headers=headers).json()["properties"] == 1
+    results = client.get("/api/v1/search/", params={"q": "quince"}, headers=headers).json()
+    assert [result["kind"] for result in results] == ["property"]
+    results = client.get("/api/v1/search/", params={"q": "hopper"}, headers=headers).json()
+    assert [result["kind"] for result in results] == ["tenant"]
+
+def test_committed_change_invalidates_the_cached_read(client, db, make_user, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    _, headers = make_user()
+    property_id = client.post("/api/v1/properties/", json={
+        "title": "Rowan", "address": "1 Rowan Road", "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+    assert client.get(f"/api/v1/properties/{property_id}", headers=headers).json()["title"] == "Rowan"
+
+    db.get(Property, property_id).title = "Rowan House"
+    db.flush()
+    assert client.get(f"/api/v1/properties/{property_id}", headers=headers).json()["title"] == "Rowan"
+    db.commit()
+    assert client.get(f"/api/v1/properties/{property_id}", headers=headers).json()["title"] == "Rowan House"
+
+def test_rolled_back_changes_are_not_applied(db, make_user):
+    user, _ = make_user()
+    record_changes(db, Property, [], owner_ids=[user.id])
+    db.rollback()
+    db.commit()
+    assert db.get(PortfolioSummary, user.id) is None
+
+    record_changes(db, Property, [], owner_ids=[user.id])
+    db.commit()
+    assert db.get(PortfolioSummary, user.id).version == 1
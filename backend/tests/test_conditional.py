@@ -0,0 +1,40 @@
+PROPERTY = {
+    "title": "Maple", "address": "1 Maple Street", "city": "Conditional", "state": "IL", "zip_code": "62701",
+}
+
+def revalidate(client, url, headers, response, **params):
+    return client.get(url, params=params, headers={**headers, "If-None-Match": response.headers["etag"]})
+
+def test_change_within_the_same_second_is_not_answered_with_304(client, make_user):
+    _, headers = make_user()
+    created = client.post("/api/v1/properties/", json=PROPERTY, headers=headers).json()
+    tenant = client.post("/api/v1/tenants/", json={
+        "first_name": "Ada", "last_name": "Lee", "email": "ada@example.com", "phone": "+15551234567",
+        "property_id": created["id"],
+    }, headers=headers).json()
+
+    for url, change in (
+        (f"/api/v1/properties/{created['id']}", {"monthly_rent": 1500}),
+        (f"/api/v1/tenants/{tenant['id']}", {"employer": "Acme"}),
+    ):
+        first = client.get(url, headers=headers)
+        assert revalidate(client, url, headers, first).status_code == 304
+
+        assert client.put(url, json=change, headers=headers).status_code == 200
+        second = revalidate(client, url, headers, first)
+        assert second.status_code == 200
+        assert second.json().items() >= change.items()
+        assert second.headers["etag"] != first.headers["etag"]
+
+def test_list_changed_within_the_same_second_is_sent_again(client, make_user):
+    _, headers = make_user()
+    created = client.post("/api/v1/properties/", json=PROPERTY, headers=headers).json()
+    url = "/api/v1/properties/"
+
+    first = client.get(url, params={"city": "Conditional"}, headers=headers)
+    assert revalidate(client, url, headers, first, city="Conditional").status_code == 304
+
+    client.put(f"/api/v1/properties/{created['id']}", json={"title": "Maple Court"}, headers=headers)
+    second = revalidate(client, url, headers, first, city="Conditional")
+    assert second.status_code == 200
+    assert "Maple Court" in [item["title"] for item in second.json()]
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.database import async_engine, configure_engine, get_async_database_url, get_engine_options
+
+POOL_COUNTERS = {"size", "checkedin", "checkedout", "overflow"}
+
+def read_pragmas(connection) -> dict:
+    return {
+        name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+        for name in ("journal_mode", "busy_timeout", "synchronous")
+    }
+
+def test_db_health_reports_each_pool(client):
+    response = client.get("/health/db")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert set(body["pools"]) == ({"sync", "async"} if async_engine is not None else {"sync"})
+    for status in body["pools"].values():
+        assert set(status) == {"pool_class"} | POOL_COUNTERS
+        assert all(isinstance(status[counter], int) for counter in POOL_COUNTERS)
+
+@pytest.fixture
+def busy_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 1234)
+    return 1234
+
+def test_new_sqlite_connections_get_the_pragmas(tmp_path, busy_timeout):
+    url = f"sqlite:///{tmp_path}/pragmas.db"
+    engine = configure_engine(create_engine(url, **get_engine_options(url)))
+    try:
+        with engine.connect() as connection:
+            assert read_pragmas(connection) == {"journal_mode": "wal", "busy_timeout": busy_timeout, "synchronous": 1}
+    finally:
+        engine.dispose()
+
+async def test_new_async_sqlite_connections_get_the_pragmas(tmp_path, busy_timeout):
+    url = get_async_database_url(f"sqlite:///{tmp_path}/pragmas.db")
+    engine = create_async_engine(url, **get_engine_options(url))
+    configure_engine(engine.sync_engine)
+    try:
+        async with engine.connect() as connection:
+            pragmas = await connection.run_sync(read_pragmas)
+        assert pragmas == {"journal_mode": "wal", "busy_timeout": busy_timeout, "synchronous": 1}
+    finally:
+        await engine.dispose()
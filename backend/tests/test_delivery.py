@@ -0,0 +1,225 @@
+import itertools
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from app.core.config import settings
+from app.delivery import deliver_pending_notifications
+from app.models.notification import Notification, NotificationStatus, NotificationType
+from app.models.user import User
+
+_users = itertools.count()
+
+class StubApi(BaseHTTPRequestHandler):
+    """
+    SendGrid and Twilio stand-in. A message answers with the status codes
+    queued in server.replies under its channel and a text it contains, then
+    202.
+    """
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        channel = "sms" if self.path.endswith("/Messages.json") else "email"
+        message = parse_qs(body)["Body"][0] if channel == "sms" else body
+        self.server.requests.append((channel, message))
+        status = 202
+        for (replies_channel, text), replies in self.server.replies.items():
+            if replies_channel == channel and text in message and replies:
+                status = replies.pop(0)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class StubSmtp(socketserver.StreamRequestHandler):
+    """
+    Just enough SMTP to accept a message without TLS or auth.
+    """
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 stub")
+        while line := self.rfile.readline().decode():
+            command = line.strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 stub")
+            elif command == "DATA":
+                self.reply("354 end with .")
+                lines = []
+                while (data := self.rfile.readline().decode()) not in (".\r\n", ""):
+                    lines.append(data)
+                self.server.messages.append("".join(lines))
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+@pytest.fixture
+def api(monkeypatch):
+    server = serve(ThreadingHTTPServer(("127.0.0.1", 0), StubApi))
+    server.requests, server.replies = [], {}
+    url = f"http://127.0.0.1:{server.server_port}"
+    for name, value in {
+        "EMAIL_BACKEND": "sendgrid",
+        "SENDGRID_API_KEY": "key",
+        "SENDGRID_API_URL": url,
+        "TWILIO_ACCOUNT_SID": "AC1",
+        "TWILIO_AUTH_TOKEN": "token",
+        "TWILIO_PHONE_NUMBER": "+15550000000",
+        "TWILIO_API_URL": url,
+        "NOTIFICATION_SEND_RETRIES": 1,
+        "NOTIFICATION_MAX_ATTEMPTS": 3,
+        "NOTIFICATION_RETRY_BACKOFF": 60,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def notify(db):
+    """
+    Create a PENDING notification for a new user with the given contacts.
+    """
+    def notify(message: str, phone=True) -> int:
+        user = User(
+            email=f"recipient{next(_users)}@example.com",
+            phone="+15551234567" if phone else None,
+            hashed_password="unused",
+            full_name="Recipient",
+        )
+        db.add(user)
+        db.flush()
+        notification = Notification(
+            title="Lease", message=message, notification_type=NotificationType.GENERAL, user_id=user.id
+        )
+        db.add(notification)
+        db.commit()
+        return notification.id
+    return notify
+
+def reload(db, notification_id: int) -> Notification:
+    db.expire_all()
+    return db.get(Notification, notification_id)
+
+async def test_delivers_email_and_sms(api, db, notify):
+    notification_id = notify("rent is due")
+    assert await deliver_pending_notifications([notification_id]) == 1
+
+    notification = reload(db, notification_id)
+    assert notification.status == NotificationStatus.SENT
+    assert notification.email_sent and notification.sms_sent
+    assert notification.sent_at is not None
+    assert sorted(channel for channel, _ in api.requests) == ["email", "sms"]
+
+async def test_transient_error_is_retried_within_the_attempt(api, db, notify):
+    notification_id = notify("flaky")
+    api.replies["email", "flaky"] = [503]
+
+    await deliver_pending_notifications([notification_id])
+
+    notification = reload(db, notification_id)
+    assert notification.status == NotificationStatus.SENT
+    assert notification.delivery_attempts == 1
+    # One SMS, and the email twice: 503, then 202
+    assert sorted(channel for channel, _ in api.requests) == ["email", "email", "sms"]
+
+async def test_failing_channel_backs_off_then_fails(api, db, notify):
+    notification_id = notify("provider down")
+    api.replies["email", "provider down"] = [500] * 100
+
+    backoffs = []
+    for attempt in range(1, settings.NOTIFICATION_MAX_ATTEMPTS + 1):
+        started = datetime.utcnow()
+        assert await deliver_pending_notifications([notification_id]) == 1
+        notification = reload(db, notification_id)
+        assert notification.delivery_attempts == attempt
+        if notification.status == NotificationStatus.FAILED:
+            break
+        assert notification.status == NotificationStatus.PENDING
+        backoffs.append(notification.next_attempt_at - started)
+        # Nothing is claimed again before the backoff has passed
+        assert await deliver_pending_notifications([notification_id]) == 0
+        notification.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+
+    assert notification.status == NotificationStatus.FAILED
+    assert notification.delivery_attempts == settings.NOTIFICATION_MAX_ATTEMPTS
+    assert "HTTP 500" in notification.last_error
+    # Doubled per attempt
+    assert [round(backoff.total_seconds() / 60) for backoff in backoffs] == [1, 2]
+    # Delivered channels are not sent again
+    assert notification.sms_sent
+    assert [channel for channel, _ in api.requests].count("sms") == 1
+
+async def test_rejected_message_fails_without_retrying(api, db, notify):
+    notification_id = notify("bad recipient")
+    api.replies["email", "bad recipient"] = [400]
+
+    await deliver_pending_notifications([notification_id])
+
+    notification = reload(db, notification_id)
+    assert notification.status == NotificationStatus.FAILED
+    assert notification.delivery_attempts == 1
+    assert [channel for channel, _ in api.requests].count("email") == 1
+
+async def test_nothing_is_claimed_without_a_channel(api, db, notify, monkeypatch):
+    monkeypatch.setattr(settings, "SENDGRID_API_KEY", None)
+    monkeypatch.setattr(settings, "TWILIO_ACCOUNT_SID", None)
+    notification_id = notify("no provider configured")
+
+    assert await deliver_pending_notifications([notification_id]) == 0
+
+    notification = reload(db, notification_id)
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.delivery_attempts == 0
+    assert api.requests == []
+
+async def test_user_without_a_reachable_channel_fails(api, db, notify, monkeypatch):
+    # SMS only, to a user without a phone number
+    monkeypatch.setattr(settings, "SENDGRID_API_KEY", None)
+    notification_id = notify("sms only", phone=False)
+
+    await deliver_pending_notifications([notification_id])
+
+    notification = reload(db, notification_id)
+    assert notification.status == NotificationStatus.FAILED
+    assert notification.sent_at is None
+    assert notification.last_error == "no delivery channel for this user"
+    assert api.requests == []
+
+async def test_smtp_delivery(api, db, notify, monkeypatch):
+    server = serve(socketserver.ThreadingTCPServer(("127.0.0.1", 0), StubSmtp))
+    server.messages = []
+    for name, value in {
+        "EMAIL_BACKEND": "smtp",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": server.server_address[1],
+        "SMTP_USE_TLS": False,
+        "SMTP_USERNAME": None,
+    }.items():
+        monkeypatch.setattr(settings, name, value)
+    notification_id = notify("lease renewal", phone=False)
+
+    await deliver_pending_notifications([notification_id])
+    server.shutdown()
+    server.server_close()
+
+    notification = reload(db, notification_id)
+    assert notification.status == NotificationStatus.SENT
+    assert len(server.messages) == 1
+    assert "Subject: Lease" in server.messages[0]
+    assert "lease renewal" in server.messages[0]
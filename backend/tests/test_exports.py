@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+from app.api.exports import export_select, stream_rows
+from app.core.config import settings
+from app.models.property import Property
+from app.models.tenant import Tenant
+from app.schemas.property import Property as PropertySchema
+
+def add_properties(db, owner_id, *titles):
+    properties = [
+        Property(title=title, address=f"{n} Willow Lane", city="Springfield", state="IL", zip_code="62701",
+                 owner_id=owner_id, monthly_rent=900 + n)
+        for n, title in enumerate(titles)
+    ]
+    db.add_all(properties)
+    db.commit()
+    return [property.id for property in properties]
+
+def test_ndjson_export_has_only_the_owners_rows(client, db, make_user):
+    owner, headers = make_user()
+    other, _ = make_user()
+    ids = add_properties(db, owner.id, "Willow", "Willow Annex")
+    add_properties(db, other.id, "Someone Else's")
+
+    response = client.get("/api/v1/properties/export", params={"format": "ndjson"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="properties.ndjson"'
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["id"], row["title"], row["owner_id"]) for row in rows] == [
+        (ids[0], "Willow", owner.id), (ids[1], "Willow Annex", owner.id),
+    ]
+    assert set(rows[0]) == set(PropertySchema.model_fields) & set(Property.__table__.c.keys())
+    assert isinstance(datetime.fromisoformat(rows[0]["created_at"]), datetime)
+
+def test_csv_export_writes_a_header_and_iso_dates(client, db, make_user):
+    owner, headers = make_user()
+    other, _ = make_user()
+    (property_id,) = add_properties(db, owner.id, "Linden")
+    (other_property_id,) = add_properties(db, other.id, "Not Mine")
+    db.add_all([
+        Tenant(first_name="Ada", last_name="Lee", email="ada@example.com", phone="+15551234567",
+               date_of_birth=datetime(1990, 5, 17), property_id=property_id),
+        Tenant(first_name="Bo", last_name="Ek", email="bo@example.com", phone="+15557654321",
+               property_id=other_property_id),
+    ])
+    db.commit()
+
+    response = client.get("/api/v1/tenants/export", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(row["last_name"], row["date_of_birth"], row["property_id"]) for row in rows] == [
+        ("Lee", "1990-05-17T00:00:00", str(property_id)),
+    ]
+
+def test_unknown_format_is_rejected(client, make_user):
+    _, headers = make_user()
+    assert client.get("/api/v1/properties/export", params={"format": "xml"}, headers=headers).status_code == 422
+
+async def test_rows_are_streamed_one_batch_per_chunk(db, make_user, monkeypatch):
+    owner, _ = make_user()
+    ids = add_properties(db, owner.id, *(f"Elder {n}" for n in range(5)))
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    query = export_select(Property, PropertySchema).where(Property.owner_id == owner.id).order_by(Property.id)
+
+    chunks = [chunk async for chunk in stream_rows(query, "ndjson")]
+    assert [chunk.count("\n") for chunk in chunks] == [2, 2, 1]
+    assert [json.loads(line)["id"] for chunk in chunks for line in chunk.splitlines()] == ids
+
+    chunks = [chunk async for chunk in stream_rows(query, "csv")]
+    assert {"id", "title"} <= set(next(csv.reader(io.StringIO(chunks[0]))))
+    assert [len(chunk.splitlines()) for chunk in chunks] == [1, 2, 2, 1]
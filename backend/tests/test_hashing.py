@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.hashing import PasswordHasher, PasswordHashingBusy, password_hasher
+from app.core.security import get_password_hash, verify_and_update_password
+from app.models.user import User
+
+STATS = {"workers", "in_flight", "waiting", "max_queue", "completed", "rejected"}
+
+def add_user(db, email, hashed_password) -> User:
+    user = User(email=email, hashed_password=hashed_password, full_name="Hash Tester")
+    db.add(user)
+    db.commit()
+    return user
+
+def login(client, email, password):
+    return client.post("/api/v1/auth/login", data={"username": email, "password": password})
+
+async def test_requests_beyond_the_queue_are_rejected():
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    try:
+        running = asyncio.create_task(hasher._run(time.sleep, 0.5))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(hasher._run(time.sleep, 0))
+        await asyncio.sleep(0)
+        assert (hasher.in_flight, hasher.waiting) == (1, 1)
+
+        with pytest.raises(PasswordHashingBusy):
+            await hasher._run(time.sleep, 0)
+        await asyncio.gather(running, waiting)
+        assert {key: hasher.stats()[key] for key in ("completed", "rejected", "waiting")} == {
+            "completed": 2, "rejected": 1, "waiting": 0,
+        }
+    finally:
+        hasher.shutdown()
+
+def test_saturated_hasher_answers_503(client, db, monkeypatch):
+    add_user(db, "busy@example.com", get_password_hash("hunter22"))
+    monkeypatch.setattr(password_hasher, "max_queue", 0)
+    rejected = password_hasher.rejected
+
+    response = login(client, "busy@example.com", "hunter22")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert password_hasher.rejected == rejected + 1
+
+def test_outdated_hash_is_replaced_on_login(client, db):
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("hunter22")
+    user = add_user(db, "rehash@example.com", old_hash)
+
+    assert login(client, "rehash@example.com", "wrong").status_code == 401
+    db.refresh(user)
+    assert user.hashed_password == old_hash
+
+    assert login(client, "rehash@example.com", "hunter22").status_code == 200
+    db.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert verify_and_update_password("hunter22", user.hashed_password) == (True, None)
+    assert login(client, "rehash@example.com", "hunter22").status_code == 200
+
+def test_verify_and_update_password():
+    current = get_password_hash("hunter22")
+    assert verify_and_update_password("hunter22", current) == (True, None)
+    assert verify_and_update_password("hunter23", current) == (False, None)
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("hunter22")
+    valid, new_hash = verify_and_update_password("hunter22", old_hash)
+    assert valid and new_hash != old_hash
+
+def test_hashing_health_reports_the_pool(client):
+    response = client.get("/health/hashing")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "healthy"
+    assert set(body["password_hashing"]) == STATS
+    assert body["password_hashing"]["workers"] == settings.PASSWORD_HASH_WORKERS
@@ -0,0 +1,100 @@
+import io
+import json
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from app.imports import import_properties
+from app.imports import properties as imports
+from app.models.property import Property
+from app.models.tenant import Tenant
+
+HEADER = "title,address,city,state,zip_code,monthly_rent,tenant_first_name,tenant_last_name,tenant_email,tenant_phone\n"
+
+def csv_file(*rows: str) -> io.BytesIO:
+    return io.BytesIO((HEADER + "".join(f"{row}\n" for row in rows)).encode())
+
+def owned(db, owner_id):
+    return db.scalars(select(Property).where(Property.owner_id == owner_id).order_by(Property.id)).all()
+
+def test_csv_rows_are_imported_with_their_tenants(db, make_user):
+    user, _ = make_user()
+    report = import_properties(csv_file(
+        "Fir,1 Fir Street,Springfield,IL,62701,950,Alan,Turing,alan@example.com,+15551234567",
+        "Pine,2 Pine Street,Springfield,IL,62701,,,,,",
+    ), "csv", user.id)
+
+    assert (report.rows, report.properties_created, report.tenants_created, report.errors) == (2, 2, 1, [])
+    fir, pine = owned(db, user.id)
+    assert (fir.title, fir.monthly_rent, pine.monthly_rent) == ("Fir", 950, None)
+    tenants = db.scalars(select(Tenant).where(Tenant.property_id.in_([fir.id, pine.id]))).all()
+    assert [(tenant.property_id, tenant.last_name) for tenant in tenants] == [(fir.id, "Turing")]
+
+def test_ndjson_rows_are_imported(db, make_user):
+    user, _ = make_user()
+    lines = [
+        {"title": "Ash", "address": "3 Ash Street", "city": "Springfield", "state": "IL", "zip_code": "62701",
+         "tenant": {"first_name": "Edsger", "last_name": "Dijkstra", "email": "ed@example.com", "phone": "+1555"}},
+        {"title": "Elm", "address": "4 Elm Street", "city": "Springfield", "state": "IL", "zip_code": "62701"},
+    ]
+    source = io.BytesIO("\n".join(json.dumps(line) for line in lines).encode() + b"\n\n")
+    report = import_properties(source, "ndjson", user.id)
+
+    assert (report.rows, report.properties_created, report.tenants_created, report.errors) == (2, 2, 1, [])
+    assert [property.title for property in owned(db, user.id)] == ["Ash", "Elm"]
+
+def test_invalid_rows_are_reported_by_line(db, make_user):
+    user, _ = make_user()
+    report = import_properties(csv_file(
+        "Oak,5 Oak Street,Springfield,IL,62701,800,,,,",
+        "Bad rent,6 Oak Street,Springfield,IL,62701,lots,,,,",
+        "No tenant email,7 Oak Street,Springfield,IL,62701,800,Ada,Lee,,+15551234567",
+        "Too many,8 Oak Street,Springfield,IL,62701,800,,,,,extra",
+    ), "csv", user.id)
+
+    assert report.properties_created == 1
+    assert [error.line for error in report.errors] == [3, 4, 5]
+    assert "monthly_rent" in report.errors[0].errors[0]
+    assert report.errors[1].errors[0].startswith("tenant.email")
+    assert report.errors[2].errors == ["More values than columns"]
+
+    source = io.BytesIO(b'{"title": "Cut off"\n[1, 2]\n')
+    report = import_properties(source, "ndjson", user.id)
+    assert [(error.line, error.errors[0].split(":")[0]) for error in report.errors] == [
+        (1, "Invalid JSON"), (2, "Expected a JSON object"),
+    ]
+
+def test_file_not_in_utf8_is_a_line_error(client, db, make_user):
+    user, headers = make_user()
+    latin1 = (HEADER + "Café Row,9 Main Street,Springfield,IL,62701,700,,,,\n").encode("latin-1")
+    response = client.post(
+        "/api/v1/properties/import", files={"file": ("properties.csv", latin1, "text/csv")}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["properties_created"] == 0
+    assert [error["line"] for error in response.json()["errors"]] == [2]
+    assert "UTF-8" in response.json()["errors"][0]["errors"][0]
+
+    ndjson = b'{"title": "Caf\xe9"}\n'
+    report = import_properties(io.BytesIO(ndjson), "ndjson", user.id)
+    assert [(error.line, error.errors) for error in report.errors] == [(1, ["Not UTF-8 text"])]
+
+def test_failed_chunk_is_retried_row_by_row(db, make_user, monkeypatch):
+    user, _ = make_user()
+    insert_chunk = imports.insert_chunk
+
+    def rejecting_insert_chunk(session, owner_id, chunk):
+        if any(property_in.title == "Rejected" for _, property_in in chunk):
+            raise IntegrityError("INSERT INTO properties", {}, Exception("rejected by the database"))
+        return insert_chunk(session, owner_id, chunk)
+
+    monkeypatch.setattr(imports, "insert_chunk", rejecting_insert_chunk)
+    report = import_properties(csv_file(
+        "Kept,1 Birch Street,Springfield,IL,62701,600,,,,",
+        "Rejected,2 Birch Street,Springfield,IL,62701,600,,,,",
+        "Also kept,3 Birch Street,Springfield,IL,62701,600,Ada,Lee,ada@example.com,+15551234567",
+    ), "csv", user.id)
+
+    assert (report.properties_created, report.tenants_created) == (2, 1)
+    assert [(error.line, error.errors) for error in report.errors] == [(3, ["rejected by the database"])]
+    assert [property.title for property in owned(db, user.id)] == ["Kept", "Also kept"]
@@ -0,0 +1,185 @@
+import importlib.util
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import event, or_, select, text, update
+
+from app.api.ownership import owned_by
+from app.core.database import Base, engine
+from app.core.principal import Principal
+from app.models.document import Document
+from app.models.notification import Notification, NotificationStatus, UNREAD_STATUSES
+from app.models.property import Property
+from app.models.rental_agreement import AgreementStatus, RentalAgreement
+from app.models.tenant import Tenant
+from app.models.user import UserRole
+from app.search.index import rebuild_search_index
+
+# The hot queries from the endpoints and jobs, the indexes each must use
+# (EXPLAIN QUERY PLAN on SQLite), and whether its rows come out of an index
+# already in order. Lists joined to their property are sorted after the join.
+
+LANDLORD = Principal(id=1, role=UserRole.LANDLORD, is_active=True)
+NOW = datetime(2026, 1, 1)
+
+def explain(statement):
+    def prefix(conn, cursor, sql, parameters, context, executemany):
+        return f"EXPLAIN QUERY PLAN {sql}", parameters
+
+    with engine.connect() as connection:
+        event.listen(connection, "before_cursor_execute", prefix, retval=True)
+        result = connection.execute(statement)
+        return [row[3] for row in result.cursor.fetchall()]
+
+HOT_QUERIES = {
+    "properties list": (
+        owned_by(select(Property), Property, LANDLORD).where(Property.id > 100).order_by(Property.id).limit(51),
+        ["ix_properties_owner_id"],
+        True,
+    ),
+    "documents of owned properties": (
+        owned_by(select(Document), Document, LANDLORD).order_by(Document.id).limit(51),
+        ["ix_properties_owner_id", "ix_documents_property_id"],
+        False,
+    ),
+    "documents of one property": (
+        select(Document).where(Document.property_id == 7).order_by(Document.id).limit(51),
+        ["ix_documents_property_id"],
+        True,
+    ),
+    "tenants of owned properties": (
+        owned_by(select(Tenant), Tenant, LANDLORD).order_by(Tenant.id),
+        ["ix_properties_owner_id", "ix_tenants_property_id"],
+        False,
+    ),
+    "rental agreements of owned properties": (
+        owned_by(select(RentalAgreement), RentalAgreement, LANDLORD).order_by(RentalAgreement.id).limit(51),
+        ["ix_properties_owner_id", "ix_rental_agreements_property_id"],
+        False,
+    ),
+    "expiring agreements": (
+        select(RentalAgreement.id).where(
+            RentalAgreement.status == AgreementStatus.ACTIVE,
+            RentalAgreement.end_date <= NOW + timedelta(days=30),
+        ),
+        ["ix_rental_agreements_status_end_date"],
+        True,
+    ),
+    "rent expiry scan chunk": (
+        select(RentalAgreement.id, RentalAgreement.end_date).where(
+            RentalAgreement.status == AgreementStatus.ACTIVE,
+            RentalAgreement.end_date <= NOW + timedelta(days=30),
+            RentalAgreement.end_date >= NOW,
+            or_(RentalAgreement.end_date > NOW, RentalAgreement.id > 10),
+        ).order_by(RentalAgreement.end_date, RentalAgreement.id).limit(1000),
+        ["ix_rental_agreements_status_end_date"],
+        True,
+    ),
+    "notification inbox page": (
+        select(Notification).where(Notification.user_id == 1, Notification.id < 500)
+        .order_by(Notification.id.desc()).limit(51),
+        ["ix_notifications_user_id_id"],
+        True,
+    ),
+    "mark all read": (
+        update(Notification).where(
+            Notification.user_id == 1, Notification.status.in_(UNREAD_STATUSES)
+        ).values(status=NotificationStatus.READ),
+        ["ix_notifications_user_id_status"],
+        True,
+    ),
+}
+
+# GET /properties with one equality filter, as paginate() pages it by id,
+# by rent, and through the rows without a rent
+PROPERTY_FILTERS = {
+    "city": "Springfield", "state": "IL", "zip_code": "62701", "property_type": "house", "bedrooms": 2,
+}
+for field, value in PROPERTY_FILTERS.items():
+    column = getattr(Property, field)
+    HOT_QUERIES[f"properties by {field}"] = (
+        select(Property).where(column == value, Property.id > 100).order_by(Property.id).limit(51),
+        [f"ix_properties_{field}_id"],
+        True,
+    )
+    HOT_QUERIES[f"properties by {field}, newest first"] = (
+        select(Property).where(column == value, Property.id < 100).order_by(Property.id.desc()).limit(51),
+        [f"ix_properties_{field}_id"],
+        True,
+    )
+    HOT_QUERIES[f"properties by {field} sorted by rent"] = (
+        select(Property).where(
+            column == value,
+            Property.monthly_rent.is_not(None),
+            Property.monthly_rent >= 900,
+            or_(Property.monthly_rent > 900, Property.id > 100),
+        ).order_by(Property.monthly_rent, Property.id).limit(51),
+        [f"ix_properties_{field}_monthly_rent_id"],
+        True,
+    )
+    HOT_QUERIES[f"properties by {field} without a rent"] = (
+        select(Property).where(column == value, Property.monthly_rent.is_(None), Property.id > 100)
+        .order_by(Property.id).limit(51),
+        [f"ix_properties_{field}_monthly_rent_id"],
+        True,
+    )
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_index(client, name):
+    statement, indexes, ordered = HOT_QUERIES[name]
+    plan = explain(statement)
+    for index in indexes:
+        assert any(f"INDEX {index} " in step for step in plan), plan
+    assert not any(step.startswith("SCAN") and "INDEX" not in step for step in plan), plan
+    if ordered:
+        assert not any("USE TEMP B-TREE FOR ORDER BY" in step for step in plan), plan
+
+def load_migration(filename: str):
+    path = os.path.join(os.path.dirname(__file__), "..", "alembic", "versions", filename)
+    spec = importlib.util.spec_from_file_location(filename[:-3], path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration
+
+def test_migration_creates_the_model_indexes():
+    migration = load_migration("0001_add_filter_indexes.py")
+
+    declared = {
+        index.name: index.table.name
+        for table in Base.metadata.tables.values() for index in table.indexes
+    }
+    for name, table, _ in migration.INDEXES:
+        assert declared.get(name) == table, name
+
+def test_property_migrations_create_the_model_indexes():
+    declared = {index.name: [column.name for column in index.columns] for index in Property.__table__.indexes}
+    for filename in ("0011_add_property_filter_indexes.py", "0012_add_property_filter_id_indexes.py"):
+        for name, table, columns in load_migration(filename).INDEXES:
+            assert (table, declared.get(name)) == ("properties", columns), name
+
+def test_search_migration_fills_the_index_like_a_rebuild(client, db, make_user):
+    user, headers = make_user()
+    property_id = client.post("/api/v1/properties/", json={
+        "title": "Cedar", "description": "Sunny loft", "address": "9 Cedar Street",
+        "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+    db.add(Tenant(first_name="Ada", last_name="Lee", email="ada@example.com", phone="+15551234567",
+                  property_id=property_id))
+    db.commit()
+    migration = load_migration("0010_add_search_index.py")
+
+    def entries(connection):
+        return connection.execute(text(
+            "SELECT rowid, tags, title, body, kind, object_id FROM search_index ORDER BY rowid"
+        )).all()
+
+    with engine.connect() as connection, connection.begin() as transaction:
+        rebuild_search_index(connection)
+        rebuilt = entries(connection)
+        with Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+        assert entries(connection) == rebuilt
+        transaction.rollback()
@@ -0,0 +1,95 @@
+from datetime import datetime
+
+import pytest
+
+from app.core.config import settings
+from app.models.notification import Notification, NotificationStatus, NotificationType
+
+def add_notifications(db, user_id, *statuses, created_at=None):
+    notifications = [
+        Notification(title="Notice", message="Gutters cleared on Tuesday", notification_type=NotificationType.GENERAL,
+                     user_id=user_id, status=status, created_at=created_at)
+        for status in statuses
+    ]
+    db.add_all(notifications)
+    db.commit()
+    return [notification.id for notification in notifications]
+
+def statuses(db, ids):
+    db.expire_all()
+    return [db.get(Notification, notification_id).status for notification_id in ids]
+
+def test_batch_read_reports_each_outcome(client, db, make_user):
+    user, headers = make_user()
+    other, _ = make_user()
+    unread, read = add_notifications(db, user.id, NotificationStatus.PENDING, NotificationStatus.READ)
+    (others,) = add_notifications(db, other.id, NotificationStatus.PENDING)
+    missing = others + 10**6
+
+    response = client.post(
+        "/api/v1/notifications/batch-read", json={"ids": [unread, read, others, missing, unread]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"id": unread, "outcome": "read"},
+            {"id": read, "outcome": "already_read"},
+            {"id": others, "outcome": "not_found"},
+            {"id": missing, "outcome": "not_found"},
+        ],
+        "unread_count": 0,
+    }
+    assert statuses(db, [unread, others]) == [NotificationStatus.READ, NotificationStatus.PENDING]
+
+def test_batch_delete_reports_each_outcome(client, db, make_user):
+    user, headers = make_user()
+    other, _ = make_user()
+    unread, read, kept = add_notifications(
+        db, user.id, NotificationStatus.PENDING, NotificationStatus.READ, NotificationStatus.SENT
+    )
+    (others,) = add_notifications(db, other.id, NotificationStatus.PENDING)
+
+    response = client.post(
+        "/api/v1/notifications/batch-delete", json={"ids": [read, others, unread]}, headers=headers
+    )
+    assert response.json() == {
+        "results": [
+            {"id": read, "outcome": "deleted"},
+            {"id": others, "outcome": "not_found"},
+            {"id": unread, "outcome": "deleted"},
+        ],
+        "unread_count": 1,
+    }
+    db.expire_all()
+    assert db.get(Notification, unread) is None
+    assert db.get(Notification, others) is not None
+    assert db.get(Notification, kept) is not None
+
+@pytest.mark.parametrize("endpoint", ["batch-read", "batch-delete"])
+def test_batch_size_is_limited(client, db, make_user, endpoint):
+    user, headers = make_user()
+    ids = add_notifications(db, user.id, NotificationStatus.PENDING)
+    url = f"/api/v1/notifications/{endpoint}"
+
+    limit = settings.NOTIFICATION_BULK_MAX_IDS
+    assert client.post(url, json={"ids": []}, headers=headers).status_code == 422
+    assert client.post(url, json={"ids": list(range(1, limit + 2))}, headers=headers).status_code == 422
+    assert statuses(db, ids) == [NotificationStatus.PENDING]
+
+    response = client.post(url, json={"ids": ids + list(range(10**6, 10**6 + limit - 1))}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == limit
+
+@pytest.mark.parametrize("before", ["2026-02-01T00:00:00", "2026-02-01T00:00:00Z", "2026-02-01T02:00:00+02:00"])
+def test_mark_all_read_stops_at_before(client, db, make_user, before):
+    user, headers = make_user()
+    older = add_notifications(db, user.id, NotificationStatus.PENDING, NotificationStatus.FAILED,
+                              created_at=datetime(2026, 1, 15))
+    at_cutoff = add_notifications(db, user.id, NotificationStatus.SENT, created_at=datetime(2026, 2, 1))
+    newer = add_notifications(db, user.id, NotificationStatus.PENDING, created_at=datetime(2026, 2, 1, 0, 0, 1))
+
+    response = client.post("/api/v1/notifications/mark-all-read", params={"before": before}, headers=headers)
+    assert response.status_code == 200
+    assert statuses(db, older + at_cutoff) == [NotificationStatus.READ] * 3
+    assert statuses(db, newer) == [NotificationStatus.PENDING]
+    assert client.get("/api/v1/notifications/unread", headers=headers).json() == {"unread_count": 1}
@@ -0,0 +1,100 @@
+import itertools
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.ownership import owned_by, scoped
+from app.core.database import AsyncSessionLocal
+from app.core.principal import Principal
+from app.models.document import Document
+from app.models.property import Property
+from app.models.rental_agreement import RentalAgreement
+from app.models.tenant import Tenant
+from app.models.user import UserRole
+
+MODELS = [Property, Tenant, Document, RentalAgreement]
+_agreements = itertools.count()
+
+def principal(user) -> Principal:
+    return Principal(id=user.id, role=user.role, is_active=True)
+
+@pytest.fixture
+def owned_rows(db, make_user):
+    """
+    One row of each model under a property of a new landlord.
+    """
+    owner, _ = make_user()
+    property = Property(title="Maple", address="1 Maple Street", city="Springfield", state="IL",
+                        zip_code="62701", owner_id=owner.id)
+    db.add(property)
+    db.flush()
+    tenant = Tenant(first_name="Ada", last_name="Lee", email="ada@example.com", phone="+15551234567",
+                    property_id=property.id)
+    document = Document(title="Lease", file_name="lease.pdf", file_path="/nowhere/lease.pdf",
+                        property_id=property.id)
+    db.add_all([tenant, document])
+    db.flush()
+    agreement = RentalAgreement(
+        agreement_number=f"OWN-{next(_agreements)}-{property.id}", start_date=datetime(2026, 1, 1),
+        end_date=datetime(2027, 1, 1), monthly_rent=1000, security_deposit=1000,
+        property_id=property.id, tenant_id=tenant.id,
+    )
+    db.add(agreement)
+    db.commit()
+    return owner, {Property: property.id, Tenant: tenant.id, Document: document.id, RentalAgreement: agreement.id}
+
+async def load(model, user, object_id):
+    async with AsyncSessionLocal() as db:
+        return await scoped(db, model, user, object_id)
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+async def test_owner_and_admin_load_the_row(owned_rows, make_user, model):
+    owner, ids = owned_rows
+    admin, _ = make_user(UserRole.ADMIN)
+    for user in (owner, admin):
+        row = await load(model, principal(user), ids[model])
+        assert isinstance(row, model) and row.id == ids[model]
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+async def test_other_owner_gets_403(owned_rows, make_user, model):
+    _, ids = owned_rows
+    other, _ = make_user()
+    with pytest.raises(HTTPException) as denied:
+        await load(model, principal(other), ids[model])
+    assert (denied.value.status_code, denied.value.detail) == (403, "Not enough permissions")
+
+@pytest.mark.parametrize("model, detail", [
+    (Property, "Property not found"),
+    (Tenant, "Tenant not found"),
+    (Document, "Document not found"),
+    (RentalAgreement, "Rental agreement not found"),
+])
+async def test_missing_row_gets_404_even_for_admins(make_user, model, detail):
+    admin, _ = make_user(UserRole.ADMIN)
+    with pytest.raises(HTTPException) as missing:
+        await load(model, principal(admin), 10**9)
+    assert (missing.value.status_code, missing.value.detail) == (404, detail)
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+def test_owned_by_filters_to_the_owners_rows(db, owned_rows, make_user, model):
+    owner, ids = owned_rows
+    other, _ = make_user()
+    admin, _ = make_user(UserRole.ADMIN)
+
+    def visible(user):
+        return db.scalars(owned_by(select(model.id), model, principal(user)).where(model.id == ids[model])).all()
+    assert visible(owner) == [ids[model]]
+    assert visible(other) == []
+    assert visible(admin) == [ids[model]]
+
+def test_endpoints_map_ownership_to_status_codes(client, owned_rows, make_user):
+    _, ids = owned_rows
+    _, other_headers = make_user()
+    _, admin_headers = make_user(UserRole.ADMIN)
+    url = f"/api/v1/tenants/{ids[Tenant]}"
+
+    assert client.get(url, headers=other_headers).status_code == 403
+    assert client.get(url, headers=admin_headers).status_code == 200
+    assert client.get("/api/v1/tenants/1000000000", headers=admin_headers).status_code == 404
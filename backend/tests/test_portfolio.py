@@ -0,0 +1,54 @@
+import asyncio
+
+from app.analytics import get_portfolio_summary
+from app.core.database import AsyncSessionLocal
+from app.models.portfolio_summary import PortfolioSummary
+from app.models.property import Property
+from app.models.user import UserRole
+
+def add_property(db, owner_id, **fields) -> Property:
+    property = Property(
+        title="Birch", address="1 Birch Street", city="Springfield", state="IL", zip_code="62701",
+        owner_id=owner_id, monthly_rent=1000, **fields,
+    )
+    db.add(property)
+    db.commit()
+    return property
+
+async def read_summary(owner_id: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        return await get_portfolio_summary(db, owner_id)
+
+async def test_concurrent_cold_reads_store_one_summary(db, make_user):
+    user, _ = make_user()
+    add_property(db, user.id)
+
+    summaries = await asyncio.gather(*(read_summary(user.id) for _ in range(8)))
+    assert {summary["properties"] for summary in summaries} == {1}
+
+    db.expire_all()
+    stored = db.get(PortfolioSummary, user.id)
+    assert stored.summary_version == stored.version
+    assert stored.summary["properties"] == 1
+
+def test_summary_is_recomputed_after_a_change(client, db, make_user):
+    user, headers = make_user()
+    add_property(db, user.id)
+    assert client.get("/api/v1/analytics/portfolio", headers=headers).json()["properties"] == 1
+
+    add_property(db, user.id, is_available=False)
+    summary = client.get("/api/v1/analytics/portfolio", headers=headers).json()
+    assert summary["properties"] == 2
+    assert summary["occupied"] == 1
+
+def test_admin_asking_for_an_unknown_owner_gets_404(client, db, make_user):
+    _, headers = make_user(UserRole.ADMIN)
+    response = client.get("/api/v1/analytics/portfolio", params={"owner_id": 10**9}, headers=headers)
+    assert response.status_code == 404
+    assert db.get(PortfolioSummary, 10**9) is None
+
+def test_other_owners_summary_needs_admin(client, make_user):
+    owner, _ = make_user()
+    _, headers = make_user()
+    response = client.get("/api/v1/analytics/portfolio", params={"owner_id": owner.id}, headers=headers)
+    assert response.status_code == 403
@@ -0,0 +1,30 @@
+from app.core.principal import principal_cache
+from app.models.user import User
+
+def test_deactivated_user_is_rejected(client, db, make_user):
+    user, headers = make_user()
+    assert client.get("/api/v1/notifications/unread", headers=headers).status_code == 200
+    assert principal_cache.get(user.id).is_active
+
+    user.is_active = False
+    db.flush()
+    # Not evicted until the change commits
+    assert principal_cache.get(user.id) is not None
+    db.commit()
+    assert principal_cache.get(user.id) is None
+
+    response = client.get("/api/v1/notifications/unread", headers=headers)
+    assert response.status_code == 400
+    # Served from the cache the second time, and still rejected
+    assert principal_cache.get(user.id) is not None
+    assert client.get("/api/v1/notifications/unread", headers=headers).status_code == 400
+
+def test_rolled_back_change_keeps_the_cached_principal(client, db, make_user):
+    user, headers = make_user()
+    client.get("/api/v1/notifications/unread", headers=headers)
+    cached = principal_cache.get(user.id)
+
+    db.get(User, user.id).full_name = "Renamed"
+    db.flush()
+    db.rollback()
+    assert principal_cache.get(user.id) is cached
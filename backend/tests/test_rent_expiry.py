@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.jobs.rent_expiry import WATERMARK_NAME, scan_rent_expiry
+from app.models.job_watermark import JobWatermark
+from app.models.notification import Notification
+from app.models.property import Property
+from app.models.rental_agreement import AgreementStatus, RentalAgreement
+from app.models.tenant import Tenant
+
+def add_agreement(db, owner_id, end_date) -> RentalAgreement:
+    property = Property(
+        title="Oak", address="1 Oak Street", city="Springfield", state="IL", zip_code="62701", owner_id=owner_id
+    )
+    db.add(property)
+    db.flush()
+    tenant = Tenant(
+        first_name="Ada", last_name="Lee", email="ada@example.com", phone="+15551234567", property_id=property.id
+    )
+    db.add(tenant)
+    db.flush()
+    agreement = RentalAgreement(
+        agreement_number=f"RA-{property.id}",
+        start_date=end_date - timedelta(days=365),
+        end_date=end_date,
+        monthly_rent=1200,
+        security_deposit=1200,
+        status=AgreementStatus.ACTIVE,
+        property_id=property.id,
+        tenant_id=tenant.id,
+    )
+    db.add(agreement)
+    db.commit()
+    return agreement
+
+def notifications_for(db, agreement) -> int:
+    return db.scalar(
+        select(func.count()).where(Notification.dedupe_key.like(f"rent_expiry:{agreement.id}:%"))
+    )
+
+def test_agreement_activated_in_the_same_second_as_a_run_is_notified(db, make_user):
+    user, _ = make_user()
+    db.execute(delete(JobWatermark).where(JobWatermark.name == WATERMARK_NAME))
+    db.commit()
+    now = datetime.utcnow()
+    scan_rent_expiry(now)
+
+    # Inside the window the first run already covered, so only the
+    # change-filtered pass can find it
+    agreement = add_agreement(db, user.id, now + timedelta(days=10))
+    state = db.get(JobWatermark, WATERMARK_NAME)
+    # The run is stamped later within the second the agreement was saved in
+    state.last_run_at = agreement.created_at.replace(microsecond=500000)
+    db.commit()
+
+    scan_rent_expiry(now + timedelta(minutes=1))
+    assert notifications_for(db, agreement) == 1
+
+    # The overlap with the previous run does not notify twice
+    scan_rent_expiry(now + timedelta(minutes=2))
+    assert notifications_for(db, agreement) == 1
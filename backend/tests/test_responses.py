@@ -0,0 +1,84 @@
+import pytest
+from starlette.datastructures import Headers
+
+from app.api.responses import FileRangeResponse, parse_range
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=90-500", (90, 99)),
+    (" bytes=5-5 ", (5, 5)),
+])
+def test_satisfiable_ranges(header, expected):
+    assert parse_range(header, 100) == expected
+
+@pytest.mark.parametrize("header", ["bytes=0-1,5-6", "bytes=-", "items=0-9", "bytes=a-b", "bytes 0-9", ""])
+def test_unsupported_or_malformed_ranges_are_ignored(header):
+    assert parse_range(header, 100) is None
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),
+    ("bytes=100-200", 100),
+    ("bytes=9-5", 100),
+    ("bytes=-0", 100),
+    ("bytes=-10", 0),
+    ("bytes=0-", 0),
+])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+def test_suffix_range_of_an_empty_file_is_416(tmp_path):
+    path = tmp_path / "empty.pdf"
+    path.write_bytes(b"")
+    response = FileRangeResponse(str(path), Headers({"range": "bytes=-10"}), etag='"empty"')
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
+
+@pytest.fixture
+def document(client, make_user):
+    _, headers = make_user()
+    property_id = client.post("/api/v1/properties/", json={
+        "title": "Linden", "address": "1 Linden Street", "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+    data = b"%PDF-1.4 " + bytes(range(256)) * 4
+    document = client.post(
+        "/api/v1/documents/upload",
+        params={"property_id": property_id, "document_type": "lease", "title": "Lease"},
+        files={"file": ("lease.pdf", data, "application/pdf")},
+        headers=headers,
+    ).json()["document"]
+    return f"/api/v1/documents/{document['id']}/content", headers, data
+
+def test_range_request_gets_206(client, document):
+    url, headers, data = document
+    response = client.get(url, headers={**headers, "Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{len(data)}"
+    assert response.content == data[10:20]
+
+def test_range_past_the_end_gets_416(client, document):
+    url, headers, data = document
+    response = client.get(url, headers={**headers, "Range": f"bytes={len(data)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(data)}"
+
+def test_matching_etag_gets_304(client, document):
+    url, headers, _ = document
+    etag = client.get(url, headers=headers).headers["etag"]
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_stale_if_range_gets_the_whole_file(client, document):
+    url, headers, data = document
+    etag = client.get(url, headers=headers).headers["etag"]
+
+    current = client.get(url, headers={**headers, "Range": "bytes=0-9", "If-Range": etag})
+    assert current.status_code == 206
+
+    stale = client.get(url, headers={**headers, "Range": "bytes=0-9", "If-Range": '"older"'})
+    assert stale.status_code == 200
+    assert stale.content == data
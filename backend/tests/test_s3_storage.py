@@ -0,0 +1,120 @@
+import hashlib
+import io
+import os
+import threading
+import time
+
+import boto3
+import pytest
+import requests
+from fastapi import UploadFile
+from moto import mock_aws
+
+from app.core.config import settings
+from app.storage.base import UploadTooLarge
+from app.storage.s3 import S3Storage
+
+BUCKET = "documents"
+PART_SIZE = 5 * 1024 * 1024  # the smallest part S3 accepts
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "S3_MULTIPART_CHUNK_SIZE", PART_SIZE)
+    monkeypatch.setattr(settings, "S3_UPLOAD_CONCURRENCY", 2)
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 5 * PART_SIZE)
+    with mock_aws():
+        boto3.client("s3", region_name=settings.AWS_REGION).create_bucket(Bucket=BUCKET)
+        yield S3Storage(BUCKET)
+
+def upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="scan.pdf")
+
+def keys(storage):
+    return [item["Key"] for item in storage.client.list_objects_v2(Bucket=BUCKET).get("Contents", [])]
+
+def pending_uploads(storage):
+    return storage.client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", [])
+
+async def test_multipart_upload_is_published_under_its_digest(storage):
+    data = os.urandom(2 * PART_SIZE + 1234)
+    stored = await storage.save(upload(data))
+
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.size == len(data)
+    assert stored.path == storage.key_for(stored.sha256)
+    staged = storage.client.head_object(Bucket=BUCKET, Key=stored.staged)
+    assert staged["ETag"].strip('"').endswith("-3")
+
+    await storage.publish(stored)
+    assert keys(storage) == [stored.path]
+    assert storage.client.get_object(Bucket=BUCKET, Key=stored.path)["Body"].read() == data
+    assert pending_uploads(storage) == []
+
+async def test_parts_are_uploaded_in_parallel_up_to_the_limit(storage, monkeypatch):
+    in_flight, peak, lock = 0, 0, threading.Lock()
+    upload_part = storage.client.upload_part
+
+    def counting_upload_part(**kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        try:
+            time.sleep(0.05)
+            return upload_part(**kwargs)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    monkeypatch.setattr(storage.client, "upload_part", counting_upload_part)
+    await storage.save(upload(os.urandom(4 * PART_SIZE)))
+    assert peak == settings.S3_UPLOAD_CONCURRENCY
+
+async def test_upload_over_the_limit_is_aborted(storage):
+    with pytest.raises(UploadTooLarge):
+        await storage.save(upload(os.urandom(2 * PART_SIZE)), max_size=PART_SIZE + 1)
+    assert pending_uploads(storage) == []
+    assert keys(storage) == []
+
+async def test_failed_part_aborts_the_upload(storage, monkeypatch):
+    upload_part = storage.client.upload_part
+
+    def failing_upload_part(**kwargs):
+        if kwargs["PartNumber"] == 2:
+            raise ConnectionError("connection reset")
+        return upload_part(**kwargs)
+
+    monkeypatch.setattr(storage.client, "upload_part", failing_upload_part)
+    with pytest.raises(ConnectionError):
+        await storage.save(upload(os.urandom(3 * PART_SIZE)))
+    assert pending_uploads(storage) == []
+
+async def test_identical_uploads_share_one_object(storage):
+    data = b"%PDF-1.4 tenant id scan"
+    first = await storage.save(upload(data))
+    second = await storage.save(upload(data))
+    await storage.publish(first)
+    await storage.publish(second)
+    assert first.path == second.path
+    assert keys(storage) == [first.path]
+
+    await storage.delete(first.sha256)
+    assert keys(storage) == []
+
+async def test_discarded_upload_leaves_nothing_behind(storage):
+    stored = await storage.save(upload(b"never referenced"))
+    await storage.discard(stored)
+    assert keys(storage) == []
+
+async def test_presigned_url_serves_the_object(storage):
+    data = b"%PDF-1.4 lease"
+    stored = await storage.save(upload(data))
+    await storage.publish(stored)
+
+    url = await storage.url_for(stored.path, "lease.pdf", "application/pdf")
+    assert "Signature" in url or "X-Amz-Signature" in url
+    response = requests.get(url)
+    assert response.status_code == 200
+    assert response.content == data
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import redis
+import redis.asyncio
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.delivery.scheduler import LEADER_KEY, LeaderLease, NotificationScheduler, run_scheduler
+from app.models.notification import Notification, NotificationType
+
+class FakeRedis:
+    """
+    The part of redis.asyncio.Redis the scheduler uses, with expiring keys.
+    """
+
+    def __init__(self):
+        self.values = {}  # key: (value, monotonic expiry)
+        self.reachable = True
+
+    def _get(self, key):
+        value, expires_at = self.values.get(key, (None, 0.0))
+        return value if time.monotonic() < expires_at else None
+
+    async def set(self, key, value, nx=False, px=None):
+        if not self.reachable:
+            raise redis.ConnectionError("unreachable")
+        if nx and self._get(key) is not None:
+            return None
+        self.values[key] = (value, time.monotonic() + px / 1000)
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        if not self.reachable:
+            raise redis.ConnectionError("unreachable")
+        if self._get(key) != token:
+            return 0
+        if script == LeaderLease._RENEW:
+            self.values[key] = (token, time.monotonic() + int(args[0]) / 1000)
+        else:
+            del self.values[key]
+        return 1
+
+    def pubsub(self):
+        return FakePubSub()
+
+class FakePubSub:
+    async def subscribe(self, channel):
+        pass
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        await asyncio.sleep(min(timeout, 0.02))
+        return None
+
+    async def reset(self):
+        pass
+
+@pytest.fixture
+def scheduled(db, make_user):
+    """
+    Add pending notifications due the given seconds from now; returns their ids.
+    """
+    user, _ = make_user()
+
+    def scheduled(*delays: float):
+        notifications = [
+            Notification(
+                title="Reminder", message="Rent is due", notification_type=NotificationType.PAYMENT_DUE,
+                user_id=user.id, scheduled_at=datetime.utcnow() + timedelta(seconds=delay),
+            )
+            for delay in delays
+        ]
+        db.add_all(notifications)
+        db.commit()
+        return [notification.id for notification in notifications]
+    yield scheduled
+    db.execute(delete(Notification).where(Notification.user_id == user.id))
+    db.commit()
+
+def recorder(released, name=None):
+    async def release(ids):
+        released.extend((name, notification_id) for notification_id in ids)
+    return release
+
+async def test_one_process_holds_the_lease():
+    client = FakeRedis()
+    leases = [LeaderLease(client, LEADER_KEY, ttl=0.5) for _ in range(3)]
+
+    acquired = await asyncio.gather(*(lease.acquire() for lease in leases))
+    assert acquired.count(True) == 1
+    assert [lease.held() for lease in leases] == acquired
+    leader = leases[acquired.index(True)]
+    followers = [lease for lease in leases if lease is not leader]
+
+    assert await leader.renew()
+    assert [await lease.acquire() for lease in followers] == [False, False]
+    assert [await lease.renew() for lease in followers] == [False, False]
+
+    await leader.release()
+    assert not leader.held()
+    assert await followers[0].acquire()
+    assert not await leader.renew()
+
+async def test_due_notifications_are_released_once_across_schedulers(scheduled, monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(redis.asyncio.Redis, "from_url", lambda url: client)
+    monkeypatch.setattr(settings, "NOTIFICATION_SCHEDULER_LEASE_TTL", 0.3)
+    ids = scheduled(-5, 0.2, 0.4)
+
+    released = []
+    schedulers = [asyncio.create_task(run_scheduler(recorder(released, name))) for name in range(3)]
+    await asyncio.sleep(1.0)
+    for task in schedulers:
+        task.cancel()
+    await asyncio.gather(*schedulers, return_exceptions=True)
+
+    mine = [(name, notification_id) for name, notification_id in released if notification_id in ids]
+    assert sorted(notification_id for _, notification_id in mine) == ids
+    assert len({name for name, _ in mine}) == 1
+
+@pytest.mark.parametrize("loss", ["taken over", "redis unreachable"])
+async def test_lost_lease_stops_dispatch(scheduled, loss):
+    client = FakeRedis()
+    lease = LeaderLease(client, LEADER_KEY, ttl=0.3)
+    assert await lease.acquire()
+    first, later = scheduled(0.05, 1.0)
+
+    released = []
+    run = asyncio.create_task(NotificationScheduler(recorder(released)).run(lease, FakePubSub()))
+    await asyncio.sleep(0.2)
+    if loss == "taken over":
+        # e.g. this process stalled past the TTL and another one acquired it
+        client.values[LEADER_KEY] = ("other", time.monotonic() + 10)
+    else:
+        client.reachable = False
+    await asyncio.wait_for(run, timeout=0.5)
+
+    assert not lease.held()
+    await asyncio.sleep(1.0 - 0.2)
+    mine = [notification_id for _, notification_id in released if notification_id in (first, later)]
+    assert mine == [first]
@@ -0,0 +1,80 @@
+from app.core.config import settings
+from app.models.user import UserRole
+
+def add_property(client, headers, title, description=None) -> int:
+    return client.post("/api/v1/properties/", json={
+        "title": title, "description": description, "address": "1 Sorrel Street",
+        "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+
+def search(client, headers, q, **params):
+    response = client.get("/api/v1/search/", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return [(result["kind"], result["id"]) for result in response.json()]
+
+def test_owners_only_find_their_own_rows(client, make_user):
+    _, headers = make_user()
+    _, other_headers = make_user()
+    _, admin_headers = make_user(UserRole.ADMIN)
+    mine = add_property(client, headers, "Zephyrine Flat")
+    theirs = add_property(client, other_headers, "Zephyrine Loft")
+    tenant_id = client.post("/api/v1/tenants/", json={
+        "first_name": "Ida", "last_name": "Zephyrine", "email": "ida@example.com", "phone": "+15550001111",
+        "property_id": theirs,
+    }, headers=other_headers).json()["id"]
+
+    assert search(client, headers, "zephyrine") == [("property", mine)]
+    assert sorted(search(client, other_headers, "zephyrine")) == [("property", theirs), ("tenant", tenant_id)]
+    assert sorted(search(client, admin_headers, "zephyrine")) == [
+        ("property", mine), ("property", theirs), ("tenant", tenant_id),
+    ]
+    assert search(client, admin_headers, "zephyrine", kind="tenant") == [("tenant", tenant_id)]
+
+def test_title_matches_rank_first_then_newest(client, make_user):
+    _, headers = make_user()
+    in_body = add_property(client, headers, "Garden House", "Marigold cottage with a view")
+    in_title = add_property(client, headers, "Marigold Cottage")
+    half_in_title = add_property(client, headers, "Cottage Row", "Marigold beds")
+    newer_half_in_title = add_property(client, headers, "Marigold Terrace", "A cottage garden")
+
+    assert search(client, headers, "marigold cottage") == [
+        ("property", in_title),
+        ("property", newer_half_in_title),
+        ("property", half_in_title),
+        ("property", in_body),
+    ]
+    # The last word is matched as a prefix while typing
+    assert search(client, headers, "marigold cott")[0] == ("property", in_title)
+
+def test_only_the_newest_candidates_are_ranked(client, make_user, monkeypatch):
+    _, headers = make_user()
+    oldest = add_property(client, headers, "Wisteria Wisteria Court")
+    newer = [add_property(client, headers, "Court", f"Wisteria view {n}") for n in range(2)]
+    monkeypatch.setattr(settings, "SEARCH_CANDIDATE_LIMIT", 2)
+
+    # The best title match is older than the candidate window
+    assert ("property", oldest) not in search(client, headers, "wisteria")
+    assert sorted(search(client, headers, "wisteria")) == [("property", id) for id in newer]
+
+def test_index_follows_inserts_updates_and_deletes(client, make_user):
+    _, headers = make_user()
+    property_id = add_property(client, headers, "Quillwort Barn")
+    assert search(client, headers, "quillwort") == [("property", property_id)]
+
+    tenant_id = client.post("/api/v1/tenants/", json={
+        "first_name": "Ada", "last_name": "Brambleton", "email": "ada.b@example.com", "phone": "+15550002222",
+        "property_id": property_id,
+    }, headers=headers).json()["id"]
+    assert search(client, headers, "brambleton") == [("tenant", tenant_id)]
+
+    client.put(f"/api/v1/properties/{property_id}", json={"title": "Larkspur Barn"}, headers=headers)
+    assert search(client, headers, "quillwort") == []
+    assert search(client, headers, "larkspur") == [("property", property_id)]
+
+    client.put(f"/api/v1/tenants/{tenant_id}", json={"employer": "Quillwort Mills"}, headers=headers)
+    assert search(client, headers, "quillwort") == [("tenant", tenant_id)]
+
+    client.delete(f"/api/v1/tenants/{tenant_id}", headers=headers)
+    assert search(client, headers, "brambleton") == []
+    client.delete(f"/api/v1/properties/{property_id}", headers=headers)
+    assert search(client, headers, "larkspur") == []
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints.notifications import stream_notifications
+from app.core.config import settings
+from app.core.events import broker
+from app.models.notification import Notification, NotificationType
+
+def connections_settle_at(expected: int, timeout: float = 1.0) -> bool:
+    # The server notices a WebSocket disconnect shortly after the client closes
+    deadline = time.monotonic() + timeout
+    while broker.connection_count() != expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return broker.connection_count() == expected
+
+@pytest.fixture(autouse=True)
+def no_open_streams(monkeypatch):
+    monkeypatch.setattr(settings, "REALTIME_HEARTBEAT_INTERVAL", 60)
+    assert connections_settle_at(0)
+
+def token_of(headers) -> str:
+    return headers["Authorization"].split(" ", 1)[1]
+
+def add_notifications(db, user_id, count):
+    notifications = [
+        Notification(title="Notice", message="Water off Monday", notification_type=NotificationType.GENERAL,
+                     user_id=user_id)
+        for _ in range(count)
+    ]
+    db.add_all(notifications)
+    db.commit()
+    return [notification.id for notification in notifications]
+
+def test_websocket_gets_only_its_users_unread_counts(client, db, make_user):
+    user, headers = make_user()
+    other, other_headers = make_user()
+    ids = add_notifications(db, user.id, 3)
+    other_ids = add_notifications(db, other.id, 2)
+
+    with client.websocket_connect(f"/api/v1/notifications/stream?token={token_of(headers)}") as mine, \
+            client.websocket_connect(f"/api/v1/notifications/stream?token={token_of(other_headers)}") as theirs:
+        assert mine.receive_json() == {"type": "unread_count", "unread_count": 3}
+        assert theirs.receive_json() == {"type": "unread_count", "unread_count": 2}
+
+        client.post(f"/api/v1/notifications/{other_ids[0]}/read", headers=other_headers)
+        client.post(f"/api/v1/notifications/{ids[0]}/read", headers=headers)
+        # The other user's event, had it leaked, would arrive first
+        assert mine.receive_json() == {"type": "unread_count", "unread_count": 2}
+        assert theirs.receive_json() == {"type": "unread_count", "unread_count": 1}
+
+def test_websocket_disconnect_unsubscribes(client, make_user):
+    _, headers = make_user()
+    with client.websocket_connect(f"/api/v1/notifications/stream?token={token_of(headers)}") as websocket:
+        websocket.receive_json()
+        assert broker.connection_count() == 1
+    assert connections_settle_at(0)
+
+@pytest.mark.parametrize("query", ["", "?token=not-a-token"])
+def test_websocket_without_a_valid_token_is_rejected(client, query):
+    with pytest.raises(WebSocketDisconnect) as rejected:
+        with client.websocket_connect(f"/api/v1/notifications/stream{query}"):
+            pass
+    assert rejected.value.code == 1008
+    assert broker.connection_count() == 0
+
+@pytest.mark.parametrize("params", [{}, {"token": "not-a-token"}])
+def test_event_stream_without_a_valid_token_is_rejected(client, params):
+    response = client.get("/api/v1/notifications/stream", params=params)
+    assert response.status_code == 401
+
+async def test_event_stream_gets_only_its_users_events_and_unsubscribes(client, make_user):
+    user, headers = make_user()
+    other, _ = make_user()
+
+    response = await stream_notifications(token=None, header_token=token_of(headers))
+    events = response.body_iterator
+    assert await events.__anext__() == 'event: unread_count\ndata: {"type": "unread_count", "unread_count": 0}\n\n'
+    assert broker.connection_count() == 1
+
+    broker.publish(other.id, {"type": "unread_count", "unread_count": 7})
+    broker.publish(user.id, {"type": "unread_count", "unread_count": 1})
+    assert await events.__anext__() == 'event: unread_count\ndata: {"type": "unread_count", "unread_count": 1}\n\n'
+
+    # What the server does when the client goes away
+    await events.aclose()
+    assert broker.connection_count() == 0
@@ -0,0 +1,90 @@
+import logging
+
+from sqlalchemy import func, select
+
+from app.jobs import repair_unread_counts
+from app.models.notification import Notification, NotificationStatus, NotificationType, UNREAD_STATUSES
+from app.models.notification_counter import NotificationCounter
+
+def add_notifications(db, user_id, *statuses):
+    notifications = [
+        Notification(title="Notice", message="Boiler service on Friday", notification_type=NotificationType.GENERAL,
+                     user_id=user_id, status=status)
+        for status in statuses
+    ]
+    db.add_all(notifications)
+    db.commit()
+    return [notification.id for notification in notifications]
+
+def counted(db, user_id) -> int:
+    return db.scalar(select(func.count(Notification.id)).where(
+        Notification.user_id == user_id, Notification.status.in_(UNREAD_STATUSES)
+    ))
+
+def stored(db, user_id) -> int:
+    db.expire_all()
+    return db.scalar(select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id))
+
+def assert_in_step(client, db, user_id, headers, expected):
+    assert counted(db, user_id) == expected
+    assert stored(db, user_id) == expected
+    assert client.get("/api/v1/notifications/unread", headers=headers).json() == {"unread_count": expected}
+
+def test_counter_follows_every_write(client, db, make_user):
+    user, headers = make_user()
+    pending = NotificationStatus.PENDING
+    ids = add_notifications(db, user.id, pending, pending, NotificationStatus.SENT, NotificationStatus.FAILED,
+                            NotificationStatus.READ, pending, pending)
+    assert_in_step(client, db, user.id, headers, 6)
+
+    client.post(f"/api/v1/notifications/{ids[0]}/read", headers=headers)
+    client.post(f"/api/v1/notifications/{ids[0]}/read", headers=headers)
+    assert_in_step(client, db, user.id, headers, 5)
+
+    client.delete(f"/api/v1/notifications/{ids[1]}", headers=headers)
+    client.delete(f"/api/v1/notifications/{ids[4]}", headers=headers)
+    assert_in_step(client, db, user.id, headers, 4)
+
+    client.post("/api/v1/notifications/batch-read", json={"ids": [ids[0], ids[2], ids[2]]}, headers=headers)
+    assert_in_step(client, db, user.id, headers, 3)
+
+    client.post("/api/v1/notifications/batch-delete", json={"ids": [ids[2], ids[3], ids[1]]}, headers=headers)
+    assert_in_step(client, db, user.id, headers, 2)
+
+    client.post("/api/v1/notifications/mark-all-read", headers=headers)
+    assert_in_step(client, db, user.id, headers, 0)
+
+def test_orm_status_change_of_an_expired_row_is_counted(client, db, make_user):
+    user, headers = make_user()
+    first, second = add_notifications(db, user.id, NotificationStatus.PENDING, NotificationStatus.PENDING)
+
+    # After the commit the status is expired; the counter hooks need its old value
+    notification = db.get(Notification, first)
+    db.expire(notification)
+    notification.status = NotificationStatus.SENT
+    db.commit()
+    assert_in_step(client, db, user.id, headers, 2)
+
+    notification = db.get(Notification, second)
+    db.expire(notification)
+    notification.status = NotificationStatus.READ
+    db.commit()
+    assert_in_step(client, db, user.id, headers, 1)
+
+def test_drifted_counters_are_recounted_and_repaired(client, db, make_user, caplog):
+    user, headers = make_user()
+    other, other_headers = make_user()
+    add_notifications(db, user.id, NotificationStatus.PENDING, NotificationStatus.PENDING)
+    add_notifications(db, other.id, NotificationStatus.PENDING)
+    db.get(NotificationCounter, user.id).unread_count = -3
+    db.get(NotificationCounter, other.id).unread_count = 5
+    db.commit()
+
+    with caplog.at_level(logging.WARNING):
+        assert client.get("/api/v1/notifications/unread", headers=headers).json() == {"unread_count": 2}
+    assert f"Unread counter of user {user.id} is -3" in caplog.text
+
+    assert repair_unread_counts() >= 2
+    assert_in_step(client, db, user.id, headers, 2)
+    assert_in_step(client, db, other.id, other_headers, 1)
+    assert repair_unread_counts() == 0
@@ -0,0 +1,64 @@
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.document import Document
+from app.storage import UploadTooLarge, get_storage
+from app.storage.local import INCOMING_DIR, blob_path
+
+BOUNDARY = "upload-test-boundary"
+
+def staged_files():
+    return set(os.listdir(INCOMING_DIR)) if os.path.isdir(INCOMING_DIR) else set()
+
+def chunked_multipart(file_name: str, data: bytes, chunk_size: int):
+    """
+    A multipart body sent in pieces, so the request has no Content-Length.
+    """
+    yield (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+@pytest.fixture
+def small_uploads(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", 64 * 1024)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 16 * 1024)
+
+async def test_oversized_stream_of_unknown_size_leaves_nothing_staged(client, small_uploads):
+    data = b"%PDF-1.4 " + os.urandom(100 * 1024)
+    before = staged_files()
+
+    with pytest.raises(UploadTooLarge):
+        await get_storage().save(UploadFile(file=io.BytesIO(data), filename="scan.pdf"))
+    assert staged_files() == before
+    assert not os.path.exists(blob_path(hashlib.sha256(data).hexdigest()))
+
+def test_oversized_upload_without_content_length_gets_400(client, db, make_user, small_uploads):
+    _, headers = make_user()
+    property_id = client.post("/api/v1/properties/", json={
+        "title": "Aspen", "address": "1 Aspen Way", "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+    data = b"%PDF-1.4 " + os.urandom(100 * 1024)
+    before = staged_files()
+
+    response = client.post(
+        "/api/v1/documents/upload",
+        params={"property_id": property_id, "document_type": "lease", "title": "Scan"},
+        content=chunked_multipart("scan.pdf", data, 8 * 1024),
+        headers={**headers, "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("File too large")
+    assert staged_files() == before
+    assert not os.path.exists(blob_path(hashlib.sha256(data).hexdigest()))
+    assert db.scalars(select(Document).where(Document.property_id == property_id)).all() == []
@@ -0,0 +1,100 @@
+import io
+import logging
+import os
+
+import pytest
+from PIL import Image
+from sqlalchemy import delete, select
+
+from app.core.database import SessionLocal
+from app.core.imaging import image_processor
+from app.models.blob import Blob
+from app.models.document import Document
+from app.models.document_variant import DocumentVariant
+from app.storage import get_storage
+from app.storage.local import blob_path
+
+def png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (1600, 1200), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+@pytest.fixture
+def upload_photo(client, make_user):
+    _, headers = make_user()
+    property_id = client.post("/api/v1/properties/", json={
+        "title": "Hazel", "address": "1 Hazel Street", "city": "Springfield", "state": "IL", "zip_code": "62701",
+    }, headers=headers).json()["id"]
+
+    def upload_photo(color) -> int:
+        response = client.post(
+            "/api/v1/documents/upload",
+            params={"property_id": property_id, "document_type": "photo", "title": "Front"},
+            files={"file": ("front.png", png(color), "image/png")},
+            headers=headers,
+        )
+        return response.json()["document"]["id"]
+    return upload_photo
+
+class Render:
+    """
+    Records the variants rendered, calling before(source_path) once they are.
+    """
+
+    def __init__(self, render):
+        self.render = render
+        self.variants = []
+        self.before = lambda source_path: None
+
+    async def __call__(self, source_path, output_dir):
+        variants = await self.render(source_path, output_dir)
+        self.before(source_path)
+        self.variants.extend(variants)
+        return variants
+
+@pytest.fixture
+def rendered(monkeypatch):
+    render = Render(image_processor.render)
+    monkeypatch.setattr(image_processor, "render", render)
+    return render
+
+def assert_nothing_stored(db, document_id, rendered):
+    digests = [variant.sha256 for variant in rendered.variants]
+    assert digests
+    assert db.scalars(select(DocumentVariant).where(DocumentVariant.document_id == document_id)).all() == []
+    assert db.scalars(select(Blob).where(Blob.sha256.in_(digests))).all() == []
+    assert not any(os.path.exists(blob_path(sha256)) for sha256 in digests)
+
+def test_variants_are_stored(db, upload_photo, rendered):
+    document_id = upload_photo((10, 120, 40))
+    variants = db.scalars(select(DocumentVariant).where(DocumentVariant.document_id == document_id)).all()
+    assert sorted(variant.sha256 for variant in variants) == sorted(variant.sha256 for variant in rendered.variants)
+    assert all(os.path.exists(variant.file_path) for variant in variants)
+
+def test_document_deleted_while_rendering_gets_no_variants(db, upload_photo, rendered):
+    def delete_document(source_path):
+        with SessionLocal() as other:
+            other.execute(delete(Document).where(Document.file_path == source_path))
+            other.commit()
+    rendered.before = delete_document
+
+    document_id = upload_photo((200, 30, 30))
+    assert db.get(Document, document_id) is None
+    assert_nothing_stored(db, document_id, rendered)
+
+def test_failed_store_discards_the_files(db, upload_photo, rendered, monkeypatch, caplog):
+    storage = get_storage()
+    save_file = storage.save_file
+    calls = []
+
+    async def failing_save_file(path, sha256):
+        calls.append(sha256)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        return await save_file(path, sha256)
+    monkeypatch.setattr(storage, "save_file", failing_save_file)
+
+    with caplog.at_level(logging.ERROR, logger="app.storage.variants"):
+        document_id = upload_photo((30, 30, 200))
+    assert "Could not store variants" in caplog.text
+    assert_nothing_stored(db, document_id, rendered)